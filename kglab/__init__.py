@@ -3,8 +3,14 @@ see license https://github.com/DerwenAI/kglab#license-and-copyright
 """
 from .kglab import KnowledgeGraph
 
+from .cache import ParseCache
+
+from .hdt import HDTFile
+
 from .graph import NodeRef, PropertyStore
 
+from .tables import TermDict, LiteralTable, TripleTable
+
 from .topo import Measure, Simplex0, Simplex1
 
 from .pkg_types import RDF_Triple, RDF_Node, SPARQL_Bindings, \
@@ -16,7 +22,8 @@ from .external_import import import_from_neo4j
 
 from .gpviz import GPViz
 
-from .util import get_gpu_count, calc_quantile_bins, stripe_column, root_mean_square
+from .util import get_gpu_count, calc_quantile_bins, stripe_column, root_mean_square, \
+    ReadWriteLock
 
 from .version import MIN_PY_VERSION, _versify, _check_version, __version__
 
@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/kglab#license-and-copyright
+
+"""
+Cache of parsed RDF graphs, stored as Arrow IPC files.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import threading
+import typing
+
+import pyarrow as pa  # type: ignore  # pylint: disable=E0401
+
+from .pkg_types import PathLike
+
+
+class ParseCache:
+    """
+An opt-in, on-disk cache for the results of parsing RDF files, which
+the loaders in `SerdeMixin` use when passed a `cache` argument, so that
+repeated loads of the same file skip parsing.
+
+Each entry gets keyed by the file path, size, modification time, and a
+hash of its content, plus the loader and its options; then stored as
+an [Arrow IPC](https://arrow.apache.org/docs/python/ipc.html) file with
+dictionary-encoded columns, which gets read back through a memory map.
+When the entries exceed `max_bytes` in total, the least recently used
+ones get evicted.
+    """
+    SUFFIX: str = ".arrow"
+    BLOCK_SIZE: int = 1024 * 1024
+
+
+    def __init__ (
+        self,
+        path: typing.Optional[PathLike] = None,
+        *,
+        max_bytes: int = 1024**3,
+        ) -> None:
+        """
+Constructor for a cache.
+
+    path:
+optional directory in which to store the cache entries; defaults to `~/.cache/kglab`
+
+    max_bytes:
+maximum total size of the cache entries in bytes; defaults to 1 GiB
+        """
+        if path is None:
+            path = pathlib.Path.home() / ".cache" / "kglab"
+
+        self.path: pathlib.Path = pathlib.Path(str(path))
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.max_bytes: int = max_bytes
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._lock: threading.Lock = threading.Lock()
+
+
+    def __getstate__ (
+        self
+        ) -> dict:
+        """
+Support pickling for worker processes, which keep their own counters.
+        """
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+
+    def __setstate__ (
+        self,
+        state: dict,
+        ) -> None:
+        """
+Support unpickling for worker processes.
+        """
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+    def get_key (
+        self,
+        filename: str,
+        loader: str,
+        options: dict,
+        ) -> str:
+        """
+Build the key for a cache entry, which reads through the file to hash
+its content.
+
+    filename:
+name of a local file
+
+    loader:
+name of the loader method
+
+    options:
+options which affect how the file gets parsed, such as its format
+
+    returns:
+the key, as a hex string
+        """
+        stat = os.stat(filename)
+        content = hashlib.blake2b(digest_size=32)
+
+        with open(filename, "rb") as f:
+            for block in iter(lambda: f.read(self.BLOCK_SIZE), b""):
+                content.update(block)
+
+        key = json.dumps(
+            [
+                os.path.abspath(filename),
+                stat.st_size,
+                stat.st_mtime_ns,
+                content.hexdigest(),
+                loader,
+                options,
+            ],
+            sort_keys=True,
+            default=str,
+        )
+
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=32).hexdigest()
+
+
+    def get (
+        self,
+        key: str,
+        ) -> typing.Optional[pa.Table]:
+        """
+Lookup a cache entry, which counts as a hit or a miss.
+
+    key:
+key for the cache entry
+
+    returns:
+the cached table, memory-mapped from its file; otherwise `None`
+        """
+        entry_path = self.path / (key + self.SUFFIX)
+
+        try:
+            with pa.memory_map(str(entry_path), "r") as source:
+                table = pa.ipc.open_file(source).read_all()
+
+            # mark the entry as the most recently used one
+            os.utime(entry_path)
+        except (FileNotFoundError, pa.ArrowInvalid):
+            with self._lock:
+                self.misses += 1
+
+            return None
+
+        with self._lock:
+            self.hits += 1
+
+        return table
+
+
+    def put (
+        self,
+        key: str,
+        table: pa.Table,
+        ) -> None:
+        """
+Store a cache entry, writing it atomically, then evict the least
+recently used entries if the cache has become too large.
+
+    key:
+key for the cache entry
+
+    table:
+table of parsed triples to store
+        """
+        entry_path = self.path / (key + self.SUFFIX)
+        tmp_path = entry_path.with_name(f"{entry_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+        with pa.OSFile(str(tmp_path), "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        os.replace(tmp_path, entry_path)
+        self.evict()
+
+
+    def evict (
+        self
+        ) -> None:
+        """
+Evict the least recently used entries until the total size of the
+cache fits within `max_bytes`.
+        """
+        with self._lock:
+            entries = []
+
+            for entry_path in self.path.glob("*" + self.SUFFIX):
+                try:
+                    stat = entry_path.stat()
+                    entries.append(( stat.st_mtime_ns, stat.st_size, entry_path, ))
+                except FileNotFoundError:
+                    pass
+
+            total = sum(size for _, size, _ in entries)
+
+            for _, size, entry_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+
+                entry_path.unlink(missing_ok=True)
+                total -= size
+                self.evictions += 1
+
+
+    def clear (
+        self
+        ) -> None:
+        """
+Remove all of the cache entries, and reset the counters.
+        """
+        with self._lock:
+            for entry_path in self.path.glob("*" + self.SUFFIX):
+                entry_path.unlink(missing_ok=True)
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
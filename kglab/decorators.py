@@ -7,7 +7,7 @@ Decorators:
   * `@multifile` handles specifying multiple paths in serialization methods.
 """
 
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from functools import wraps
 from glob import glob
 import inspect
@@ -34,6 +34,51 @@ test condition
     return isinstance(path, (pathlib.Path, apeye.url.URL))
 
 
+def _load_parallel (
+    f: typing.Any,
+    param_name: str,
+    bound_arguments: inspect.BoundArguments,
+    path_list: typing.List,
+    workers: int,
+    ) -> None:
+    """
+Semi-private function to call a read function on each file in a pool
+of worker processes, through the `_load_shard()` method of the instance
+which is its first argument, then merge the results in order.
+
+    f:
+read function, which is a method of the instance
+
+    param_name:
+parameter which gets set to each path
+
+    bound_arguments:
+arguments bound to the read function
+
+    path_list:
+paths of the files to read
+
+    workers:
+maximum number of worker processes
+    """
+    instance = bound_arguments.args[0]
+    config = instance._shard_config()  # pylint: disable=W0212
+    shard_args = []
+
+    for p in path_list:
+        bound_arguments.arguments[param_name] = str(p)
+        shard_args.append(( bound_arguments.args[1:], bound_arguments.kwargs, ))
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(path_list))) as pool:
+        futures = [
+            pool.submit(instance._load_shard, config, f.__name__, f_args, f_kwargs)  # pylint: disable=W0212
+            for f_args, f_kwargs in shard_args
+        ]
+
+        for future in futures:
+            instance._merge_shard(future.result())  # pylint: disable=W0212
+
+
 def multifile (
     param_name: str = "path",
     ) -> typing.Any:
@@ -41,6 +86,18 @@ def multifile (
 Creates a wrapper around a read function to read multiple files, given
 a glob pattern with at least one wildcard in the path.
 
+The wrapped function also accepts a `workers` keyword argument: when it
+is greater than `1`, the files get parsed in a pool of that many worker
+processes, then merged into the graph in order. This requires the
+instance to provide the `_shard_config()`, `_load_shard()`, and
+`_merge_shard()` methods of `SerdeMixin`. If the read function has its
+own `workers` parameter, then it parallelizes within each file instead,
+and the argument gets passed through.
+
+Each matched file gets passed to the read function by name, so that a
+pattern such as `"*.ttl.gz"` works with the readers which decompress
+their inputs.
+
     param_name:
 parameter to be overloaded
 
@@ -61,8 +118,15 @@ constructed decorator
         @wraps(f)
         def wrapper (  # pylint: disable=R1710
             *args: typing.Any,
+            workers: typing.Optional[int] = None,
             **kwargs: typing.Any,
             ) -> typing.Any:
+            if "workers" in sig.parameters:
+                if workers is not None:
+                    kwargs["workers"] = workers
+
+                workers = None
+
             bound_arguments = sig.bind(*args, **kwargs)
             bound_arguments.apply_defaults()
 
@@ -78,17 +142,19 @@ constructed decorator
                 # initialize the path list with a parsed glob
                 path_list = glob(path)
 
-            # handle single Path objects by the default function
-            elif _test_path(path):
+            # handle single Path objects and file-like objects by the
+            # default function
+            elif _test_path(path) or hasattr(path, "read"):
                 return f(*args, **kwargs)
 
             # handle a list of Path objects
             elif isinstance(path, list):
-                for p in path:
-                    if _test_path(path):
-                        path_list.append(p)
-                    else:
-                        raise ValueError(f"Invalid path: {p}")
+                invalid = [ p for p in path if not (_test_path(p) or isinstance(p, str)) ]
+
+                if len(invalid) > 0:
+                    raise ValueError(f"Invalid path: {invalid[0]}")
+
+                path_list = list(path)
             else:
                 raise ValueError(
                     f"{path} is not a valid string, Path, or list of Paths"
@@ -98,13 +164,19 @@ constructed decorator
             if len(path_list) == 0:
                 raise ValueError(f"No files found in given path list: {path}")
 
+            # parse the files in a process pool, then merge the results
+            # in order
+            if workers is not None and workers > 1 and len(path_list) > 1:
+                _load_parallel(f, param_name, bound_arguments, path_list, workers)
+                return
+
             # iterate through each path in the glob
             for p in path_list:
                 # set the path variable
                 bound_arguments.arguments[param_name] = str(p)
 
                 # call the underlying reader function
-                p_result = f(*bound_arguments.args, **deepcopy(bound_arguments.kwargs))  # pylint: disable=W0612
+                p_result = f(*bound_arguments.args, **bound_arguments.kwargs)  # pylint: disable=W0612
 
         return wrapper
 
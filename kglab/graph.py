@@ -8,7 +8,11 @@ see license https://github.com/DerwenAI/kglab#license-and-copyright
 """
 
 from dataclasses import dataclass
-import inspect
+import gc
+import itertools
+import json
+import pathlib
+import shutil
 import typing
 
 from cryptography.hazmat.primitives import hashes  # type: ignore  # pylint: disable=E0401
@@ -16,9 +20,12 @@ from icecream import ic  # type: ignore  # pylint: disable=E0401,W0611
 import chocolate  # type: ignore  # pylint: disable=E0401
 import numpy as np  # type: ignore  # pylint: disable=E0401
 
-from rdflib.store import Store  # type: ignore # pylint: disable=E0401
+from rdflib.store import Store, NO_STORE, VALID_STORE  # type: ignore # pylint: disable=E0401
 import rdflib  # type: ignore  # pylint: disable=E0401
 
+from .tables import ChangeLog, ContextRegistry, TermTables, TripleTable, TupleIndex, _save_json
+from .util import ReadWriteLock
+
 
 @dataclass(frozen=True)
 class NodeRef:
@@ -30,33 +37,352 @@ Represent a reference to a Node within this store.
     node_id: int
 
 
-class PropertyStore (Store):
+class BatchStore (Store):  # pylint: disable=W0223
+    """
+A proxy `rdflib.Store` to use as the store of a parser's sink, which
+buffers the added statements then flushes them in batches to the
+`addN()` method of the store of a target graph, to use its bulk path.
+Parsers which write to the store directly, such as those for the N3
+and quad formats, get buffered the same way as those which call the
+`add()` method of the sink.
+
+The contexts which the parsers create on this proxy get mapped by
+their identifiers to contexts on the target store, and the statements
+get flushed before any other access, so that reads see them.
+    """
+    context_aware: bool = True
+    formula_aware: bool = True
+    graph_aware: bool = True
+
+    def __init__ (
+        self,
+        target: rdflib.Graph,
+        *,
+        batch_size: int = 65536,
+        ) -> None:
+        """
+Instance constructor.
+
+    target:
+the graph whose store receives the statements
+
+    batch_size:
+number of statements to buffer between each flush
+        """
+        super().__init__()
+        self._target: rdflib.Graph = target
+        self._batch_size: int = batch_size
+        self._buffer: typing.List[ typing.Tuple ] = []
+        self._contexts: typing.Dict[ typing.Any, rdflib.Graph ] = {}
+
+
+    def _context (
+        self,
+        context: typing.Optional[ rdflib.Graph ],
+        ) -> typing.Optional[ rdflib.Graph ]:
+        """
+Map a context on this proxy to the context on the target store which
+has the same identifier.
+        """
+        if context is None:
+            return None
+
+        if isinstance(context, rdflib.graph.QuotedGraph):
+            raise rdflib.exceptions.ParserError("The target store does not support quoted statements")
+
+        if context.identifier == self._target.identifier:
+            return self._target
+
+        graph = self._contexts.get(context.identifier)
+
+        if graph is None:
+            graph = rdflib.Graph(
+                store=self._target.store,
+                identifier=context.identifier,
+                namespace_manager=self._target.namespace_manager,
+            )
+
+            self._contexts[context.identifier] = graph
+
+        return graph
+
+
+    def add (  # type: ignore # pylint: disable=W0221
+        self,
+        triple: typing.Tuple,
+        context: typing.Optional[ rdflib.Graph ] = None,
+        quoted: bool = False,  # pylint: disable=W0613
+        ) -> None:
+        """
+Buffer a statement, flushing the buffer when it becomes full.
+        """
+        s, p, o = triple
+        self._buffer.append(( s, p, o, self._context(context), ))
+
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+
+    def addN (  # type: ignore # pylint: disable=C0103
+        self,
+        quads: typing.Iterable[ typing.Tuple ],
+        ) -> None:
+        """
+Buffer each of the statements, flushing the buffer when it becomes
+full.
+        """
+        for s, p, o, context in quads:
+            self.add(( s, p, o, ), context)
+
+
+    def flush (
+        self
+        ) -> None:
+        """
+Flush the buffered statements to the target store.
+        """
+        if len(self._buffer) > 0:
+            buffer, self._buffer = self._buffer, []
+            self._target.store.addN(buffer)
+
+
+    def remove (  # type: ignore # pylint: disable=W0221
+        self,
+        triple: typing.Tuple,
+        context: typing.Optional[ rdflib.Graph ] = None,
+        ) -> None:
+        """
+Remove the triples matching the pattern from the target store.
+        """
+        self.flush()
+        self._target.store.remove(triple, context=self._context(context))
+
+
+    def triples (  # type: ignore # pylint: disable=W0221
+        self,
+        triple_pattern: typing.Tuple,
+        context: typing.Optional[ rdflib.Graph ] = None,
+        ) -> typing.Iterator:
+        """
+A generator over the triples in the target store which match the
+pattern.
+        """
+        self.flush()
+        yield from self._target.store.triples(triple_pattern, context=self._context(context))
+
+
+    def __len__ (  # type: ignore # pylint: disable=W0221
+        self,
+        context: typing.Optional[ rdflib.Graph ] = None,
+        ) -> int:
+        """
+Number of statements in the target store, or in one of its contexts.
+        """
+        self.flush()
+        return self._target.store.__len__(context=self._context(context))
+
+
+    def contexts (  # type: ignore # pylint: disable=W0221
+        self,
+        triple: typing.Optional[ typing.Tuple ] = None,
+        ) -> typing.Iterator:
+        """
+A generator over the contexts in the target store.
+        """
+        self.flush()
+        yield from self._target.store.contexts(triple)
+
+
+    def add_graph (
+        self,
+        graph: rdflib.Graph,
+        ) -> None:
+        """
+Add a graph to the target store, as an empty context.
+        """
+        self._target.store.add_graph(self._context(graph))
+
+
+    def remove_graph (
+        self,
+        graph: rdflib.Graph,
+        ) -> None:
+        """
+Remove a graph from the target store, along with all of its triples.
+        """
+        self.flush()
+        self._target.store.remove_graph(self._context(graph))
+
+
+    def bind (  # pylint: disable=W0221
+        self,
+        prefix: str,
+        namespace: str,
+        override: bool = True,
+        ) -> None:
+        """
+Bind a prefix to a namespace in the target graph.
+        """
+        self._target.namespace_manager.bind(prefix, namespace, override=override)
+
+
+    def namespace (
+        self,
+        prefix: str,
+        ) -> typing.Optional[str]:
+        """
+Look up the namespace bound to a prefix in the target store.
+        """
+        return self._target.store.namespace(prefix)
+
+
+    def prefix (
+        self,
+        namespace: str,
+        ) -> typing.Optional[str]:
+        """
+Look up the prefix bound to a namespace in the target store.
+        """
+        return self._target.store.prefix(namespace)
+
+
+    def namespaces (
+        self
+        ) -> typing.Iterator:
+        """
+A generator over the namespace bindings in the target store.
+        """
+        yield from self._target.store.namespaces()
+
+
+class BatchGraph (rdflib.Graph):
+    """
+A proxy `rdflib.Graph` to use as the sink for a parser, backed by a
+`BatchStore` which buffers the parsed statements then flushes them in
+batches to the store of a target graph, to use its bulk path.
+    """
+
+    def __init__ (
+        self,
+        target: rdflib.Graph,
+        *,
+        batch_size: int = 65536,
+        ) -> None:
+        """
+Instance constructor.
+
+    target:
+the graph which receives the triples
+
+    batch_size:
+number of statements to buffer between each flush
+        """
+        super().__init__(
+            store=BatchStore(target, batch_size=batch_size),
+            identifier=target.identifier,
+            namespace_manager=target.namespace_manager,
+        )
+
+
+    def flush (
+        self
+        ) -> None:
+        """
+Flush the buffered statements to the target graph.
+        """
+        self.store.flush()
+
+
+class PropertyStore (Store):  # pylint: disable=R0904
     """
 A subclass of `rdflib.Store` to use as a plugin, integrating the W3C stack.
+
+The tuples get stored in a columnar `TripleTable`, with the names of
+nodes and relations interned as integer ids in `TermTables`, and
+literals interned in a `LiteralTable` which preserves datatypes and
+languages. Within the `TupleIndex`, a `RowIndex` hash table of row
+indexes provides constant time lookup of each tuple for deduplication
+and removal, and `addN()` provides a vectorized path for adding
+batches of triples.
+A `ContextRegistry` keeps a count of the triples in each context,
+so that the store can be used by `rdflib.ConjunctiveGraph` and
+`rdflib.Dataset` without scanning its tuples.
+Optionally, the store maintains *SPO*, *POS*, and *OSP* permutation
+indexes as sorted arrays of row indexes, so that `triples()` resolves
+any pattern which has a bound term through a range lookup, rather than
+scanning every tuple.
+Removed tuples get discarded in place, and the table gets compacted
+once they make up a quarter of its rows.
+
+Given a directory path as its `configuration`, the store persists to
+disk: `commit()` writes the columns, term dictionaries, and sorted
+permutation indexes as `.npy` files, which `open()` memory-maps rather
+than reading, so that opening a large graph takes milliseconds and
+several read-only processes can share the same pages through the OS
+cache. The first modification copies the tuples into memory and builds
+the hash table of their rows.
+
+Changes get committed as they are made, unless `begin()` opens a
+transaction, which lasts until `commit()` or `rollback()`, using an
+undo log; the optional BLAKE2b `digest` gets updated once for each
+committed change or transaction.
+Separately, named marks in a change log let `changes_since()` report
+the net changes after each mark, across transactions, which is how
+`save_parquet(mode="append")` writes only the changed triples.
+
+The `lock` attribute is a `ReadWriteLock` which lets many threads read
+concurrently while a writer appends: each call to `triples()` sees a
+consistent view, and each batch of `addN()` gets added atomically.
     """
+    FORMAT_VERSION: int = 1
+    META_FILE: str = "meta.json"
+
 
     def __init__ (
         self,
         configuration: typing.Optional[str] = None,
         identifier: typing.Optional[str] = None,
+        *,
+        indexed: bool = True,
         ) -> None:
         """
 Instance constructor.
-        """
-        if configuration is not None:
-            ic(configuration)
 
-        super().__init__(configuration)
+    configuration:
+optional path for a directory in which to persist the store, which gets opened if it exists, or otherwise created
+
+    indexed:
+maintain the permutation indexes used to match triple patterns; defaults to `True`
+        """
+        super().__init__()
 
         self.identifier = identifier
         self.digest: typing.Optional[ hashes.Hash ] = None
+        self.lock: ReadWriteLock = ReadWriteLock()
 
         self.__namespace: dict = {}
         self.__prefix: dict = {}
 
-        self._tuples: list = []
-        self._node_names: np.array = np.empty(shape=[0, 1], dtype=object)  # type: ignore
-        self._rel_names: np.array = np.empty(shape=[0, 1], dtype=object)  # type: ignore
+        self._index: TupleIndex = TupleIndex(indexed=indexed)
+        self._terms: TermTables = TermTables()
+        self._contexts: ContextRegistry = ContextRegistry()
+
+        # undo log of the transaction opened by `begin()`, if any, and
+        # the change log for the named marks; see `mark_changes()`
+        self._changes: ChangeLog = ChangeLog()
+
+        # directory in which the store persists, if any
+        self._path: typing.Optional[ pathlib.Path ] = None
+
+        if configuration is not None:
+            self.open(configuration, create=True)
+
+
+    BATCH_SIZE: int = 65536
+
+    context_aware: bool = True
+    graph_aware: bool = True
+    transaction_aware: bool = True
 
 
 ######################################################################
@@ -82,15 +408,7 @@ which is a private member of rdflib.Graph.
 An accessor method to map from the unique name of a node to its
 `node_id` index.
         """
-        rows = np.where(self._node_names == node_name)
-
-        if len(rows[0]) < 1:
-            self._node_names = np.append(self._node_names, node_name)
-            node_id = len(self._node_names) - 1
-        else:
-            node_id = rows[0][0]
-
-        return node_id
+        return self._terms.nodes.get_id(node_name)
 
 
     def get_node_name (
@@ -101,7 +419,7 @@ An accessor method to map from the unique name of a node to its
 An accessor method to map from the `node_id` index of a node to its
 unique name.
         """
-        return self._node_names[node_id]  # type: ignore
+        return self._terms.nodes.get_name(node_id)
 
 
     def get_rel_id (
@@ -112,15 +430,7 @@ unique name.
 An accessor method to map from a unique name of a relation to its
 `rel_id` index.
         """
-        rows = np.where(self._rel_names == rel_name)
-
-        if len(rows[0]) < 1:
-            self._rel_names = np.append(self._rel_names, rel_name)
-            rel_id = len(self._rel_names) - 1
-        else:
-            rel_id = rows[0][0]
-
-        return rel_id
+        return self._terms.rels.get_id(rel_name)
 
 
     def get_rel_name (
@@ -131,7 +441,37 @@ An accessor method to map from a unique name of a relation to its
 An accessor method to map from the `rel_id` index of a relation to its
 unique name.
         """
-        return self._rel_names[rel_id]  # type: ignore
+        return self._terms.rels.get_name(rel_id)
+
+
+    @classmethod
+    def _node_key (
+        cls,
+        node: typing.Any,
+        ) -> str:
+        """
+Map from a node supplied by `RDFlib` to its name in the dictionary of
+nodes, where blank nodes get distinguished from IRIs by a `_:` prefix.
+        """
+        if isinstance(node, rdflib.term.BNode):
+            return "_:" + node
+
+        return str(node)
+
+
+    @classmethod
+    def _node_ref (
+        cls,
+        node_name: str,
+        ) -> typing.Any:
+        """
+Map from the name of a node in the dictionary of nodes back to its
+`RDFlib` term.
+        """
+        if node_name.startswith("_:"):
+            return rdflib.term.BNode(node_name[2:])
+
+        return rdflib.term.URIRef(node_name)
 
 
     def build_tuple (
@@ -142,21 +482,18 @@ unique name.
         context,
         ) -> typing.Tuple:
         """
-Compose a tuple from the inputs supplied by `RDFlib`.
+Compose a tuple of integer ids from the inputs supplied by `RDFlib`.
         """
-        if context is None:
-            c = None
-        else:
-            c = str(context.identifier)  # type: ignore
-
-        src_id = self.get_node_id(str(s))
+        src_id = self.get_node_id(self._node_key(s))
         rel_id = self.get_rel_id(str(p))
+        ctx_id = self._register_context(context)
 
         if isinstance(o, rdflib.term.Literal):
-            _tuple = ( src_id, rel_id, str(o), True, c)
+            dst_id = self._terms.literals.get_id(o)
+            _tuple = ( src_id, rel_id, dst_id, True, ctx_id, )
         else:
-            dst_id = self.get_node_id(str(o))
-            _tuple = ( src_id, rel_id, dst_id, False, c)  # type: ignore
+            dst_id = self.get_node_id(self._node_key(o))
+            _tuple = ( src_id, rel_id, dst_id, False, ctx_id, )
 
         return _tuple
 
@@ -168,13 +505,127 @@ Compose a tuple from the inputs supplied by `RDFlib`.
         """
 Locate the given tuple in the data, returning `-1` if not found.
         """
-        try:
-            idx = self._tuples.index(_tuple)
-        except ValueError as ex:  # pylint: disable=W0612
-            # triple does not exist
-            idx = -1
+        return self._index.find(_tuple)
+
+
+    def _encode_pattern (
+        self,
+        s: typing.Any,
+        p: typing.Any,
+        o: typing.Any,
+        ) -> typing.Optional[ typing.Tuple ]:
+        """
+Encode the bound terms of a triple pattern as the ids used within the
+tuples, leaving unbound terms as `None`.
+
+    returns:
+the encoded `(src, rel, obj)` pattern, or `None` if any bound term is not in the store, so that nothing can match
+        """
+        src = rel = obj = None
+
+        if s is not None:
+            src = self._terms.nodes.get_id(self._node_key(s), create=False)
+
+            if src < 0:
+                return None
+
+        if p is not None:
+            rel = self._terms.rels.get_id(str(p), create=False)
+
+            if rel < 0:
+                return None
+
+        if o is not None:
+            if isinstance(o, rdflib.term.Literal):
+                dst = self._terms.literals.get_id(o, create=False)
+
+                if dst < 0:
+                    return None
+
+                obj = ( dst, True, )
+            else:
+                dst = self._terms.nodes.get_id(self._node_key(o), create=False)
+
+                if dst < 0:
+                    return None
+
+                obj = ( dst, False, )
+
+        return src, rel, obj
+
+
+    def _register_context (
+        self,
+        context: typing.Optional[ rdflib.Graph ],
+        ) -> int:
+        """
+Register a context supplied by `RDFlib` in the registry of contexts.
+
+    returns:
+the context id
+        """
+        ctx, registered = self._contexts.register(context)
+
+        if registered:
+            self._log("graph", [ ( ctx, None, ) ])
 
-        return idx
+        return ctx
+
+
+    def _decode_tuple (
+        self,
+        _tuple: typing.Tuple,
+        ) -> typing.Tuple:
+        """
+Decode a tuple back into the `RDFlib` terms for its triple.
+        """
+        src, rel, dst, o_lit, _ = _tuple
+
+        if o_lit:
+            dst_ref: typing.Any = self._terms.literals.get_term(dst)
+        else:
+            dst_ref = self._node_ref(self.get_node_name(dst))
+
+        return (
+            self._node_ref(self.get_node_name(src)),
+            rdflib.term.URIRef(self.get_rel_name(rel)),
+            dst_ref,
+        )
+
+
+    def _insert (
+        self,
+        _tuple: typing.Tuple,
+        ) -> None:
+        """
+Append a tuple which is not already in the store.
+        """
+        self._index.insert(_tuple)
+        self._contexts.counts[_tuple[4]] += 1
+
+
+    def _delete (
+        self,
+        _tuple: typing.Tuple,
+        ) -> None:
+        """
+Delete a tuple from the store.
+        """
+        self._index.delete(_tuple)
+        self._contexts.counts[_tuple[4]] -= 1
+
+
+    def _log (
+        self,
+        op: str,
+        items: typing.List,
+        ) -> None:
+        """
+Record changes in the change log; outside of a transaction, the
+changes get committed to the digest at once.
+        """
+        if not self._changes.record(op, items):
+            self._update_digest([ ( op, items, ) ])
 
 
     def add (  # type: ignore # pylint: disable=W0221
@@ -196,24 +647,90 @@ argument be `True`.
 It should also be an error for the quoted argument to be `True` when
 the store is not formula-aware.
         """
-        s, p, o = triple  # pylint: disable=W0612
-        _tuple = self.build_tuple(str(s), str(p), o, context)
-        idx = self._find(_tuple)
+        with self.lock.write():
+            self._modify()
 
-        if idx < 0:
-            self._tuples.append(_tuple)
+            s, p, o = triple  # pylint: disable=W0612
+            _tuple = self.build_tuple(s, p, o, context)
 
-            # update digest
-            if self.digest is not None:
-                self.digest.update(inspect.currentframe().f_code.co_name.encode("utf-8"))  # type: ignore
-                self.digest.update(str(s).encode("utf-8"))
-                self.digest.update(str(p).encode("utf-8"))
-                self.digest.update(str(o).encode("utf-8"))
+            if self._find(_tuple) < 0:
+                self._insert(_tuple)
+                self._log("add", [ TripleTable.pack_key(_tuple) ])
+
+
+    def addN (  # type: ignore # pylint: disable=C0103
+        self,
+        quads: typing.Iterable[ typing.Tuple ],
+        ) -> None:
+        """
+Adds each item in the list of statements to a specific context, in
+batches of `BATCH_SIZE` quads: each batch gets encoded and deduplicated
+in one vectorized pass, then appended in a single operation.
+        """
+        quad_iter = iter(quads)
 
-                c = _tuple[4]
+        # the batches allocate many objects without any reference
+        # cycles, so suspend the garbage collector meanwhile
+        gc_enabled = gc.isenabled()
+        gc.disable()
 
-                if c is not None:
-                    self.digest.update(c.encode("utf-8"))
+        try:
+            for batch in iter(lambda: list(itertools.islice(quad_iter, self.BATCH_SIZE)), []):
+                with self.lock.write():
+                    self._add_batch(batch)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+
+    def _add_batch (
+        self,
+        batch: typing.List[ typing.Tuple ],
+        ) -> None:
+        """
+Add one batch of quads supplied by `RDFlib`.
+        """
+        self._modify()
+
+        num_quads = len(batch)
+        ctx_ids: typing.Dict[ int, int ] = {}
+
+        # a batch typically has only one context, so key on object identity
+        for _, _, _, context in batch:
+            if id(context) not in ctx_ids:
+                ctx_ids[id(context)] = self._register_context(context)
+
+        bnode = rdflib.term.BNode
+        src = self._terms.nodes.get_ids([ "_:" + s if isinstance(s, bnode) else str(s) for s, _, _, _ in batch ])
+        rel = self._terms.rels.get_ids([ str(p) for _, p, _, _ in batch ])
+        lit = np.fromiter((isinstance(o, rdflib.term.Literal) for _, _, o, _ in batch), dtype=np.bool_, count=num_quads)
+        ctx = np.fromiter((ctx_ids[id(c)] for _, _, _, c in batch), dtype=np.int64, count=num_quads)
+
+        # literal and node objects get interned in separate dictionaries
+        lit_rows = np.flatnonzero(lit)
+        node_rows = np.flatnonzero(~lit)
+
+        dst = np.empty(num_quads, dtype=np.int64)
+        dst[lit_rows] = self._terms.literals.get_ids([ batch[i][2] for i in lit_rows.tolist() ])
+        dst[node_rows] = self._terms.nodes.get_ids([ self._node_key(batch[i][2]) for i in node_rows.tolist() ])
+
+        # deduplicate within the batch, keeping the first occurrences
+        words = TripleTable.pack_columns(src, rel, dst, lit, ctx)
+        _, first = np.unique(words, axis=0, return_index=True)
+        first.sort()
+
+        # deduplicate against the store
+        rows = first[self._index.find_columns(src[first], rel[first], dst[first], lit[first], ctx[first]) < 0]
+
+        if len(rows) < 1:
+            return
+
+        self._index.extend(src[rows], rel[rows], dst[rows], lit[rows], ctx[rows])
+
+        for ctx_id, count in zip(*np.unique(ctx[rows], return_counts=True)):
+            self._contexts.counts[ctx_id] += int(count)
+
+        self._log("add", words[rows].view(np.dtype(( np.void, 16, ))).ravel().tolist())
 
 
     def remove (  # type: ignore # pylint: disable=W0221
@@ -225,24 +742,43 @@ the store is not formula-aware.
         """
 Remove the set of triples matching the pattern from the store.
         """
-        s, p, o = triple_pattern  # pylint: disable=W0612
-        _tuple = self.build_tuple(str(s), str(p), o, context)
-        idx = self._find(_tuple)
+        with self.lock.write():
+            tuples, _ = self._select(triple_pattern, context)
 
-        if idx >= 0:
-            del self._tuples[idx]
+            if len(tuples) < 1:
+                return
 
-            # update digest
-            if self.digest is not None:
-                self.digest.update(inspect.currentframe().f_code.co_name.encode("utf-8"))  # type: ignore
-                self.digest.update(str(s).encode("utf-8"))
-                self.digest.update(str(p).encode("utf-8"))
-                self.digest.update(str(o).encode("utf-8"))
+            self._modify()
 
-                c = _tuple[4]
+            for _tuple in tuples:
+                self._delete(_tuple)
 
-                if c is not None:
-                    self.digest.update(c.encode("utf-8"))
+            self._log("remove", tuples)
+
+
+    def _select (
+        self,
+        triple_pattern: typing.Tuple,
+        context: typing.Optional[ rdflib.Graph ],
+        ) -> typing.Tuple[ typing.List[ typing.Tuple ], typing.Optional[int] ]:
+        """
+Select the tuples which match a triple pattern and a context supplied
+by `RDFlib`.
+
+    returns:
+the list of matching tuples, and the encoded context
+        """
+        pattern = self._encode_pattern(*triple_pattern)
+
+        if pattern is None:
+            return [], None
+
+        ctx = self._contexts.encode(context)
+
+        if ctx is not None and ctx < 0:
+            return [], ctx
+
+        return self._index.match(*pattern, ctx), ctx
 
 
     def triples (  # type: ignore # pylint: disable=W0221
@@ -252,7 +788,9 @@ Remove the set of triples matching the pattern from the store.
         context: typing.Optional[ rdflib.term.URIRef ] = None,  # pylint: disable=W0613
         ) -> typing.Generator:
         """
-A generator over all the triples matching the pattern.
+A generator over all the triples matching the pattern. The tuples get
+matched under a read lock, then decoded after releasing it, so that
+each iteration sees a consistent view while writers append.
 
     triple_pattern:
 Can include any objects for used for comparing against nodes in the store, for example, REGEXTerm, URIRef, Literal, BNode, Variable, Graph, QuotedGraph, Date? DateRange?
@@ -260,41 +798,24 @@ Can include any objects for used for comparing against nodes in the store, for e
     context:
 A conjunctive query can be indicated by either providing a value of None, or a specific context can be queries by passing a Graph instance (if store is context aware).
         """
-        s, p, o = triple_pattern  # pylint: disable=W0612
+        with self.lock.read():
+            tuples, ctx = self._select(triple_pattern, context)
+            conjunctive = ctx is None and len(self._contexts) > 2
+            ctx_refs = list(self._contexts.refs)
 
-        if s is not None:
-            s = str(s)
+        # for a conjunctive query across several contexts, yield each
+        # triple once, along with all of the contexts that contain it
+        if conjunctive:
+            grouped: typing.Dict[ typing.Tuple, typing.List ] = {}
 
-        if p is not None:
-            p = str(p)
+            for _tuple in tuples:
+                grouped.setdefault(_tuple[:4], []).extend(ctx_refs[_tuple[4]])
 
-        if o is not None:
-            o = str(o)
-
-        if context is None:
-            c = None
+            for triple_ids, graphs in grouped.items():
+                yield self._decode_tuple(triple_ids + ( 0, )), graphs
         else:
-            c = str(context.identifier)  # type: ignore
-
-        #_tuple = ( s, p, o, o_lit, c, )
-
-        for src, rel, dst, o_lit, ctx in self._tuples:  # pylint: disable=R1702
-            if (s is None) or (s == src):
-                if (p is None) or (p == rel):
-                    if (o is None) or (o == dst):
-                        if (c is None) or (c == ctx):
-                            if o_lit:
-                                dst_ref: typing.Any = rdflib.term.Literal(dst)
-                            else:
-                                dst_ref = self.get_node_name(dst)
-
-                            triple_result = (
-                                rdflib.term.URIRef(self.get_node_name(src)),
-                                rdflib.term.URIRef(self.get_rel_name(rel)),
-                                dst_ref,
-                            )
-
-                            yield triple_result, self.__contexts()
+            for _tuple in tuples:
+                yield self._decode_tuple(_tuple), ctx_refs[_tuple[4]]
 
 
     def __len__ (  # type: ignore # pylint: disable=W0221,W0222
@@ -311,26 +832,408 @@ context given.
     context:
 a graph instance to query or None
         """
-        if context is None:
-            return len(self._tuples)
+        with self.lock.read():
+            if context is None:
+                return len(self._index)
+
+            ctx = self._contexts.encode(context)
+
+            if ctx is None or ctx < 0:
+                return 0
+
+            return self._contexts.counts[ctx]
+
+
+    def contexts (  # type: ignore # pylint: disable=W0221
+        self,
+        triple: typing.Optional[ typing.Tuple ] = None,
+        ) -> typing.Generator:
+        """
+A generator over all the contexts in the store, or if `triple` is
+specified, then only the contexts which contain that triple.
+        """
+        with self.lock.read():
+            if triple is None:
+                graphs = [ graph for graph in self._contexts.graphs[1:] if graph is not None ]
+            else:
+                tuples, _ = self._select(triple, None)
+                ctx_ids = { _tuple[4] for _tuple in tuples }
+                graphs = [ graph for ctx in sorted(ctx_ids) for graph in self._contexts.refs[ctx] ]
+
+        yield from graphs
+
+
+    def add_graph (
+        self,
+        graph: rdflib.Graph,
+        ) -> None:
+        """
+Add a graph to the store, as an empty context.
+        """
+        with self.lock.write():
+            self._register_context(graph)
+            self._changes.dirty = True
+
+
+    def remove_graph (
+        self,
+        graph: rdflib.Graph,
+        ) -> None:
+        """
+Remove a graph from the store, along with all of its triples.
+        """
+        with self.lock.write():
+            ctx = self._contexts.encode(graph)
+
+            if ctx is not None and ctx > 0:
+                self.remove(( None, None, None, ), context=graph)
+                self._log("graph", [ ( ctx, self._contexts.graphs[ctx], ) ])
+                self._contexts.set_graph(ctx, None)
+                self._changes.dirty = True
+
 
-        c = str(context.identifier)  # type: ignore
-        count = 0
+    def open (
+        self,
+        configuration: str,
+        create: bool = False,
+        ) -> typing.Optional[int]:
+        """
+Open the store persisted in the directory `configuration`, by
+memory-mapping its files; otherwise, if `create` is `True`, create the
+directory so that the store can be persisted there.
+
+    returns:
+`rdflib.store.VALID_STORE`, or `rdflib.store.NO_STORE` if there is no store and `create` is `False`
+        """
+        with self.lock.write():
+            path = pathlib.Path(configuration)
 
-        for _, _, _, _, ctx in self._tuples:
-            if c == ctx:
-                count += 1
+            if (path / self.META_FILE).exists():
+                self._load(path)
+            elif create:
+                path.mkdir(parents=True, exist_ok=True)
+                self._changes.dirty = True
+            else:
+                return NO_STORE
 
-        return count
+            self._path = path
 
+        return VALID_STORE
 
-    def __contexts (
+
+    def close (
+        self,
+        commit_pending_transaction: bool = False,
+        ) -> None:
+        """
+Close the store, after either committing or rolling back a transaction
+opened by `begin()`; the changes made outside of a transaction are
+already committed. A persisted store writes any remaining changes to
+its directory.
+        """
+        with self.lock.write():
+            if commit_pending_transaction:
+                self.commit()
+            else:
+                self.rollback()
+                self._persist()
+
+            self._path = None
+
+
+    @property
+    def in_transaction (
         self
-        ) -> typing.Iterable:
+        ) -> bool:
+        """
+Whether a transaction opened by `begin()` remains open.
+        """
+        return self._changes.undo is not None
+
+
+    def begin (
+        self
+        ) -> None:
+        """
+Open a transaction, which lasts until `commit()` or `rollback()`, so
+that its changes can be undone; otherwise, each change gets committed
+as it is made. A transaction which is already open continues.
         """
-Returns the set of contexts
+        with self.lock.write():
+            if self._changes.undo is None:
+                self._changes.undo = []
+
+
+    def commit (
+        self
+        ) -> None:
+        """
+Commit the open transaction, if any: the digest gets updated once for
+all of its changes, then its undo log gets dropped. A persisted store
+then writes itself to its directory.
+        """
+        with self.lock.write():
+            if self._changes.undo is not None:
+                self._update_digest(self._changes.undo)
+                self._changes.undo = None
+
+            self._persist()
+
+
+    def _update_digest (
+        self,
+        entries: typing.List[ typing.Tuple[ str, typing.List ] ],
+        ) -> None:
+        """
+Update the digest, if any, with a sequence of committed changes, in
+the form of the entries of the undo log.
+        """
+        if self.digest is None:
+            return
+
+        chunks: typing.List[bytes] = []
+
+        for op, items in entries:
+            if op == "add":
+                for key in items:
+                    chunks.extend(self._digest_chunks(b"add", TripleTable.unpack_key(key)))
+            elif op == "remove":
+                for _tuple in items:
+                    chunks.extend(self._digest_chunks(b"remove", _tuple))
+
+        if len(chunks) > 0:
+            self.digest.update(b"".join(chunks))
+
+
+    def rollback (
+        self
+        ) -> None:
+        """
+Roll back the open transaction, if any, by replaying its undo log in
+reverse. Any names interned meanwhile remain in the term dictionaries,
+and a context created meanwhile remains registered, as if removed.
         """
-        return { ctx for _, _, _, _, ctx in self._tuples }
+        with self.lock.write():
+            if self._changes.undo is None:
+                return
+
+            for op, items in reversed(self._changes.undo):
+                if op == "add":
+                    for key in reversed(items):
+                        self._delete(TripleTable.unpack_key(key))
+                elif op == "remove":
+                    for _tuple in reversed(items):
+                        self._insert(_tuple)
+                else:
+                    for ctx, graph in reversed(items):
+                        self._contexts.set_graph(ctx, graph)
+
+            self._changes.undo = None
+
+
+    def mark_changes (
+        self,
+        name: str,
+        position: typing.Optional[int] = None,
+        *,
+        replace: typing.Optional[str] = None,
+        ) -> int:
+        """
+Set a named mark in the change log, starting the log if needed, so
+that `changes_since()` can report the net changes to the store after
+that position, e.g., to save only the triples which changed since the
+last save.
+While any marks remain, the log persists across transactions, although
+it gets trimmed up to the earliest mark.
+
+    name:
+name of the mark
+
+    position:
+a position in the change log, as returned by `changes_since()`; defaults to the current position
+
+    replace:
+optional name of a previous mark to remove
+
+    returns:
+the position of the mark
+        """
+        with self.lock.write():
+            return self._changes.mark(name, position, replace)
+
+
+    def change_marks (
+        self
+        ) -> typing.List[str]:
+        """
+List the names of the marks in the change log; see `mark_changes()`.
+
+    returns:
+the names of the marks
+        """
+        with self.lock.read():
+            return list(self._changes.marks)
+
+
+    def unmark_changes (
+        self,
+        name: str,
+        ) -> None:
+        """
+Remove a named mark from the change log, which stops the log once no
+marks remain.
+
+    name:
+name of the mark
+        """
+        with self.lock.write():
+            self._changes.unmark(name)
+
+
+    def changes_since (
+        self,
+        name: str,
+        ) -> typing.Optional[ typing.Tuple[ int, typing.List[ typing.Tuple ], typing.List[ typing.Tuple ] ] ]:
+        """
+Report the net changes to the store since a named mark in the change
+log: an add and a remove of the same tuple cancel each other, and
+changes which have been rolled back get dropped.
+
+    name:
+name of the mark
+
+    returns:
+the current position in the change log, then the triples added since the mark which are still present, and the triples removed since the mark which are still absent; otherwise `None` if there is no mark with that name
+        """
+        with self.lock.read():
+            net_changes = self._changes.net_changes(name)
+
+            if net_changes is None:
+                return None
+
+            position, net = net_changes
+            added = []
+            removed = []
+
+            for key, is_add in net.items():
+                _tuple = TripleTable.unpack_key(key)
+                present = self._find(_tuple) >= 0
+
+                if is_add and present:
+                    added.append(self._decode_tuple(_tuple))
+                elif not is_add and not present:
+                    removed.append(self._decode_tuple(_tuple))
+
+            return position, added, removed
+
+
+    def _digest_chunks (
+        self,
+        op: bytes,
+        _tuple: typing.Tuple,
+        ) -> typing.List[bytes]:
+        """
+Serialize a change to a tuple as the chunks of bytes used to update
+the digest.
+        """
+        chunks = [ op ]
+        chunks.extend(str(term).encode("utf-8") for term in self._decode_tuple(_tuple))
+
+        ctx_name = self._contexts.names.get_name(_tuple[4])
+
+        if ctx_name is not None:
+            chunks.append(ctx_name.encode("utf-8"))
+
+        return chunks
+
+
+    def _persist (
+        self
+        ) -> None:
+        """
+Write the store to its directory, if it is persisted and has changed.
+        """
+        if self._path is not None and self._changes.dirty:
+            self._save(self._path)
+            self._changes.dirty = False
+
+
+    def destroy (
+        self,
+        configuration: str,
+        ) -> None:
+        """
+Delete the store persisted in the directory `configuration`, if any.
+        """
+        path = pathlib.Path(configuration)
+
+        if (path / self.META_FILE).exists():
+            shutil.rmtree(path)
+
+        if self._path == path:
+            self._path = None
+
+
+    def _save (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Write the tuples, sorted permutations, term dictionaries, and metadata
+of the store into the directory `path`.
+        """
+        path.mkdir(parents=True, exist_ok=True)
+
+        # the files of memory-mapped tuples are already in place
+        if not self._index.table.mapped or path != self._path:
+            self._index.save(path)
+
+        self._terms.save(path)
+
+        _save_json(path / self.META_FILE, {
+            "version": self.FORMAT_VERSION,
+            "size": len(self._index),
+            "contexts": self._contexts.to_meta(),
+            "ctx_counts": self._contexts.counts,
+            "namespaces": self.__namespace,
+        })
+
+
+    def _load (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Load the store persisted in the directory `path`, memory-mapping its
+tuples, sorted permutations, and term dictionaries; otherwise throws a
+`ValueError` exception if the files use an unknown format version.
+        """
+        with open(path / self.META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("version") != self.FORMAT_VERSION:
+            raise ValueError(f"unknown format version for a store: {meta.get('version')}")
+
+        # the marks in the change log no longer apply
+        self._changes = ChangeLog()
+
+        self._index = TupleIndex.load(path, indexed=self._index.indexed)
+        self._terms = TermTables.load(path)
+        self._contexts = ContextRegistry.from_meta(meta["contexts"], meta["ctx_counts"], self)
+
+        self.__namespace = dict(meta["namespaces"])
+        self.__prefix = { namespace: prefix for prefix, namespace in self.__namespace.items() }
+
+
+    def _modify (
+        self
+        ) -> None:
+        """
+Prepare to modify the store: memory-mapped tuples get copied into
+memory, then the hash table of their rows gets built.
+        """
+        self._changes.dirty = True
+        self._index.materialize()
 
 
     def bind (  # pylint: disable=W0221
@@ -341,8 +1244,10 @@ Returns the set of contexts
         """
 Foo.
         """
-        self.__prefix[namespace] = prefix
-        self.__namespace[prefix] = namespace
+        with self.lock.write():
+            self.__prefix[namespace] = prefix
+            self.__namespace[prefix] = namespace
+            self._changes.dirty = True
 
 
     def namespace (
@@ -431,3 +1336,12 @@ Values other than None obviously only makes sense for context-aware stores.)
             queryGraph,
             **chocolate.filter_args(kwargs, super().update),
         )
+
+
+## register as an `rdflib` store plugin, for use as `KnowledgeGraph(store="kglab")`
+rdflib.plugin.register(
+    "kglab",
+    Store,
+    "kglab.graph",
+    "PropertyStore",
+)
@@ -0,0 +1,1190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# see license https://github.com/DerwenAI/kglab#license-and-copyright
+
+"""
+Compact binary format for RDF graphs, in the style of
+[HDT](https://www.rdfhdt.org/): a sorted term dictionary with front
+coding, plus the triples as bitmap-compressed arrays of term IDs.
+"""
+
+import json
+import mmap
+import typing
+
+import numpy as np  # type: ignore  # pylint: disable=E0401
+import rdflib  # type: ignore  # pylint: disable=E0401
+
+from .pkg_types import IOPathLike, RDF_Node, RDF_Triple
+
+
+class FrontCodedDictionary:
+    """
+One section of the term dictionary: a sorted list of strings, split
+into blocks where the first string gets stored in full, then each of
+the following strings gets stored as the length of the prefix which it
+shares with the previous string, plus the remaining suffix.
+An array of block offsets allows for lookups in either direction
+without decoding more than one block.
+    """
+
+    def __init__ (
+        self,
+        offsets: np.ndarray,
+        data: typing.Union[ bytes, memoryview ],
+        count: int,
+        block_size: int,
+        ) -> None:
+        """
+Constructor for a dictionary section, which reads from its encoded
+buffers without copying them.
+
+    offsets:
+start offset of each block in `data`, followed by the length of `data`
+
+    data:
+the encoded blocks
+
+    count:
+number of strings in the section
+
+    block_size:
+number of strings in each block
+        """
+        self.offsets: np.ndarray = offsets
+        self.data: typing.Union[ bytes, memoryview ] = data
+        self.count: int = count
+        self.block_size: int = block_size
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of strings in the section.
+        """
+        return self.count
+
+
+    @classmethod
+    def encode (
+        cls,
+        values: typing.List[str],
+        block_size: int,
+        ) -> typing.Tuple[ np.ndarray, bytes ]:
+        """
+Encode a sorted list of strings.
+Since UTF-8 preserves the order of code points, the strings also stay
+sorted as bytes.
+
+    values:
+the sorted strings
+
+    block_size:
+number of strings in each block
+
+    returns:
+the block offsets, and the encoded blocks
+        """
+        data = bytearray()
+        offsets = []
+        prev = b""
+
+        for i, value in enumerate(values):
+            key = value.encode("utf-8")
+
+            if i % block_size == 0:
+                offsets.append(len(data))
+                _write_vbyte(data, len(key))
+                data += key
+            else:
+                prefix = 0
+                limit = min(len(key), len(prev))
+
+                while prefix < limit and key[prefix] == prev[prefix]:
+                    prefix += 1
+
+                _write_vbyte(data, prefix)
+                _write_vbyte(data, len(key) - prefix)
+                data += key[prefix:]
+
+            prev = key
+
+        offsets.append(len(data))
+
+        return np.array(offsets, dtype=np.uint64), bytes(data)
+
+
+    def _block (
+        self,
+        block: int,
+        ) -> typing.Iterator[bytes]:
+        """
+Decode the strings in one block, in order.
+
+    block:
+index of the block
+
+    yields:
+each string, as UTF-8 bytes
+        """
+        start = int(self.offsets[block])
+        data = bytes(self.data[start:int(self.offsets[block + 1])])
+        count = min(self.block_size, self.count - block * self.block_size)
+
+        length, pos = _read_vbyte(data, 0)
+        prev = data[pos:pos + length]
+        pos += length
+        yield prev
+
+        for _ in range(count - 1):
+            prefix, pos = _read_vbyte(data, pos)
+            length, pos = _read_vbyte(data, pos)
+            prev = prev[:prefix] + data[pos:pos + length]
+            pos += length
+            yield prev
+
+
+    def __iter__ (
+        self
+        ) -> typing.Iterator[str]:
+        """
+Iterate through all of the strings in the section, in order.
+        """
+        for block in range(len(self.offsets) - 1):
+            for key in self._block(block):
+                yield key.decode("utf-8")
+
+
+    def extract (
+        self,
+        index: int,
+        ) -> str:
+        """
+Lookup the string at an index in the section.
+
+    index:
+position of the string in the section
+
+    returns:
+the string
+        """
+        block, pos = divmod(index, self.block_size)
+
+        for i, key in enumerate(self._block(block)):
+            if i == pos:
+                return key.decode("utf-8")
+
+        raise IndexError(index)
+
+
+    def locate (
+        self,
+        value: str,
+        ) -> typing.Optional[int]:
+        """
+Lookup the index of a string in the section, with a binary search over
+the first strings of the blocks, then a scan within one block.
+
+    value:
+the string to find
+
+    returns:
+position of the string in the section; otherwise `None`
+        """
+        key = value.encode("utf-8")
+        lo = 0
+        hi = len(self.offsets) - 2
+
+        # find the last block which starts at or before the key
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            start = int(self.offsets[mid])
+            length, pos = _read_vbyte(self.data, start)
+
+            if bytes(self.data[pos:pos + length]) <= key:
+                lo = mid
+            else:
+                hi = mid - 1
+
+        if hi < 0:
+            return None
+
+        for i, found in enumerate(self._block(lo)):
+            if found == key:
+                return lo * self.block_size + i
+
+            if found > key:
+                break
+
+        return None
+
+
+class BitmapTriples:
+    """
+The triples section: the predicate for each distinct subject and
+predicate pair, then the object for each triple, along with two bitmaps
+which mark where each subject's list of pairs, and where each pair's
+list of objects, ends.
+The bitmaps get indexed on the first pattern which needs them.
+    """
+
+    def __init__ (
+        self,
+        y: np.ndarray,
+        by: np.ndarray,
+        z: np.ndarray,
+        bz: np.ndarray,
+        ) -> None:
+        """
+Constructor for the triples section, which reads from its arrays
+without copying them.
+
+    y:
+the predicate ID of each pair
+
+    by:
+the packed bitmap which marks the last pair of each subject
+
+    z:
+the object ID of each triple
+
+    bz:
+the packed bitmap which marks the last triple of each pair
+        """
+        self.y: np.ndarray = y
+        self.z: np.ndarray = z
+        self._by: np.ndarray = by
+        self._bz: np.ndarray = bz
+        self._y_offsets: typing.Optional[np.ndarray] = None
+        self._z_offsets: typing.Optional[np.ndarray] = None
+
+
+    @classmethod
+    def _bitmap_offsets (
+        cls,
+        bitmap: np.ndarray,
+        count: int,
+        ) -> np.ndarray:
+        """
+Index a bitmap, by converting the positions of its set bits into the
+start offsets of the lists which they end.
+
+    bitmap:
+the packed bitmap
+
+    count:
+number of bits in the bitmap
+
+    returns:
+the start offset of each list, followed by `count`
+        """
+        bits = np.unpackbits(bitmap, count=count)
+        return np.concatenate(( [ 0 ], np.flatnonzero(bits) + 1 )).astype(np.int64)
+
+
+    @property
+    def y_offsets (
+        self
+        ) -> np.ndarray:
+        """
+Start offset of the pairs for each subject ID; the subject ID is the
+index, and the last entry is the number of pairs.
+        """
+        if self._y_offsets is None:
+            self._y_offsets = self._bitmap_offsets(self._by, len(self.y))
+
+        return self._y_offsets
+
+
+    @property
+    def z_offsets (
+        self
+        ) -> np.ndarray:
+        """
+Start offset of the objects for each subject and predicate pair; the
+pair is the index, and the last entry is the number of triples.
+        """
+        if self._z_offsets is None:
+            self._z_offsets = self._bitmap_offsets(self._bz, len(self.z))
+
+        return self._z_offsets
+
+
+    def expand (
+        self,
+        pairs: np.ndarray,
+        ) -> typing.Tuple[ np.ndarray, np.ndarray ]:
+        """
+Expand subject and predicate pairs into the positions of their triples.
+
+    pairs:
+positions of the pairs
+
+    returns:
+the position of each triple, and of its pair
+        """
+        z_offsets = self.z_offsets
+        starts = z_offsets[pairs]
+        counts = z_offsets[pairs + 1] - starts
+        total = int(counts.sum())
+
+        triple_pairs = np.repeat(pairs, counts)
+        triples = np.arange(total, dtype=np.int64) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+
+        return triples, triple_pairs
+
+
+class HDTFile:
+    """
+Read-only access to an RDF graph in the compact binary format which
+[`KnowledgeGraph.save_hdt()`](#save_hdt-method) writes, without loading
+the graph: the file gets memory-mapped, then `triples()` answers triple
+patterns from the term IDs, decoding only the terms which it returns.
+
+The term dictionary has four sections, each sorted and front-coded:
+the terms used as both subjects and objects, which share the same IDs
+in either position, then the terms used only as subjects, only as
+objects, and the predicates.
+The triples get sorted by subject, predicate, then object IDs and
+stored as two arrays: the predicate for each distinct subject and
+predicate pair, then the object for each triple, along with two bitmaps
+which mark where each subject's list of pairs, and where each pair's
+list of objects, ends.
+Since the subjects are numbered in order, the subject IDs themselves
+do not need to be stored.
+
+File layout:
+    magic, sections ..., footer JSON, footer length, magic
+    """
+    MAGIC: bytes = b"KGLABHDT"
+    VERSION: int = 1
+    BLOCK_SIZE: int = 16
+    BATCH_SIZE: int = 100000
+
+    SECTIONS: typing.Tuple[ str, ... ] = (
+        "shared",
+        "subjects",
+        "objects",
+        "predicates",
+    )
+
+    _ERROR_FORMAT: str = "The file is not in the kglab HDT format"
+
+
+    def __init__ (
+        self,
+        path: IOPathLike,
+        ) -> None:
+        """
+Constructor for access to a file, which only reads its footer.
+
+    path:
+must be a file name (str) or path object to a local file reference, which gets memory-mapped; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object), which gets read into memory
+        """
+        self._file: typing.Optional[typing.IO] = None
+        self._mmap: typing.Optional[mmap.mmap] = None
+
+        if hasattr(path, "read"):
+            buffer: typing.Union[ bytes, mmap.mmap ] = path.read()  # type: ignore
+        else:
+            self._file = open(str(path), "rb")  # pylint: disable=R1732
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = self._mmap
+
+        self._buffer: memoryview = memoryview(buffer)
+        trailer = len(self.MAGIC) + 8
+
+        if len(self._buffer) < len(self.MAGIC) + trailer or \
+           bytes(self._buffer[:len(self.MAGIC)]) != self.MAGIC or \
+           bytes(self._buffer[-len(self.MAGIC):]) != self.MAGIC:
+            self.close()
+            raise ValueError(self._ERROR_FORMAT)
+
+        footer_len = int.from_bytes(self._buffer[-trailer:-len(self.MAGIC)], "little")
+        footer = json.loads(bytes(self._buffer[-trailer - footer_len:-trailer]).decode("utf-8"))
+
+        if footer.get("version") != self.VERSION:
+            self.close()
+            raise ValueError(self._ERROR_FORMAT)
+
+        self._footer: dict = footer
+        self.num_triples: int = footer["num_triples"]
+        self.namespaces: dict = footer["namespaces"]
+        self.bindings: dict = footer["bindings"]
+
+        self._dicts: typing.Dict[ str, FrontCodedDictionary ] = {
+            name: FrontCodedDictionary(
+                self._array(name + ".offsets"),
+                self._section(name + ".data"),
+                footer["dictionary"][name],
+                footer["block_size"],
+            )
+            for name in self.SECTIONS
+        }
+
+        self._triples: BitmapTriples = BitmapTriples(
+            self._array("y"),
+            self._array("by"),
+            self._array("z"),
+            self._array("bz"),
+        )
+
+        self._terms: typing.Dict[ typing.Tuple[ str, int ], RDF_Node ] = {}
+
+
+    def _section (
+        self,
+        name: str,
+        ) -> memoryview:
+        """
+Access the bytes of one section in the file, without copying.
+
+    name:
+name of the section
+
+    returns:
+view of the section
+        """
+        offset, nbytes, _, _ = self._footer["sections"][name]
+        return self._buffer[offset:offset + nbytes]
+
+
+    def _array (
+        self,
+        name: str,
+        ) -> np.ndarray:
+        """
+Access one section in the file as a `numpy` array, without copying.
+
+    name:
+name of the section
+
+    returns:
+the array
+        """
+        offset, _, dtype, count = self._footer["sections"][name]
+        return np.frombuffer(self._buffer, dtype=np.dtype(dtype), count=count, offset=offset)
+
+
+    def close (
+        self
+        ) -> None:
+        """
+Release the memory map and the file.
+        """
+        # drop the views into the buffer before closing it
+        self._dicts = {}
+        self._triples = BitmapTriples(np.empty(0), np.empty(0, dtype=np.uint8), np.empty(0), np.empty(0, dtype=np.uint8))
+
+        if hasattr(self, "_buffer"):
+            self._buffer.release()
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+    def __enter__ (
+        self
+        ) -> "HDTFile":
+        """
+Context manager entry.
+        """
+        return self
+
+
+    def __exit__ (
+        self,
+        *args: typing.Any,
+        ) -> None:
+        """
+Context manager exit, which closes the file.
+        """
+        self.close()
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of triples in the file.
+        """
+        return self.num_triples
+
+
+    def __iter__ (
+        self
+        ) -> typing.Iterator[RDF_Triple]:
+        """
+Iterate through all of the triples in the file.
+        """
+        return self.triples(( None, None, None, ))
+
+
+    def __contains__ (
+        self,
+        triple: RDF_Triple,
+        ) -> bool:
+        """
+Test whether the file contains a triple.
+        """
+        for _ in self.triples(triple):
+            return True
+
+        return False
+
+
+    ######################################################################
+    ## term dictionary
+
+    def _locate (
+        self,
+        term: typing.Optional[RDF_Node],
+        position: str,
+        ) -> typing.Optional[int]:
+        """
+Lookup the ID of a term, in the ID space of its position in a triple.
+
+    term:
+the term, or `None` as a wildcard
+
+    position:
+one of `"subject"`, `"predicate"`, or `"object"`
+
+    returns:
+the term ID, `-1` for a wildcard; otherwise `None` if the file does not use the term in that position
+        """
+        if term is None or isinstance(term, rdflib.term.Variable):
+            return -1
+
+        value = _encode_term(term)
+
+        if position == "predicate":
+            return self._dicts["predicates"].locate(value)
+
+        shared = self._dicts["shared"]
+        index = shared.locate(value)
+
+        if index is not None:
+            return index
+
+        index = self._dicts["subjects" if position == "subject" else "objects"].locate(value)
+
+        if index is not None:
+            return len(shared) + index
+
+        return None
+
+
+    def _extract (
+        self,
+        term_id: int,
+        position: str,
+        ) -> RDF_Node:
+        """
+Lookup the term for an ID, in the ID space of a position in a triple.
+Blank nodes keep their labels from the file, so that they can be used
+in later patterns.
+
+    term_id:
+the term ID
+
+    position:
+one of `"subject"`, `"predicate"`, or `"object"`
+
+    returns:
+the term
+        """
+        key = ( position, term_id, )
+        term = self._terms.get(key)
+
+        if term is None:
+            if position == "predicate":
+                value = self._dicts["predicates"].extract(term_id)
+            else:
+                shared = self._dicts["shared"]
+
+                if term_id < len(shared):
+                    value = shared.extract(term_id)
+                else:
+                    value = self._dicts["subjects" if position == "subject" else "objects"].extract(term_id - len(shared))
+
+            term = _decode_term(value, None)
+            self._terms[key] = term
+
+        return term
+
+
+    def _decode_terms (
+        self,
+        cache: typing.Dict[ str, typing.Any ],
+        ) -> typing.Tuple[ list, list, list ]:
+        """
+Decode the whole term dictionary, once for each distinct term.
+
+    cache:
+term cache, which maps blank node labels to new blank nodes
+
+    returns:
+lists of the terms for the subject, predicate, and object ID spaces
+        """
+        terms = {
+            name: [ _decode_term(value, cache) for value in self._dicts[name] ]
+            for name in self.SECTIONS
+        }
+
+        return (
+            terms["shared"] + terms["subjects"],
+            terms["predicates"],
+            terms["shared"] + terms["objects"],
+        )
+
+
+    ######################################################################
+    ## triple patterns
+
+    def _id_batches (
+        self,
+        s_id: int,
+        p_id: int,
+        o_id: int,
+        ) -> typing.Iterator[ typing.Tuple[ np.ndarray, np.ndarray, np.ndarray ] ]:
+        """
+Match a triple pattern in the ID space, in batches, choosing the access
+path by which positions are bound: a subject selects a range of pairs,
+an object gets scanned for in the objects array, and a predicate in the
+pairs array.
+
+    s_id:
+subject ID, or `-1` for a wildcard
+
+    p_id:
+predicate ID, or `-1` for a wildcard
+
+    o_id:
+object ID, or `-1` for a wildcard
+
+    yields:
+arrays of the subject, predicate, and object IDs of the matching triples
+        """
+        bitmaps = self._triples
+        y_offsets = bitmaps.y_offsets
+        z_offsets = bitmaps.z_offsets
+
+        if s_id < 0 <= o_id:
+            triples = np.flatnonzero(bitmaps.z == o_id)
+            pairs = np.searchsorted(z_offsets, triples, side="right") - 1
+
+            if p_id >= 0:
+                keep = bitmaps.y[pairs] == p_id
+                triples = triples[keep]
+                pairs = pairs[keep]
+
+            for start in range(0, len(triples), self.BATCH_SIZE):
+                batch_pairs = pairs[start:start + self.BATCH_SIZE]
+                subjects = np.searchsorted(y_offsets, batch_pairs, side="right") - 1
+                yield subjects, bitmaps.y[batch_pairs], bitmaps.z[triples[start:start + self.BATCH_SIZE]]
+
+            return
+
+        if s_id >= 0:
+            if s_id >= len(y_offsets) - 1:
+                return
+
+            pairs = np.arange(y_offsets[s_id], y_offsets[s_id + 1], dtype=np.int64)
+        elif p_id >= 0:
+            pairs = np.flatnonzero(bitmaps.y == p_id)
+        else:
+            pairs = np.arange(len(bitmaps.y), dtype=np.int64)
+
+        if p_id >= 0 and s_id >= 0:
+            pairs = pairs[bitmaps.y[pairs] == p_id]
+
+        # expand the pairs, in batches of roughly the same number of triples
+        bounds = np.searchsorted(
+            np.cumsum(z_offsets[pairs + 1] - z_offsets[pairs]),
+            np.arange(self.BATCH_SIZE, self.num_triples + self.BATCH_SIZE, self.BATCH_SIZE),
+            side="left",
+        ) + 1
+
+        start = 0
+
+        for end in np.unique(np.minimum(bounds, len(pairs))).tolist():
+            if end <= start:
+                continue
+
+            triples, triple_pairs = bitmaps.expand(pairs[start:end])
+            start = end
+
+            if o_id >= 0:
+                keep = bitmaps.z[triples] == o_id
+                triples = triples[keep]
+                triple_pairs = triple_pairs[keep]
+
+            if len(triples) > 0:
+                subjects = np.searchsorted(y_offsets, triple_pairs, side="right") - 1
+                yield subjects, bitmaps.y[triple_pairs], bitmaps.z[triples]
+
+
+    def triples (
+        self,
+        pattern: typing.Tuple[ typing.Optional[RDF_Node], typing.Optional[RDF_Node], typing.Optional[RDF_Node] ],
+        ) -> typing.Iterator[RDF_Triple]:
+        """
+Iterate through the triples which match a pattern, the same as
+[`rdflib.Graph.triples()`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html#rdflib.graph.Graph.triples),
+where `None` matches any term.
+
+    pattern:
+a tuple of the subject, predicate, and object to match
+
+    yields:
+the matching triples, in order of their subject, predicate, and object IDs
+        """
+        s, p, o = pattern
+        ids = [
+            self._locate(term, position)
+            for term, position in zip(pattern, ( "subject", "predicate", "object", ))
+        ]
+
+        if None in ids:
+            return
+
+        s_id, p_id, o_id = ids  # type: ignore
+
+        for subjects, predicates, objects in self._id_batches(s_id, p_id, o_id):  # type: ignore
+            for s_i, p_i, o_i in zip(subjects.tolist(), predicates.tolist(), objects.tolist()):
+                yield (
+                    s if s_id >= 0 else self._extract(s_i, "subject"),
+                    p if p_id >= 0 else self._extract(p_i, "predicate"),
+                    o if o_id >= 0 else self._extract(o_i, "object"),
+                )
+
+
+    def add_to (
+        self,
+        graph: rdflib.Graph,
+        *,
+        cache: typing.Optional[ typing.Dict[ str, typing.Any ] ] = None,
+        ) -> None:
+        """
+Add all of the triples in the file to an RDF graph, decoding each
+distinct term once, then adding the triples in batches.
+
+    graph:
+the target RDF graph
+
+    cache:
+optionally, a term cache which maps blank node labels to new blank nodes, to share across files; defaults to a new cache, so the blank nodes of each file stay distinct
+        """
+        s_terms, p_terms, o_terms = self._decode_terms({} if cache is None else cache)
+
+        for subjects, predicates, objects in self._id_batches(-1, -1, -1):
+            graph.addN(
+                (s_terms[s_i], p_terms[p_i], o_terms[o_i], graph)
+                for s_i, p_i, o_i in zip(subjects.tolist(), predicates.tolist(), objects.tolist())
+            )
+
+
+    ######################################################################
+    ## serialization
+
+    @classmethod
+    def write (
+        cls,
+        f: typing.IO,
+        triples: typing.Iterable[RDF_Triple],
+        *,
+        namespaces: typing.Optional[dict] = None,
+        bindings: typing.Optional[dict] = None,
+        block_size: int = BLOCK_SIZE,
+        ) -> int:
+        """
+Write triples to a binary file object in this format.
+
+    f:
+a writable, binary file object
+
+    triples:
+the triples to write
+
+    namespaces:
+optional namespaces to store, which a `KnowledgeGraph` has added
+
+    bindings:
+optional prefixes to store, which the namespace manager of an RDF graph has bound
+
+    block_size:
+number of strings in each front-coded block of the term dictionary
+
+    returns:
+the number of triples written
+        """
+        if block_size < 1:
+            raise ValueError("The `block_size` value must be a positive integer")
+
+        sections, s_ids, p_ids, o_ids = cls._encode_ids(triples)
+
+        # mark the last triple of each pair, then the last pair of each subject
+        bz = np.ones(len(s_ids), dtype=bool)
+        bz[:-1] = (s_ids[1:] != s_ids[:-1]) | (p_ids[1:] != p_ids[:-1])
+
+        pair_ends = np.flatnonzero(bz)
+        pair_subjects = s_ids[pair_ends]
+
+        by = np.ones(len(pair_ends), dtype=bool)
+        by[:-1] = pair_subjects[1:] != pair_subjects[:-1]
+
+        arrays = {}
+
+        for name, values in sections.items():
+            offsets, data = FrontCodedDictionary.encode(values, block_size)
+            arrays[name + ".offsets"] = offsets
+            arrays[name + ".data"] = data
+
+        arrays["y"] = p_ids[pair_ends].astype(_id_dtype(len(sections["predicates"])))
+        arrays["by"] = np.packbits(by)
+        arrays["z"] = o_ids.astype(_id_dtype(len(sections["shared"]) + len(sections["objects"])))
+        arrays["bz"] = np.packbits(bz)
+
+        footer = json.dumps({
+            "version": cls.VERSION,
+            "num_triples": len(o_ids),
+            "block_size": block_size,
+            "dictionary": { name: len(values) for name, values in sections.items() },
+            "sections": cls._write_sections(f, arrays),
+            "namespaces": namespaces or {},
+            "bindings": bindings or {},
+        }).encode("utf-8")
+
+        f.write(footer)
+        f.write(len(footer).to_bytes(8, "little"))
+        f.write(cls.MAGIC)
+
+        return len(o_ids)
+
+
+    @classmethod
+    def _encode_ids (
+        cls,
+        triples: typing.Iterable[RDF_Triple],
+        ) -> typing.Tuple[ typing.Dict[ str, typing.List[str] ], np.ndarray, np.ndarray, np.ndarray ]:
+        """
+Build the term dictionary for the triples, then encode them as term
+IDs, sorted by subject, predicate, then object IDs, without duplicates.
+
+    triples:
+the triples to encode
+
+    returns:
+the sorted strings of each dictionary section, then arrays of the subject, predicate, and object IDs
+        """
+        columns: typing.Tuple[ list, list, list ] = ( [], [], [], )
+
+        for s, p, o in triples:
+            columns[0].append(_encode_term(s))
+            columns[1].append(_encode_term(p))
+            columns[2].append(_encode_term(o))
+
+        # factorize each column, then sort the distinct terms into the
+        # dictionary sections
+        codes, uniques = zip(*[ _factorize(column) for column in columns ])
+        shared = set(uniques[0]).intersection(uniques[2])
+
+        sections = {
+            "shared": sorted(shared),
+            "subjects": sorted(set(uniques[0]).difference(shared)),
+            "objects": sorted(set(uniques[2]).difference(shared)),
+            "predicates": sorted(uniques[1]),
+        }
+
+        s_ids = _term_ids(codes[0], uniques[0], sections["shared"] + sections["subjects"])
+        p_ids = _term_ids(codes[1], uniques[1], sections["predicates"])
+        o_ids = _term_ids(codes[2], uniques[2], sections["shared"] + sections["objects"])
+
+        # sort the triples, dropping any duplicates
+        order = np.lexsort(( o_ids, p_ids, s_ids, ))
+        s_ids, p_ids, o_ids = s_ids[order], p_ids[order], o_ids[order]
+
+        if len(order) > 1:
+            keep = np.ones(len(order), dtype=bool)
+            keep[1:] = (s_ids[1:] != s_ids[:-1]) | (p_ids[1:] != p_ids[:-1]) | (o_ids[1:] != o_ids[:-1])
+            s_ids, p_ids, o_ids = s_ids[keep], p_ids[keep], o_ids[keep]
+
+        return sections, s_ids, p_ids, o_ids
+
+
+    @classmethod
+    def _write_sections (
+        cls,
+        f: typing.IO,
+        arrays: typing.Dict[ str, typing.Union[ np.ndarray, bytes ] ],
+        ) -> typing.Dict[ str, list ]:
+        """
+Write the magic, then the sections, each aligned to 8 bytes.
+
+    f:
+a writable, binary file object
+
+    arrays:
+the contents of each section, by name
+
+    returns:
+the offset, length, dtype, and item count of each section, by name
+        """
+        f.write(cls.MAGIC)
+        pos = len(cls.MAGIC)
+        section_index = {}
+
+        for name, value in arrays.items():
+            if isinstance(value, np.ndarray):
+                data = value.tobytes()
+                section_index[name] = [ pos, len(data), value.dtype.str, len(value), ]
+            else:
+                data = value
+                section_index[name] = [ pos, len(data), "|u1", len(data), ]
+
+            padding = -len(data) % 8
+            f.write(data + b"\0" * padding)
+            pos += len(data) + padding
+
+        return section_index
+
+
+######################################################################
+## term encoding
+
+def _encode_term (
+    term: RDF_Node,
+    ) -> str:
+    """
+Encode an RDF term as the string stored in the term dictionary: an IRI
+as is, a blank node label prefixed by `_:`, and a literal as its quoted
+lexical form followed by any language tag or datatype IRI, as in
+N-Triples although without escape sequences.
+
+    term:
+an RDF term
+
+    returns:
+the encoded string
+    """
+    if isinstance(term, rdflib.term.Literal):
+        if term.language:
+            return '"' + str(term) + '"@' + term.language
+
+        if term.datatype is not None:
+            return '"' + str(term) + '"^^<' + str(term.datatype) + ">"
+
+        return '"' + str(term) + '"'
+
+    if isinstance(term, rdflib.term.BNode):
+        return "_:" + str(term)
+
+    return str(term)
+
+
+def _decode_term (
+    value: str,
+    cache: typing.Optional[ typing.Dict[ str, typing.Any ] ],
+    ) -> RDF_Node:
+    """
+Decode an RDF term from the string stored in the term dictionary.
+Since neither a language tag nor a datatype IRI may contain a quote,
+the last quote in a literal ends its lexical form.
+
+    value:
+the encoded string
+
+    cache:
+optional term cache, which maps each blank node label to a new blank node, and also holds the datatype IRIs of literals; otherwise blank nodes keep their labels
+
+    returns:
+the term
+    """
+    if value.startswith('"'):
+        return _decode_literal(value, cache)
+
+    if value.startswith("_:"):
+        if cache is None:
+            return rdflib.term.BNode(value[2:])
+
+        term = cache.get(value)
+
+        if term is None:
+            term = rdflib.term.BNode()
+            cache[value] = term
+
+        return term
+
+    return rdflib.term.URIRef(value)
+
+
+def _decode_literal (
+    value: str,
+    cache: typing.Optional[ typing.Dict[ str, typing.Any ] ],
+    ) -> rdflib.term.Literal:
+    """
+Decode a literal from the string stored in the term dictionary; see
+`_decode_term()`.
+
+    value:
+the encoded string, which starts with a quote
+
+    cache:
+optional term cache, which also holds the datatype IRIs of literals
+
+    returns:
+the literal
+    """
+    end = value.rfind('"')
+    lexical = value[1:end]
+    suffix = value[end + 1:]
+
+    if suffix.startswith("@"):
+        return rdflib.term.Literal(lexical, lang=suffix[1:])
+
+    if not suffix.startswith("^^"):
+        return rdflib.term.Literal(lexical)
+
+    if cache is None:
+        return rdflib.term.Literal(lexical, datatype=rdflib.term.URIRef(suffix[3:-1]))
+
+    # same cache key as for N3 datatype suffixes
+    datatype = cache.get(suffix)
+
+    if datatype is None:
+        datatype = rdflib.term.URIRef(suffix[3:-1])
+        cache[suffix] = datatype
+
+    return rdflib.term.Literal(lexical, datatype=datatype)
+
+
+def _factorize (
+    column: typing.List[str],
+    ) -> typing.Tuple[ np.ndarray, typing.List[str] ]:
+    """
+Encode a column of strings as codes into its distinct values.
+
+    column:
+the strings
+
+    returns:
+the code for each string, and the distinct strings
+    """
+    index: typing.Dict[ str, int ] = {}
+    codes = np.fromiter(
+        (index.setdefault(value, len(index)) for value in column),
+        dtype=np.int64,
+        count=len(column),
+    )
+
+    return codes, list(index)
+
+
+def _term_ids (
+    codes: np.ndarray,
+    uniques: typing.List[str],
+    terms: typing.List[str],
+    ) -> np.ndarray:
+    """
+Map the codes of a factorized column to the IDs of the terms in the
+dictionary.
+
+    codes:
+code for each row
+
+    uniques:
+the distinct string for each code
+
+    terms:
+the terms in ID order
+
+    returns:
+the term ID for each row
+    """
+    term_ids = { value: i for i, value in enumerate(terms) }
+    unique_ids = np.array([ term_ids[value] for value in uniques ], dtype=np.int64)
+
+    return unique_ids[codes] if len(codes) > 0 else codes
+
+
+def _id_dtype (
+    count: int,
+    ) -> np.dtype:
+    """
+Select the narrowest unsigned integer type for a range of IDs.
+
+    count:
+the number of IDs
+
+    returns:
+the `numpy` type
+    """
+    for dtype in ( np.uint8, np.uint16, np.uint32, ):
+        if count <= np.iinfo(dtype).max + 1:
+            return np.dtype(dtype).newbyteorder("<")
+
+    return np.dtype(np.uint64).newbyteorder("<")
+
+
+def _write_vbyte (
+    data: bytearray,
+    value: int,
+    ) -> None:
+    """
+Append an unsigned integer in the variable-byte encoding, seven bits at
+a time with the high bit set on every byte except the last.
+
+    data:
+buffer to append to
+
+    value:
+the integer
+    """
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    data.append(value)
+
+
+def _read_vbyte (
+    data: typing.Union[ bytes, memoryview ],
+    pos: int,
+    ) -> typing.Tuple[ int, int ]:
+    """
+Read an unsigned integer in the variable-byte encoding.
+
+    data:
+buffer to read from
+
+    pos:
+offset of the integer in the buffer
+
+    returns:
+the integer, and the offset following it
+    """
+    byte = data[pos]
+    pos += 1
+
+    if byte < 0x80:
+        return byte, pos
+
+    value = byte & 0x7F
+    shift = 7
+
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, pos
+
+        shift += 7
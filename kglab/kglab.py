@@ -17,11 +17,14 @@ import rdflib  # type: ignore
 import rdflib.plugin  # type: ignore
 
 ## kglab - core classes
+from .graph import PropertyStore
 from .pkg_types import GraphLike, RDF_Node
-from .util import get_gpu_count
+from .util import get_gpu_count, ReadWriteLock
 from .version import _check_version
 from .query.sparql import SparqlQueryable
 from .query.mixin import QueryingMixin
+from .ntriples import NTriplesMixin
+from .parquet import ParquetMixin
 from .serde import SerdeMixin
 from .standards import ShaclOwlRdfSkosMixin
 
@@ -33,7 +36,7 @@ if get_gpu_count() > 0:
     import cudf  # type: ignore
 
 
-class KnowledgeGraph(QueryingMixin, SerdeMixin, ShaclOwlRdfSkosMixin):
+class KnowledgeGraph(QueryingMixin, SerdeMixin, NTriplesMixin, ParquetMixin, ShaclOwlRdfSkosMixin):
     """
 This is the primary class used to represent RDF graphs, on which the other classes are dependent.
 See <https://derwen.ai/docs/kgl/concepts/#knowledge-graph>
@@ -100,6 +103,7 @@ a dictionary of [*namespace*](https://rdflib.readthedocs.io/en/stable/apidocs/rd
         self.base_uri = base_uri
         self.language = language
         self.store = store
+        self._lock = ReadWriteLock()
 
         # use NVidia GPU devices if available and the libraries
         # have been installed and the flag is not disabled
@@ -142,6 +146,27 @@ Build a new `rdflib.Graph` object, based on storage plugin configuration.
         return g
 
 
+    @property
+    def lock (  # type: ignore
+        self
+        ) -> ReadWriteLock:
+        """
+Accessor for the reader/writer lock which synchronizes threads that
+use this graph: `add()` and `remove()` hold its write lock, while
+queries hold its read lock. When the RDF graph uses a `PropertyStore`
+this is the lock of the store itself, otherwise the graph has its own.
+
+    returns:
+the `ReadWriteLock` for the graph
+        """
+        store = self._g.store  # type: ignore
+
+        if isinstance(store, PropertyStore):
+            return store.lock
+
+        return self._lock
+
+
     def rdf_graph (
         self
         ) -> rdflib.Graph:
@@ -341,14 +366,15 @@ must be a [`rdflib.term.Node`](https://rdflib.readthedocs.io/en/stable/apidocs/r
 *object* node;
 must be a [`rdflib.term.Node`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html?highlight=Node#rdflib.term.Node) or [`rdflib.term.Terminal`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html?highlight=Node#rdflib.term.Literal); otherwise throws a `TypeError` exception
         """
-        try:
-            self._g.add((s, p, o,))  # type: ignore
-        except AssertionError as e:
-            traceback.print_exc()
-            ic(s)
-            ic(p)
-            ic(o)
-            raise TypeError(str(e))
+        with self.lock.write():
+            try:
+                self._g.add((s, p, o,))  # type: ignore
+            except AssertionError as e:
+                traceback.print_exc()
+                ic(s)
+                ic(p)
+                ic(o)
+                raise TypeError(str(e))
 
 
     def remove (
@@ -375,14 +401,15 @@ must be a [`rdflib.term.Node`](https://rdflib.readthedocs.io/en/stable/apidocs/r
 *object* node;
 must be a [`rdflib.term.Node`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html?highlight=Node#rdflib.term.Node) or [`rdflib.term.Terminal`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html?highlight=Node#rdflib.term.Literal); otherwise throws a `TypeError` exception
         """
-        try:
-            self._g.remove((s, p, o,)) # type: ignore
-        except AssertionError as e:
-            traceback.print_exc()
-            ic(s)
-            ic(p)
-            ic(o)
-            raise TypeError(str(e))
+        with self.lock.write():
+            try:
+                self._g.remove((s, p, o,)) # type: ignore
+            except AssertionError as e:
+                traceback.print_exc()
+                ic(s)
+                ic(p)
+                ic(o)
+                raise TypeError(str(e))
 
 
     def graph_factory(self, name, graph):
@@ -0,0 +1,459 @@
+"""
+N-Triples parsing and serialization for `KnowledgeGraph`
+see license https://github.com/DerwenAI/kglab#license-and-copyright
+"""
+
+## Python standard libraries
+from concurrent.futures import ProcessPoolExecutor
+import io
+import itertools
+import mmap
+import os
+import re
+import typing
+
+### third-parties libraries
+import numpy as np  # type: ignore  # pylint: disable=E0401
+
+import rdflib  # type: ignore
+
+## kglab - core classes
+from .decorators import multifile
+from .pkg_types import IOPathLike
+from .util import Mixin
+
+
+class NTriplesMixin (Mixin):
+    """
+Provide the fast, line-based N-Triples parser and serializer for
+`KnowledgeGraph`, which bypass the `rdflib` plugins.
+    """
+    # one statement per line in N-Triples, allowing for trailing comments
+    _NT_STATEMENT: typing.Pattern = re.compile(
+        r'\s*(<[^>\s]*>|_:\S+?)'
+        r'\s*(<[^>\s]*>)'
+        r'\s*(<[^>\s]*>|_:\S+?|"(?:[^"\\]|\\.)*"(?:@[A-Za-z]+(?:-[A-Za-z0-9]+)*|\^\^<[^>\s]*>)?)'
+        r'\s*\.\s*(?:#.*)?$'
+    )
+
+    _NT_BLANK: typing.Pattern = re.compile(r"\s*(?:#.*)?$")
+
+    _NT_ESCAPE: typing.Pattern = re.compile(r"\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))")
+
+    _NT_ECHAR: typing.Dict[ str, str ] = {
+        "t": "\t",
+        "b": "\b",
+        "n": "\n",
+        "r": "\r",
+        "f": "\f",
+        '"': '"',
+        "'": "'",
+        "\\": "\\",
+    }
+
+
+    @multifile()
+    def load_ntriples (
+        self,
+        path: IOPathLike,
+        *,
+        workers: typing.Optional[int] = None,
+        chunk_size: int = 16 * 1024 * 1024,
+        ) -> "KnowledgeGraph": # type: ignore
+        """
+Parse an RDF graph serialized in the line-based [N-Triples](https://www.w3.org/TR/n-triples/) format, which is much faster than the `rdflib` parser used by [`load_rdf()`](#load_rdf-method).
+The file gets memory-mapped and split at line boundaries into chunks, which get parsed in a pool of worker processes into compact batches of encoded terms, and then merged into the graph in order.
+
+Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
+Statements which name a graph, as in the [N-Quads](https://www.w3.org/TR/n-quads/) format, are not supported; use `load_rdf(format="nquads")` for those instead.
+
+    path:
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object), which gets parsed in chunks within this process, as does a local file compressed with `gzip`, `bzip2`, `xz`, or `zstd`; otherwise this throws a `TypeError` exception whenever a line is not a valid N-Triples statement, with the byte offset of that line within the file
+
+    workers:
+optionally, the number of worker processes; defaults to the CPU count, while `1` parses within this process
+
+    chunk_size:
+approximate size of each chunk in bytes; defaults to 16 MiB, although smaller files get split into one chunk per worker
+
+    returns:
+this `KnowledgeGraph` object – used for method chaining
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+
+        if chunk_size < 1:
+            raise ValueError("The `chunk_size` value must be a positive integer")
+
+        cache: typing.Dict[ typing.Any, typing.Any ] = {}
+
+        # a compressed file gets decompressed as a stream, which cannot
+        # be memory-mapped
+        source = path if hasattr(path, "read") else self._open_decompressed(path)  # type: ignore
+
+        if source is not None:
+            offset = 0
+
+            try:
+                for lines in iter(lambda: source.readlines(chunk_size), []):  # type: ignore
+                    chunk = "".join(lines).encode("utf-8") if isinstance(lines[0], str) else b"".join(lines)
+                    self._merge_ntriples(self._parse_ntriples(chunk.decode("utf-8"), offset), cache)
+                    offset += len(chunk)
+            finally:
+                if source is not path:
+                    source.close()
+
+            return self
+
+        filename = self._get_filename(path)
+        ranges = self._split_ntriples(filename, workers, chunk_size)  # type: ignore
+
+        if workers > 1 and len(ranges) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(ranges))) as pool:
+                for batch in pool.map(self._parse_ntriples_range, *zip(*[ ( filename, start, end, ) for start, end in ranges ])):
+                    self._merge_ntriples(batch, cache)
+        else:
+            for start, end in ranges:
+                self._merge_ntriples(self._parse_ntriples_range(filename, start, end), cache)  # type: ignore
+
+        return self
+
+
+    @classmethod
+    def _split_ntriples (
+        cls,
+        filename: str,
+        workers: int,
+        chunk_size: int,
+        ) -> typing.List[ typing.Tuple[ int, int ] ]:
+        """
+Semiprivate method to split a file into ranges of bytes at line
+boundaries, for parsing in chunks.
+
+    filename:
+name of the file
+
+    workers:
+number of worker processes
+
+    chunk_size:
+approximate size of each chunk in bytes
+
+    returns:
+list of the start and end offsets for each chunk
+        """
+        size = os.path.getsize(filename)
+
+        if size < 1:
+            return []
+
+        chunk_size = min(chunk_size, -(-size // workers))
+        ranges: typing.List[ typing.Tuple[ int, int ] ] = []
+
+        with open(filename, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+
+                while start < size:
+                    end = mm.find(b"\n", min(start + chunk_size, size) - 1) + 1
+
+                    if end < 1:
+                        end = size
+
+                    ranges.append(( start, end, ))
+                    start = end
+
+        return ranges
+
+
+    @classmethod
+    def _parse_ntriples_range (
+        cls,
+        filename: str,
+        start: int,
+        end: int,
+        ) -> typing.Tuple[ list, np.ndarray ]:
+        """
+Semiprivate method which memory-maps a file, then parses one chunk of
+it in N-Triples format; this runs in a worker process.
+
+    filename:
+name of the file
+
+    start:
+offset of the first byte in the chunk
+
+    end:
+offset after the last byte in the chunk
+
+    returns:
+the encoded terms and triples; see `_parse_ntriples()`
+        """
+        with open(filename, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                data = mm[start:end].decode("utf-8")
+
+        return cls._parse_ntriples(data, start)
+
+
+    @classmethod
+    def _parse_ntriples (
+        cls,
+        data: str,
+        offset: int,
+        ) -> typing.Tuple[ list, np.ndarray ]:
+        """
+Semiprivate method to parse a chunk of text in N-Triples format into a
+compact batch of encoded terms, where each distinct term gets parsed
+once; otherwise this throws a `TypeError` exception for an invalid line.
+
+    data:
+text of the chunk, which must end at a line boundary
+
+    offset:
+byte offset of the chunk within its file, for error messages
+
+    returns:
+a list of the distinct terms, each as a tuple of its value, kind,
+datatype, and language; plus an array of the term indexes for each
+triple, with three columns
+        """
+        match = cls._NT_STATEMENT.match
+        tokens: typing.Dict[ str, int ] = {}
+        codes: typing.List[int] = []
+
+        lines = data.split("\n")
+
+        for lineno, line in enumerate(lines):
+            stmt = match(line)
+
+            if stmt is None:
+                if cls._NT_BLANK.match(line) is not None:
+                    continue
+
+                pos = offset + sum(len(prev.encode("utf-8")) + 1 for prev in lines[:lineno])
+                raise TypeError(f"invalid N-Triples statement at byte offset {pos}: {line.strip()}")
+
+            for token in stmt.groups():
+                codes.append(tokens.setdefault(token, len(tokens)))
+
+        terms = [ cls._ntriples_term(token) for token in tokens ]
+        return terms, np.array(codes, dtype=np.int32).reshape(-1, 3)
+
+
+    @classmethod
+    def _ntriples_term (
+        cls,
+        token: str,
+        ) -> typing.Tuple[ str, str, typing.Optional[str], typing.Optional[str] ]:
+        """
+Semiprivate method to split one term in N-Triples format into its
+parts, decoding any escape sequences.
+
+    token:
+an IRI, blank node, or literal in N-Triples format
+
+    returns:
+the value, term kind, datatype, and language of the term
+        """
+        if token.startswith("<"):
+            return cls._unescape_ntriples(token[1:-1]), cls._TERM_IRI, None, None
+
+        if token.startswith("_:"):
+            return token[2:], cls._TERM_BNODE, None, None
+
+        end = token.rfind('"')
+        lexical = cls._unescape_ntriples(token[1:end])
+        suffix = token[end + 1:]
+
+        if suffix.startswith("@"):
+            return lexical, cls._TERM_LITERAL, None, suffix[1:]
+
+        if suffix.startswith("^^"):
+            return lexical, cls._TERM_LITERAL, cls._unescape_ntriples(suffix[3:-1]), None
+
+        return lexical, cls._TERM_LITERAL, None, None
+
+
+    @classmethod
+    def _unescape_ntriples (
+        cls,
+        text: str,
+        ) -> str:
+        """
+Semiprivate method to decode the escape sequences in N-Triples text;
+otherwise this throws a `TypeError` exception for an invalid escape.
+        """
+        if "\\" not in text:
+            return text
+
+        def replace (esc: typing.Match) -> str:
+            if esc.group(3) is None:
+                return chr(int(esc.group(1) or esc.group(2), 16))
+
+            if esc.group(3) not in cls._NT_ECHAR:
+                raise TypeError(f"invalid N-Triples escape sequence: \\{esc.group(3)}")
+
+            return cls._NT_ECHAR[esc.group(3)]
+
+        return cls._NT_ESCAPE.sub(replace, text)
+
+
+    def _merge_ntriples (
+        self,
+        batch: typing.Tuple[ list, np.ndarray ],
+        cache: typing.Dict[ typing.Any, typing.Any ],
+        ) -> None:
+        """
+Semiprivate method to build the `rdflib` terms for one batch parsed by
+`_parse_ntriples()` and then add its triples to the graph.
+
+    batch:
+the encoded terms and triples
+
+    cache:
+term cache, shared across the batches from one file
+        """
+        parts, codes = batch
+        terms: typing.List[ typing.Any ] = []
+
+        for part in parts:
+            term = cache.get(part)
+
+            if term is None:
+                term = self._build_term(cache, *part)
+                cache[part] = term
+
+            terms.append(term)
+
+        self._g.addN(  # type: ignore
+            (terms[s], terms[p], terms[o], self._g)
+            for s, p, o in codes.tolist()
+        )
+
+
+    _NT_WRITE_FORMATS: typing.Tuple = (
+        "application/n-triples",
+        "ntriples",
+        "nt",
+        "nt11",
+    )
+
+    _NQ_WRITE_FORMATS: typing.Tuple = (
+        "application/n-quads",
+        "nquads",
+    )
+
+    _NT_WRITE_BATCH: int = 10000
+
+    def _save_ntriples (
+        self,
+        path: IOPathLike,
+        format: str,
+        ) -> None:
+        """
+Semiprivate method for the streaming serializer of `save_rdf()`, which
+encodes the subject or predicate only when it differs from the previous
+triple, then writes the lines in batches of `_NT_WRITE_BATCH` statements.
+For the N-Quads format, the identifier of the graph becomes the graph
+label of each statement, unless it is a blank node.
+
+    path:
+a file name (str), path object, or a writable, bytes-like object
+
+    format:
+serialization format, either N-Triples or N-Quads
+        """
+        if format in self._NT_WRITE_FORMATS:
+            suffix = " .\n"
+        elif format in self._NQ_WRITE_FORMATS:
+            context = self._g.identifier  # type: ignore
+            suffix = f" {context.n3()} .\n" if isinstance(context, rdflib.term.URIRef) else " .\n"
+        else:
+            raise ValueError(f"The streaming serializer does not support the format: {format}")
+
+        if hasattr(path, "write"):
+            if hasattr(path, "encoding"):
+                raise TypeError(self._ERROR_PATH)
+
+            f = path
+        else:
+            f = self._open_compressed_output(self._get_filename(path))  # type: ignore
+
+        lines = self._ntriples_lines(suffix)
+
+        try:
+            for batch in iter(lambda: list(itertools.islice(lines, self._NT_WRITE_BATCH)), []):
+                f.write("".join(batch).encode("utf-8"))  # type: ignore
+        except io.UnsupportedOperation:
+            raise TypeError(self._ERROR_PATH)
+        finally:
+            if f is not path:
+                f.close()  # type: ignore
+
+
+    def _ntriples_lines (
+        self,
+        suffix: str,
+        ) -> typing.Iterator[str]:
+        """
+Semiprivate method to encode the triples of the graph as lines for
+`_save_ntriples()`, reusing the encoded subject or predicate of the
+previous triple when it is the same term.
+
+    suffix:
+the end of each line, after the object
+
+    yields:
+the encoded lines
+        """
+        last_s: typing.Any = None
+        last_p: typing.Any = None
+        s_n3 = p_n3 = ""
+
+        for s, p, o in self._g:  # type: ignore
+            # the stores iterate through the triples grouped by
+            # subject, and mostly also by predicate
+            if s is not last_s:
+                s_n3 = s.n3()
+                last_s = s
+
+            if p is not last_p:
+                p_n3 = p.n3()
+                last_p = p
+
+            if isinstance(o, rdflib.term.Literal):
+                o_n3 = self._encode_nt_literal(o)
+            else:
+                o_n3 = o.n3()
+
+            yield f"{s_n3} {p_n3} {o_n3}{suffix}"
+
+
+    @classmethod
+    def _encode_nt_literal (
+        cls,
+        literal: rdflib.term.Literal,
+        ) -> str:
+        """
+Encode a literal in N-Triples format, with the same escape sequences as
+the `rdflib` serializer.
+
+    literal:
+the literal
+
+    returns:
+the encoded literal
+        """
+        text = str(literal)
+
+        if "\\" in text or '"' in text or "\n" in text or "\r" in text:
+            text = text.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"').replace("\r", "\\r")
+
+        if literal.language:
+            return f'"{text}"@{literal.language}'
+
+        if literal.datatype:
+            return f'"{text}"^^<{literal.datatype}>'
+
+        return f'"{text}"'
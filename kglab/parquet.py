@@ -0,0 +1,1374 @@
+"""
+Parquet and Arrow serialization-deserialization for `KnowledgeGraph`
+see license https://github.com/DerwenAI/kglab#license-and-copyright
+"""
+
+## Python standard libraries
+import functools
+import json
+import math
+import os
+import pathlib
+import typing
+
+### third-parties libraries
+import chocolate  # type: ignore
+import numpy as np  # type: ignore  # pylint: disable=E0401
+import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore  # pylint: disable=E0401
+import pyarrow.compute as pc  # type: ignore  # pylint: disable=E0401
+import pyarrow.dataset as ds  # type: ignore  # pylint: disable=E0401
+import pyarrow.parquet as pq  # type: ignore  # pylint: disable=E0401
+
+import rdflib  # type: ignore
+
+## kglab - core classes
+from .cache import ParseCache
+from .decorators import multifile
+from .graph import PropertyStore
+from .pkg_types import IOPathLike, PathLike
+from .util import get_gpu_count, Mixin
+
+
+## pre-constructor set-up
+if get_gpu_count() > 0:
+    import cudf  # type: ignore  # pylint: disable=E0401
+
+
+class ParquetMixin (Mixin):
+    """
+Provide serialization and deserialization methods for `KnowledgeGraph`
+in columnar formats:
+* Parquet, either as one file or as an appendable dataset
+* Arrow IPC
+    """
+    _PARQUET_COL_NAMES: typing.List[str] = [
+        "subject",
+        "predicate",
+        "object"
+    ]
+
+    _PARQUET_V2_COL_NAMES: typing.List[str] = [
+        "subject",
+        "subject_kind",
+        "predicate",
+        "object",
+        "object_kind",
+        "datatype",
+        "lang",
+    ]
+
+    _PARQUET_NAMESPACE: str = "namespace"
+
+    _TERM_IRI: str = "IRI"
+    _TERM_BNODE: str = "BNode"
+    _TERM_LITERAL: str = "Literal"
+
+    @multifile()
+    def load_parquet (
+        self,
+        path: IOPathLike,
+        *,
+        predicates: typing.Optional[ typing.Iterable[str] ] = None,
+        subjects_prefix: typing.Optional[str] = None,
+        cache: typing.Optional[ParseCache] = None,
+        **kwargs: typing.Any,
+        ) -> "KnowledgeGraph": # type: ignore
+        """
+Wrapper for [`pandas.read_parquet()`](https://pandas.pydata.org/docs/reference/api/pandas.read_parquet.html?highlight=read_parquet#pandas.read_parquet) which parses an RDF graph represented as a [Parquet](https://parquet.apache.org/) file, using the [`pyarrow`](https://arrow.apache.org/) engine.
+Uses the [RAPIDS `cuDF` library](https://docs.rapids.ai/api/cudf/stable/) if GPUs are enabled.
+
+To prepare for upcoming **kglab** features, **this is the preferred method for deserializing an RDF graph.**
+
+Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
+
+Detects whether the file uses the v1 or the v2 schema, and also reads the partitioned datasets; see [`save_parquet()`](#save_parquet-method).
+A dataset written in `"append"` mode gets read by applying its parts in order, so that the removed triples get dropped.
+Loading the whole of such a dataset into an empty graph which uses the `"kglab"` store sets a mark in its change log, so that a later save in `"append"` mode writes only the changes since then.
+
+The `predicates` and `subjects_prefix` filters get pushed down to the [`pyarrow` dataset](https://arrow.apache.org/docs/python/dataset.html) scan, so that it skips the partitions, and the row groups based on their statistics, which cannot match; these filters do not use the RAPIDS libraries.
+
+    path:
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); a string could be a URL; valid URL schemes include `https`, `http`, `ftp`, `s3`, `gs`, `file`; a file URL can also be a path to a directory that contains multiple partitioned files, including a bucket in cloud storage – based on [`fsspec`](https://github.com/intake/filesystem_spec)
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
+
+    predicates:
+optionally, load only the triples which have one of these predicate IRIs
+
+    subjects_prefix:
+optionally, load only the triples which have a subject IRI starting with this prefix
+
+    cache:
+optionally, a [`ParseCache`](#parsecache-class) which stores the parsed triples of local files, so that repeated loads of an unchanged file skip parsing
+
+    returns:
+this `KnowledgeGraph` object – used for method chaining
+        """
+        if cache is not None:
+            options = { "predicates": predicates, "subjects_prefix": subjects_prefix, **kwargs }
+
+            if predicates is not None:
+                options["predicates"] = sorted(str(iri) for iri in predicates)
+
+            if self._load_cached(cache, "load_parquet", path, options):
+                return self
+
+        manifest = self._read_parquet_manifest(path)
+
+        if manifest is not None:
+            filtered = predicates is not None or subjects_prefix is not None
+            was_empty = len(self._g) < 1  # type: ignore
+            table = self._read_parquet_parts(pathlib.Path(str(path)), manifest)
+
+            if table.num_rows > 0 and filtered:
+                table = table.filter(self._parquet_filter(path, predicates, subjects_prefix))
+
+            self._add_term_frame(table.to_pandas())
+
+            # a graph which holds just this dataset can save its later
+            # changes to it, without comparing the whole graph
+            if was_empty and not filtered and isinstance(self._g.store, PropertyStore):  # type: ignore
+                self._g.store.mark_changes(self._parquet_mark(pathlib.Path(str(path)), manifest))  # type: ignore
+
+            return self
+
+        read_args = chocolate.filter_args(kwargs, pd.read_parquet)
+
+        if predicates is not None or subjects_prefix is not None:
+            expr = self._parquet_filter(path, predicates, subjects_prefix)
+
+            if read_args.get("filters") is not None:
+                expr = expr & pq.filters_to_expression(read_args["filters"])
+
+            read_args["filters"] = expr
+
+            df = pd.read_parquet(
+                path,
+                **read_args
+            )
+
+        elif self.use_gpus:
+            df = cudf.read_parquet(  # pylint: disable=E0606
+                path,
+                **read_args
+            ).to_pandas()
+
+        else:
+            df = pd.read_parquet(
+                path,
+                **read_args
+            )
+
+        self._add_term_frame(df)
+        return self
+
+
+    def _add_term_frame (
+        self,
+        df: pd.DataFrame,
+        ) -> None:
+        """
+Add the triples from a dataframe in either the v1 or the v2 Parquet
+schema, decoding each distinct term once, with a term cache shared
+across the columns, then adding the triples in batches.
+
+    df:
+dataframe of triples
+        """
+        terms: typing.Dict[ str, typing.Any ] = {}
+
+        if set(self._PARQUET_V2_COL_NAMES).issubset(df.columns):
+            s_terms = self._decode_term_column(terms, df["subject"], df["subject_kind"])
+            p_terms = self._decode_term_column(terms, df["predicate"])
+            o_terms = self._decode_term_column(terms, df["object"], df["object_kind"], df["datatype"], df["lang"])
+        elif set(self._PARQUET_COL_NAMES).issubset(df.columns):
+            s_terms, p_terms, o_terms = [
+                self._decode_n3_column(df[name], terms)
+                for name in self._PARQUET_COL_NAMES
+            ]
+        else:
+            s_terms, p_terms, o_terms = [
+                self._decode_n3_column(df.iloc[:, i], terms)
+                for i in range(3)
+            ]
+
+        self._g.addN(  # type: ignore
+            (s, p, o, self._g)
+            for s, p, o in zip(s_terms, p_terms, o_terms)
+        )
+
+
+    _ARROW_NAMESPACES: bytes = b"kglab.namespaces"
+    _ARROW_BINDINGS: bytes = b"kglab.bindings"
+
+    def _arrow_table (
+        self,
+        row_group_size: int = 100000,
+        ) -> pa.Table:
+        """
+Build an Arrow table of the triples in the RDF graph in the v2 Parquet
+schema, with one dictionary shared by all the batches in each column,
+and the namespaces of the graph stored in the schema metadata.
+
+    row_group_size:
+maximum number of triples to encode in each record batch
+
+    returns:
+the table of triples
+        """
+        schema = self._parquet_v2_schema()
+        batches = list(self._parquet_batches(self._encode_term_row, schema, row_group_size))
+        namespaces, bindings = self._namespace_state()
+
+        return pa.Table.from_batches(batches, schema).unify_dictionaries().replace_schema_metadata({
+            self._ARROW_NAMESPACES: json.dumps(namespaces),
+            self._ARROW_BINDINGS: json.dumps(bindings),
+        })
+
+
+    def _add_arrow_table (
+        self,
+        table: pa.Table,
+        ) -> None:
+        """
+Add the triples from an Arrow table built by `_arrow_table()`, and
+merge the namespaces stored in its schema metadata.
+
+    table:
+the table of triples
+        """
+        metadata = table.schema.metadata or {}
+
+        self._merge_namespaces(
+            json.loads(metadata.get(self._ARROW_NAMESPACES, b"{}")),
+            json.loads(metadata.get(self._ARROW_BINDINGS, b"{}")),
+        )
+
+        self._add_term_frame(table.to_pandas())
+
+
+    def _parquet_filter (
+        self,
+        path: IOPathLike,
+        predicates: typing.Optional[ typing.Iterable[str] ],
+        subjects_prefix: typing.Optional[str],
+        ) -> ds.Expression:
+        """
+Build a `pyarrow` dataset filter expression which selects triples by
+their predicates and subject prefix, after detecting the schema of the
+Parquet file or dataset.
+
+    path:
+Parquet file or dataset directory; or a readable, file-like object
+
+    predicates:
+optional predicate IRIs to select
+
+    subjects_prefix:
+optional prefix of the subject IRIs to select
+
+    returns:
+the filter expression
+        """
+        if hasattr(path, "read"):
+            # a dataset requires a path, so read the file footer instead
+            position = path.tell()  # type: ignore
+            names = pq.ParquetFile(path).schema_arrow.names
+            path.seek(position)  # type: ignore
+        else:
+            names = ds.dataset(str(path), format="parquet", partitioning="hive").schema.names
+        is_v2 = "subject_kind" in names
+        expr = ds.scalar(True)
+
+        if predicates is not None:
+            iris = [ str(iri) for iri in predicates ]
+            values = iris if is_v2 else [ f"<{iri}>" for iri in iris ]
+            expr = expr & ds.field("predicate").isin(values)
+
+            # prune whole partitions of a namespace-partitioned dataset
+            if self._PARQUET_NAMESPACE in names:
+                namespaces = sorted({ self._iri_namespace(iri) for iri in iris })
+                expr = expr & ds.field(self._PARQUET_NAMESPACE).isin(namespaces)
+
+        if subjects_prefix:
+            prefix = subjects_prefix if is_v2 else "<" + subjects_prefix
+
+            # a range comparison lets row group statistics get used,
+            # and IRIs cannot contain the noncharacter U+10FFFF
+            expr = expr & (ds.field("subject") >= prefix)
+
+            if ord(prefix[-1]) < 0x10FFFF:
+                expr = expr & (ds.field("subject") < prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+            if is_v2:
+                expr = expr & (ds.field("subject_kind") == self._TERM_IRI)
+
+        return expr
+
+
+    def _decode_n3_column (
+        self,
+        values: pd.Series,
+        cache: typing.Dict[ str, typing.Any ],
+        ) -> typing.List[ typing.Any ]:
+        """
+Decode a column of terms serialized in N3 format into `rdflib` terms,
+parsing each distinct value once.
+A blank node label maps to the same new `rdflib.term.BNode` throughout
+the cache, so that blank nodes keep their identity within one load but
+do not merge with those from another.
+
+    values:
+column of terms serialized in N3 format
+
+    cache:
+term cache, mapping from the serialized terms to the decoded terms
+
+    returns:
+list of the decoded terms
+        """
+        codes, uniques = pd.factorize(values)
+        terms: typing.List[ typing.Any ] = []
+
+        for value in uniques:
+            term = cache.get(value)
+
+            if term is None:
+                term = self._decode_n3(value, cache)
+                cache[value] = term
+
+            terms.append(term)
+
+        return [ terms[code] for code in codes.tolist() ]
+
+
+    def _decode_term_column (
+        self,
+        cache: typing.Dict[ str, typing.Any ],
+        values: pd.Series,
+        kinds: typing.Optional[pd.Series] = None,
+        datatypes: typing.Optional[pd.Series] = None,
+        langs: typing.Optional[pd.Series] = None,
+        ) -> typing.List[ typing.Any ]:
+        """
+Decode a column of terms stored in the v2 Parquet schema into `rdflib`
+terms, constructing each distinct combination of the value, term kind,
+datatype, and language once.
+Categorical columns, which is how `pandas` reads dictionary-encoded
+columns, get decoded through their category codes.
+
+    cache:
+term cache, which maps blank node labels to the decoded terms
+
+    values:
+column of IRIs, blank node labels, or literal lexical forms
+
+    kinds:
+optional column of term kinds; all IRIs if not provided
+
+    datatypes:
+optional column of literal datatype IRIs
+
+    langs:
+optional column of literal language tags
+
+    returns:
+list of the decoded terms
+        """
+        columns = [
+            column.astype("category") if not isinstance(column.dtype, pd.CategoricalDtype) else column
+            for column in [ values, kinds, datatypes, langs ]
+            if column is not None
+        ]
+
+        # combine the category codes of each row into one integer key,
+        # unless the key space could overflow
+        col_codes = [ column.cat.codes.to_numpy().astype(np.int64) + 1 for column in columns ]
+        radixes = [ len(column.cat.categories) + 1 for column in columns ]
+
+        if math.prod(radixes) < 2**63:
+            key = np.zeros(len(values), dtype=np.int64)
+
+            for col, radix in zip(col_codes, radixes):
+                key = key * radix + col
+
+            row_codes, _ = pd.factorize(key)
+        else:
+            row_codes, _ = pd.MultiIndex.from_arrays(col_codes).factorize()
+
+        # decode the first row for each distinct code
+        _, first = np.unique(row_codes, return_index=True)
+
+        # the shifted code `0` for a null value picks the leading `None`
+        decoded = [
+            [ None ] * len(first)
+            for _ in range(4)
+        ]
+
+        for i, ( column, col ) in enumerate(zip(columns, col_codes)):
+            cats = [ None ] + column.cat.categories.tolist()
+            decoded[i] = [ cats[code] for code in col[first].tolist() ]
+
+        terms = [
+            self._build_term(cache, value, kind, datatype, lang)
+            for value, kind, datatype, lang in zip(*decoded)
+        ]
+
+        return [ terms[code] for code in row_codes.tolist() ]
+
+
+    def _build_term (
+        self,
+        cache: typing.Dict[ str, typing.Any ],
+        value: str,
+        kind: typing.Optional[str],
+        datatype: typing.Optional[str],
+        lang: typing.Optional[str],
+        ) -> typing.Any:
+        """
+Build one `rdflib` term from its parts.
+A blank node label maps to the same new `rdflib.term.BNode` throughout
+the cache.
+
+    cache:
+term cache, which holds the blank nodes and the datatype IRIs of literals
+
+    value:
+an IRI, blank node label, or literal lexical form
+
+    kind:
+the term kind, one of `_TERM_IRI`, `_TERM_BNODE`, or `_TERM_LITERAL`; an IRI if `None`
+
+    datatype:
+optional datatype IRI of a literal
+
+    lang:
+optional language tag of a literal
+
+    returns:
+the term
+        """
+        if kind == self._TERM_LITERAL:
+            if datatype:
+                # same cache key as for N3 datatype suffixes
+                label = f"^^<{datatype}>"
+                dt_term = cache.get(label)
+
+                if dt_term is None:
+                    dt_term = rdflib.term.URIRef(datatype)
+                    cache[label] = dt_term
+
+                return rdflib.term.Literal(value, lang=lang, datatype=dt_term)
+
+            return rdflib.term.Literal(value, lang=lang)
+
+        if kind == self._TERM_BNODE:
+            label = "_:" + value
+            term = cache.get(label)
+
+            if term is None:
+                term = rdflib.term.BNode()
+                cache[label] = term
+
+            return term
+
+        return rdflib.term.URIRef(value)
+
+
+    def _decode_n3 (
+        self,
+        value: str,
+        cache: typing.Dict[ str, typing.Any ],
+        ) -> typing.Any:
+        """
+Decode one term serialized in N3 format, taking a fast path for IRIs
+and for literals which do not need any escape sequences to be decoded;
+otherwise falling back to `rdflib.util.from_n3()`.
+
+    value:
+term serialized in N3 format
+
+    cache:
+term cache, which also holds the datatype IRIs of literals
+
+    returns:
+the decoded term
+        """
+        if value.startswith("_:"):
+            return rdflib.term.BNode()
+
+        if "\\" not in value:
+            if value.startswith("<") and value.endswith(">"):
+                return rdflib.term.URIRef(value[1:-1])
+
+            if value.startswith('"') and not value.startswith('"""'):
+                end = value.rfind('"')
+                lexical = value[1:end]
+                suffix = value[end + 1:]
+
+                if suffix == "":
+                    return rdflib.term.Literal(lexical)
+
+                if suffix.startswith("@"):
+                    return rdflib.term.Literal(lexical, lang=suffix[1:])
+
+                if suffix.startswith("^^<") and suffix.endswith(">"):
+                    datatype = cache.get(suffix)
+
+                    if datatype is None:
+                        datatype = rdflib.term.URIRef(suffix[3:-1])
+                        cache[suffix] = datatype
+
+                    return rdflib.term.Literal(lexical, datatype=datatype)
+
+        return rdflib.util.from_n3(value, nsm=self._g.namespace_manager)  # type: ignore
+
+
+    def save_parquet (
+        self,
+        path: IOPathLike,
+        *,
+        compression: str = "snappy",
+        row_group_size: int = 100000,
+        schema_version: int = 1,
+        partition_by: typing.Optional[str] = None,
+        mode: str = "overwrite",
+        storage_options: dict = None, # pylint: disable=W0613
+        **kwargs: typing.Any,
+        ) -> None:
+        """
+Serializes an RDF graph to a [Parquet](https://parquet.apache.org/) file, using a [`pyarrow.parquet.ParquetWriter`](https://arrow.apache.org/docs/python/generated/pyarrow.parquet.ParquetWriter.html) to stream the triples in row groups of a fixed size, so that memory use stays bounded regardless of the size of the graph.
+
+The v1 schema has the same layout as a file written by [`pandas.to_parquet()`](https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_parquet.html?highlight=to_parquet): one string column for each of the subject, predicate, and object, serialized in N3 format.
+The v2 schema uses dictionary-encoded columns: `subject`, `predicate`, and `object` hold the IRIs, blank node labels, or literal lexical forms; `subject_kind` and `object_kind` hold the term kinds `"IRI"`, `"BNode"`, or `"Literal"`; while `datatype` and `lang` hold the datatype IRIs and language tags of literal objects, or nulls otherwise.
+These files are much smaller, and load faster.
+
+In `"append"` mode, each save writes a new part file to a dataset directory, which holds only the triples added since the previous save, plus a part file under `_removed/` which holds the triples removed meanwhile, then records the new parts in a `_kglab.json` manifest.
+This requires the `"kglab"` store, which tracks the changes in its change log; see `PropertyStore.mark_changes()`.
+When the graph has no mark for the current revision of the dataset, such as for the first save in a new process of a graph which was not loaded from the dataset, the changes get found by comparing the graph with the dataset instead; since blank nodes get new labels whenever they are loaded, this compares them by label, and rewrites the triples which contain them.
+Since only committed changes get saved, this throws a `ValueError` exception while a transaction is open.
+
+Optionally, this writes a [Hive-partitioned](https://arrow.apache.org/docs/python/dataset.html#partitioned-datasets-multiple-files) dataset instead, as a directory with one subdirectory per predicate or per predicate namespace, so that [`load_parquet()`](#load_parquet-method) can skip the partitions which its filters exclude.
+
+To prepare for upcoming **kglab** features, **this is the preferred method for serializing an RDF graph.**
+
+    path:
+must be a file name (str), path object to a local file reference, or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object); a string could be a URL; valid URL schemes include `https`, `http`, `ftp`, `s3`, `gs`, `file`; accessing cloud storage is based on [`fsspec`](https://github.com/intake/filesystem_spec)
+
+    compression:
+name of the compression algorithm to use; defaults to `"snappy"`; can also be `"gzip"`, `"brotli"`, or `None` for no compression
+
+    row_group_size:
+maximum number of triples to buffer and write in each row group; defaults to `100000`
+
+    schema_version:
+version of the Parquet schema to write, either `1` or `2`; defaults to `1`
+
+    partition_by:
+optionally, write a dataset partitioned by either `"predicate"` or `"namespace"`, where `path` names a directory which must be empty or not exist yet; the row groups for each partition get buffered until they reach `row_group_size`
+
+    mode:
+either `"overwrite"` to write the whole graph; or `"append"` to write only the triples added or removed since the previous save, as a new part of a dataset, where `path` names a directory; defaults to `"overwrite"`; see [`compact_parquet()`](#compact_parquet-method)
+
+    storage_options:
+extra options parsed by [`fsspec`](https://github.com/intake/filesystem_spec) for cloud storage access; **NOT USED** until `pandas` 1.2.x becomes stable across platforms and also RAPIDS provides support
+        """
+        if row_group_size < 1:
+            raise ValueError("The `row_group_size` value must be a positive integer")
+
+        if schema_version == 1:
+            schema = self._parquet_schema()
+            encode_row = self._encode_n3_row
+        elif schema_version == 2:
+            schema = self._parquet_v2_schema()
+            encode_row = self._encode_term_row
+        else:
+            raise ValueError(f"Unknown Parquet `schema_version` value: {schema_version}")
+
+        if partition_by == "namespace":
+            schema = schema.append(pa.field(self._PARQUET_NAMESPACE, pa.string()))
+            encode_row = functools.partial(self._encode_namespace_row, encode_row)
+        elif partition_by not in ( None, "predicate", ):
+            raise ValueError(f"Unknown Parquet `partition_by` value: {partition_by}")
+
+        if mode == "append":
+            if partition_by is not None:
+                raise ValueError("The `partition_by` value cannot be used in `append` mode")
+
+            self._append_parquet(
+                path,
+                schema_version,
+                encoder=( encode_row, schema, row_group_size, ),
+                compression=compression,
+                kwargs=kwargs,
+            )
+            return
+
+        if mode != "overwrite":
+            raise ValueError(f"Unknown Parquet `mode` value: {mode}")
+
+        if isinstance(path, pathlib.Path):
+            path = str(path)
+
+        batches = self._parquet_batches(encode_row, schema, row_group_size)
+
+        if partition_by is not None:
+            self._write_parquet_dataset(path, batches, schema, partition_by, compression=compression, row_group_size=row_group_size)
+            return
+
+        with pq.ParquetWriter(
+            path,
+            schema,
+            compression=compression,
+            **chocolate.filter_args(kwargs, pq.ParquetWriter.__init__),
+        ) as writer:
+            for batch in batches:
+                writer.write_batch(batch, row_group_size=row_group_size)
+
+
+    def _write_parquet_dataset (
+        self,
+        path: IOPathLike,
+        batches: typing.Iterator[pa.RecordBatch],
+        schema: pa.Schema,
+        partition_by: str,
+        *,
+        compression: str,
+        row_group_size: int,
+        ) -> None:
+        """
+Write the record batches as a Hive-partitioned dataset; see
+`save_parquet()`.
+
+    path:
+the dataset directory, which must be empty or not exist yet
+
+    batches:
+the record batches to write
+
+    schema:
+the schema for Parquet files
+
+    partition_by:
+either `"predicate"` or `"namespace"`
+
+    compression:
+name of the compression algorithm to use
+
+    row_group_size:
+number of triples in each row group
+        """
+        if not isinstance(path, str):
+            raise ValueError("The `path` for a partitioned dataset must name a directory")
+
+        partition_col = partition_by if partition_by == "predicate" else self._PARQUET_NAMESPACE
+
+        ds.write_dataset(
+            batches,
+            path,
+            schema=schema,
+            format="parquet",
+            partitioning=ds.partitioning(
+                pa.schema([ pa.field(partition_col, pa.string()) ]),
+                flavor="hive",
+            ),
+            file_options=ds.ParquetFileFormat().make_write_options(compression=compression),
+            min_rows_per_group=row_group_size,
+            max_rows_per_group=row_group_size,
+        )
+
+
+    def _parquet_batches (
+        self,
+        encode_row: typing.Callable,
+        schema: pa.Schema,
+        row_group_size: int,
+        triples: typing.Optional[ typing.Iterable[tuple] ] = None,
+        ) -> typing.Iterator[pa.RecordBatch]:
+        """
+Iterate through the triples in the RDF graph, encoding them in record
+batches of `row_group_size` rows at most.
+
+    encode_row:
+function which encodes one triple as a row in the schema
+
+    schema:
+the schema for Parquet files
+
+    row_group_size:
+maximum number of triples to buffer for each record batch
+
+    triples:
+optionally, the triples to encode instead of the RDF graph
+
+    yields:
+record batches for the row groups
+        """
+        columns: typing.List[ typing.List[ typing.Optional[str] ] ] = [ [] for _ in schema ]
+
+        for triple in (self._g if triples is None else triples): # type: ignore
+            for column, value in zip(columns, encode_row(triple)):
+                column.append(value)
+
+            if len(columns[0]) >= row_group_size:
+                yield self._parquet_batch(columns, schema)
+                columns = [ [] for _ in schema ]
+
+        if len(columns[0]) > 0:
+            yield self._parquet_batch(columns, schema)
+
+
+    @classmethod
+    def _encode_namespace_row (
+        cls,
+        encode_row: typing.Callable,
+        triple: tuple,
+        ) -> tuple:
+        """
+Encode one triple as a row, followed by the namespace of its predicate
+as the partition column.
+
+    encode_row:
+function which encodes one triple as a row in the schema
+
+    triple:
+an RDF triple
+
+    returns:
+values for the columns in the schema, plus the namespace
+        """
+        return ( *encode_row(triple), cls._iri_namespace(triple[1]), )
+
+
+    @classmethod
+    def _iri_namespace (
+        cls,
+        iri: str,
+        ) -> str:
+        """
+Extract the namespace of an IRI, up to and including its last `#` or
+`/` delimiter.
+
+    iri:
+an IRI, optionally serialized in N3 format within angle brackets
+
+    returns:
+the namespace part of the IRI
+        """
+        if iri.startswith("<") and iri.endswith(">"):
+            iri = iri[1:-1]
+
+        return iri[:max(iri.rfind("#"), iri.rfind("/")) + 1]
+
+
+    @classmethod
+    def _parquet_schema (
+        cls,
+        ) -> pa.Schema:
+        """
+Build the `pyarrow` schema for RDF graphs serialized as Parquet in the
+v1 schema, including the `pandas` metadata, so that `pandas.read_parquet()`
+gets the same dataframe as from a file which `pandas.to_parquet()` wrote.
+
+    returns:
+the v1 schema for Parquet files
+        """
+        df = pd.DataFrame(
+            [ [ "", "", "" ] ],
+            columns=cls._PARQUET_COL_NAMES,
+        )
+
+        return pa.Schema.from_pandas(df, preserve_index=False)
+
+
+    @classmethod
+    def _parquet_v2_schema (
+        cls,
+        ) -> pa.Schema:
+        """
+Build the `pyarrow` schema for RDF graphs serialized as Parquet in the
+v2 schema, where every column is dictionary-encoded.
+
+    returns:
+the v2 schema for Parquet files
+        """
+        return pa.schema([
+            pa.field(name, pa.dictionary(pa.int32(), pa.string()))
+            for name in cls._PARQUET_V2_COL_NAMES
+        ])
+
+
+    @classmethod
+    def _parquet_batch (
+        cls,
+        columns: typing.List[ typing.List[ typing.Optional[str] ] ],
+        schema: pa.Schema,
+        ) -> pa.RecordBatch:
+        """
+Convert the buffered columns of one row group into a record batch.
+For the dictionary-encoded v2 schema, the rows get sorted by predicate
+and subject first, so that runs of repeated dictionary indexes compress
+well.
+
+    columns:
+buffered column values
+
+    schema:
+the schema for Parquet files
+
+    returns:
+a record batch for the row group
+        """
+        arrays = [ pa.array(column, pa.string()) for column in columns ]
+
+        if pa.types.is_dictionary(schema.field(0).type):
+            batch = pa.record_batch(arrays, names=schema.names).sort_by([
+                ( "predicate", "ascending", ),
+                ( "subject", "ascending", ),
+            ])
+
+            arrays = [
+                array.dictionary_encode() if pa.types.is_dictionary(field.type) else array
+                for array, field in zip(batch.columns, schema)
+            ]
+
+        return pa.record_batch(arrays, schema=schema)
+
+
+    @classmethod
+    def _encode_n3_row (
+        cls,
+        triple: tuple,
+        ) -> typing.Tuple[ str, str, str ]:
+        """
+Encode one triple as a row in the v1 Parquet schema.
+
+    triple:
+an RDF triple
+
+    returns:
+the subject, predicate, and object, serialized in N3 format
+        """
+        s, p, o = triple
+        return s.n3(), p.n3(), o.n3()
+
+
+    @classmethod
+    def _encode_term_row (
+        cls,
+        triple: tuple,
+        ) -> typing.Tuple[ typing.Optional[str], ... ]:
+        """
+Encode one triple as a row in the v2 Parquet schema.
+
+    triple:
+an RDF triple
+
+    returns:
+values for the columns named in `_PARQUET_V2_COL_NAMES`
+        """
+        s, p, o = triple
+        s_kind = cls._TERM_BNODE if isinstance(s, rdflib.term.BNode) else cls._TERM_IRI
+
+        if isinstance(o, rdflib.term.Literal):
+            datatype = str(o.datatype) if o.datatype is not None else None
+            return str(s), s_kind, str(p), str(o), cls._TERM_LITERAL, datatype, o.language
+
+        o_kind = cls._TERM_BNODE if isinstance(o, rdflib.term.BNode) else cls._TERM_IRI
+        return str(s), s_kind, str(p), str(o), o_kind, None, None
+
+
+    _PARQUET_MANIFEST: str = "_kglab.json"
+    _PARQUET_REMOVED: str = "_removed"
+    _PARQUET_MANIFEST_VERSION: int = 1
+
+    def _append_parquet (
+        self,
+        path: IOPathLike,
+        schema_version: int,
+        *,
+        encoder: typing.Tuple[ typing.Callable, pa.Schema, int ],
+        compression: str,
+        kwargs: dict,
+        ) -> None:
+        """
+Write the triples which changed since the previous save to a dataset
+in `"append"` mode as a new part; see `save_parquet()`.
+The store keeps a mark in its change log for the revision of the
+dataset which it saved last.
+
+    path:
+the dataset directory
+
+    schema_version:
+version of the Parquet schema to write
+
+    encoder:
+the function which encodes one triple as a row in the schema, the schema for Parquet files, and the maximum number of triples in each row group
+
+    compression:
+name of the compression algorithm to use
+
+    kwargs:
+extra arguments for the `pyarrow.parquet.ParquetWriter`
+        """
+        store = self._g.store  # type: ignore
+
+        if not isinstance(store, PropertyStore):
+            raise ValueError("The `append` mode requires a graph which uses the `kglab` store")
+
+        if store.in_transaction:
+            raise ValueError("The `append` mode cannot save uncommitted changes; commit or roll back the transaction first")
+
+        if hasattr(path, "write") or self._get_filename(path) is None:  # type: ignore
+            raise ValueError("The `path` for `append` mode must name a directory")
+
+        path = pathlib.Path(self._get_filename(path))  # type: ignore
+        path.mkdir(parents=True, exist_ok=True)
+        manifest = self._read_parquet_manifest(path)
+        is_new = manifest is None
+
+        if manifest is None:
+            if any(path.iterdir()):
+                raise ValueError(f"The directory is neither empty nor a dataset written in `append` mode: {path}")
+
+            manifest = {
+                "version": self._PARQUET_MANIFEST_VERSION,
+                "schema_version": schema_version,
+                "revision": 0,
+                "next_part": 0,
+                "parts": [],
+            }
+        elif manifest["schema_version"] != schema_version:
+            raise ValueError(f"The dataset uses the Parquet `schema_version` value: {manifest['schema_version']}")
+
+        position, added_table, removed_table = self._parquet_changes(store, path, manifest, encoder)
+
+        if added_table.num_rows < 1 and removed_table.num_rows < 1:
+            if is_new:
+                self._write_parquet_manifest(path, manifest)
+
+            store.mark_changes(self._parquet_mark(path, manifest), position)
+            return
+
+        part_name = f"part-{manifest['next_part']:05d}.parquet"
+        part: typing.Dict[ str, typing.Any ] = {
+            "added": None,
+            "removed": None,
+            "num_added": added_table.num_rows,
+            "num_removed": removed_table.num_rows,
+        }
+
+        if added_table.num_rows > 0:
+            part["added"] = part_name
+            self._write_parquet_part(path / part_name, added_table, compression, encoder[2], kwargs)
+
+        if removed_table.num_rows > 0:
+            part["removed"] = f"{self._PARQUET_REMOVED}/{part_name}"
+            (path / self._PARQUET_REMOVED).mkdir(exist_ok=True)
+            self._write_parquet_part(path / part["removed"], removed_table, compression, encoder[2], kwargs)
+
+        previous_mark = self._parquet_mark(path, manifest)
+        manifest["parts"].append(part)
+        manifest["next_part"] += 1
+        manifest["revision"] += 1
+        self._write_parquet_manifest(path, manifest)
+
+        store.mark_changes(self._parquet_mark(path, manifest), position, replace=previous_mark)
+
+
+    @classmethod
+    def _parquet_mark (
+        cls,
+        path: pathlib.Path,
+        manifest: dict,
+        ) -> str:
+        """
+Name the mark in the change log of a store for the current revision
+of a dataset in `"append"` mode.
+
+    path:
+the dataset directory
+
+    manifest:
+the manifest of the dataset
+
+    returns:
+name of the mark
+        """
+        return f"parquet:{path.resolve()}#{manifest['revision']}"
+
+
+    def _parquet_changes (
+        self,
+        store: PropertyStore,
+        path: pathlib.Path,
+        manifest: dict,
+        encoder: typing.Tuple[ typing.Callable, pa.Schema, int ],
+        ) -> typing.Tuple[ int, pa.Table, pa.Table ]:
+        """
+Find the triples which changed since the revision of a dataset in
+`"append"` mode: from the mark for that revision in the change log of
+the store, if any; otherwise by comparing the graph with the dataset,
+after setting the mark, so that later changes get saved next time.
+
+    store:
+the store of the graph
+
+    path:
+the dataset directory
+
+    manifest:
+the manifest of the dataset
+
+    encoder:
+the function which encodes one triple as a row in the schema, the schema for Parquet files, and the maximum number of triples in each row group
+
+    returns:
+the position in the change log, then the tables of added and removed triples
+        """
+        encode_row, schema, row_group_size = encoder
+        mark_name = self._parquet_mark(path, manifest)
+
+        # drop the marks for earlier revisions, which another writer has
+        # since replaced, so that they do not keep the change log from
+        # getting trimmed
+        stale_prefix = mark_name[:mark_name.rindex("#") + 1]
+
+        for name in store.change_marks():
+            if name.startswith(stale_prefix) and name != mark_name:
+                store.unmark_changes(name)
+
+        changes = store.changes_since(mark_name)
+
+        if changes is not None:
+            position, added, removed = changes
+
+            return (
+                position,
+                pa.Table.from_batches(list(self._parquet_batches(encode_row, schema, row_group_size, added)), schema),
+                pa.Table.from_batches(list(self._parquet_batches(encode_row, schema, row_group_size, removed)), schema),
+            )
+
+        position = store.mark_changes(mark_name)
+        graph_table = pa.Table.from_batches(list(self._parquet_batches(encode_row, schema, row_group_size)), schema)
+
+        if len(manifest["parts"]) < 1:
+            return position, graph_table, schema.empty_table()
+
+        live_table = self._read_parquet_parts(path, manifest)
+        graph_keys = self._parquet_row_keys(graph_table)
+        live_keys = self._parquet_row_keys(live_table)
+
+        return (
+            position,
+            graph_table.filter(pc.invert(pc.is_in(graph_keys, value_set=live_keys))),  # pylint: disable=E1101
+            live_table.filter(pc.invert(pc.is_in(live_keys, value_set=graph_keys))),  # pylint: disable=E1101
+        )
+
+
+    @classmethod
+    def compact_parquet (
+        cls,
+        path: PathLike,
+        *,
+        compression: str = "snappy",
+        row_group_size: int = 100000,
+        **kwargs: typing.Any,
+        ) -> None:
+        """
+Compact a dataset written by [`save_parquet()`](#save_parquet-method) in `"append"` mode: merge its parts into one part file, dropping the removed triples, then delete the previous part files.
+The manifest gets replaced atomically before any files get deleted, so that readers always see a consistent dataset; and since the triples do not change, later saves in `"append"` mode continue from the same revision.
+
+    path:
+the dataset directory, as a file name (str) or path object to a local file reference
+
+    compression:
+name of the compression algorithm to use; defaults to `"snappy"`
+
+    row_group_size:
+maximum number of triples in each row group; defaults to `100000`
+        """
+        path = pathlib.Path(cls._get_filename(path))  # type: ignore
+        manifest = cls._read_parquet_manifest(path)
+
+        if manifest is None:
+            raise ValueError(f"The directory is not a dataset written in `append` mode: {path}")
+
+        table = cls._read_parquet_parts(path, manifest)
+
+        previous = [
+            path / name
+            for part in manifest["parts"]
+            for name in ( part["added"], part["removed"], )
+            if name is not None
+        ]
+
+        part_name = f"part-{manifest['next_part']:05d}.parquet"
+        part: typing.Dict[ str, typing.Any ] = {
+            "added": None,
+            "removed": None,
+            "num_added": table.num_rows,
+            "num_removed": 0,
+        }
+
+        if table.num_rows > 0:
+            part["added"] = part_name
+            cls._write_parquet_part(path / part_name, table, compression, row_group_size, kwargs)
+
+        manifest["parts"] = [ part ]
+        manifest["next_part"] += 1
+        cls._write_parquet_manifest(path, manifest)
+
+        for file_path in previous:
+            file_path.unlink(missing_ok=True)
+
+        removed_path = path / cls._PARQUET_REMOVED
+
+        if removed_path.is_dir() and not any(removed_path.iterdir()):
+            removed_path.rmdir()
+
+
+    @classmethod
+    def _read_parquet_manifest (
+        cls,
+        path: IOPathLike,
+        ) -> typing.Optional[dict]:
+        """
+Read the manifest of a dataset written in `"append"` mode.
+
+    path:
+the dataset directory
+
+    returns:
+the manifest; otherwise `None` if the path is not a local directory which has one
+        """
+        if not isinstance(path, ( str, pathlib.Path, )):
+            return None
+
+        manifest_path = pathlib.Path(path) / cls._PARQUET_MANIFEST
+
+        if not manifest_path.is_file():
+            return None
+
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        if manifest.get("version") != cls._PARQUET_MANIFEST_VERSION:
+            raise ValueError(f"Unknown version for a Parquet dataset manifest: {manifest.get('version')}")
+
+        return manifest
+
+
+    @classmethod
+    def _write_parquet_manifest (
+        cls,
+        path: pathlib.Path,
+        manifest: dict,
+        ) -> None:
+        """
+Write the manifest of a dataset written in `"append"` mode atomically,
+replacing any previous version.
+
+    path:
+the dataset directory
+
+    manifest:
+the manifest
+        """
+        manifest_path = path / cls._PARQUET_MANIFEST
+        tmp_path = manifest_path.with_name(f"{manifest_path.name}.{os.getpid()}.tmp")
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(tmp_path, manifest_path)
+
+
+    @classmethod
+    def _write_parquet_part (
+        cls,
+        file_path: pathlib.Path,
+        table: pa.Table,
+        compression: str,
+        row_group_size: int,
+        kwargs: dict,
+        ) -> None:
+        """
+Write one part file of a dataset written in `"append"` mode.
+
+    file_path:
+path for the part file
+
+    table:
+the triples, in either the v1 or the v2 schema
+
+    compression:
+name of the compression algorithm to use
+
+    row_group_size:
+maximum number of triples in each row group
+
+    kwargs:
+extra arguments for the `pyarrow.parquet.ParquetWriter`
+        """
+        with pq.ParquetWriter(
+            str(file_path),
+            table.schema,
+            compression=compression,
+            **chocolate.filter_args(kwargs, pq.ParquetWriter.__init__),
+        ) as writer:
+            writer.write_table(table, row_group_size=row_group_size)
+
+
+    @classmethod
+    def _read_parquet_parts (
+        cls,
+        path: pathlib.Path,
+        manifest: dict,
+        ) -> pa.Table:
+        """
+Read the triples of a dataset written in `"append"` mode, by applying
+its parts in order: first dropping the triples which each part removes,
+then adding the triples which it adds.
+
+    path:
+the dataset directory
+
+    manifest:
+the manifest of the dataset
+
+    returns:
+table of the triples in the dataset
+        """
+        tables: typing.List[pa.Table] = []
+        keys: typing.List[pa.Array] = []
+
+        for part in manifest["parts"]:
+            if part["removed"] is not None and len(tables) > 0:
+                removed_keys = cls._parquet_row_keys(pq.read_table(path / part["removed"]))
+                live_keys = pa.chunked_array(keys, pa.string())
+                keep = pc.invert(pc.is_in(live_keys, value_set=removed_keys))  # pylint: disable=E1101
+
+                tables = [ pa.concat_tables(tables).filter(keep) ]
+                keys = [ live_keys.filter(keep).combine_chunks() ]
+
+            if part["added"] is not None:
+                table = pq.read_table(path / part["added"])
+                tables.append(table)
+                keys.append(cls._parquet_row_keys(table))
+
+        if len(tables) < 1:
+            schema = cls._parquet_schema() if manifest["schema_version"] == 1 else cls._parquet_v2_schema()
+            return schema.empty_table()
+
+        return pa.concat_tables(tables)
+
+
+    @classmethod
+    def _parquet_row_keys (
+        cls,
+        table: pa.Table,
+        ) -> pa.Array:
+        """
+Build a key for each row in a table of triples, by joining all of its
+columns, so that the rows of two tables can be compared.
+
+    table:
+the triples, in either the v1 or the v2 schema
+
+    returns:
+array of the row keys
+        """
+        columns = [
+            pc.cast(table.column(name), pa.string())
+            for name in table.column_names
+            if name != cls._PARQUET_NAMESPACE
+        ]
+
+        keys = pc.binary_join_element_wise(*columns, "\0", null_handling="replace", null_replacement="")  # pylint: disable=E1101
+
+        return keys.combine_chunks() if isinstance(keys, pa.ChunkedArray) else keys
+
+
+    @multifile()
+    def load_arrow (
+        self,
+        path: IOPathLike,
+        *,
+        memory_map: bool = True,
+        ) -> "KnowledgeGraph": # type: ignore
+        """
+Parses an RDF graph serialized as an [Arrow IPC](https://arrow.apache.org/docs/python/ipc.html) file, also known as a [Feather](https://arrow.apache.org/docs/python/feather.html) v2 file, such as [`save_arrow()`](#save_arrow-method) writes.
+Since the IPC format is the same as the in-memory layout of Arrow, a memory-mapped file gets read without copying or decoding its columns; only the distinct terms get decoded into `rdflib` terms.
+
+Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
+
+    path:
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object) which is also seekable
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
+
+    memory_map:
+memory-map a local file, instead of reading it into memory; defaults to `True`
+
+    returns:
+this `KnowledgeGraph` object – used for method chaining
+        """
+        if hasattr(path, "read"):
+            source = path
+        elif memory_map:
+            source = pa.memory_map(self._get_filename(path), "r")  # type: ignore
+        else:
+            source = pa.OSFile(self._get_filename(path), "r")  # type: ignore
+
+        try:
+            table = pa.ipc.open_file(source).read_all()
+        finally:
+            if source is not path:
+                source.close()  # type: ignore
+
+        self._add_arrow_table(table)
+        return self
+
+
+    def save_arrow (
+        self,
+        path: IOPathLike,
+        *,
+        compression: typing.Optional[str] = None,
+        row_group_size: int = 100000,
+        ) -> None:
+        """
+Serializes an RDF graph to an [Arrow IPC](https://arrow.apache.org/docs/python/ipc.html) file, also known as a [Feather](https://arrow.apache.org/docs/python/feather.html) v2 file, using the columns of the v2 Parquet schema; see [`save_parquet()`](#save_parquet-method).
+Each column is dictionary-encoded, with one dictionary of terms shared by all of the record batches, and the namespaces of the graph get stored in the schema metadata.
+
+    path:
+must be a file name (str), path object to a local file reference, or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object)
+
+    compression:
+optionally, compress the buffers with either `"lz4"` or `"zstd"`, which makes the file smaller although it can no longer be read without copying; defaults to `None` for no compression
+
+    row_group_size:
+maximum number of triples in each record batch; defaults to `100000`
+        """
+        if row_group_size < 1:
+            raise ValueError("The `row_group_size` value must be a positive integer")
+
+        table = self._arrow_table(row_group_size)
+        options = pa.ipc.IpcWriteOptions(compression=compression)
+
+        if hasattr(path, "write"):
+            sink = path
+        else:
+            sink = pa.OSFile(self._get_filename(path), "wb")  # type: ignore
+
+        try:
+            with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table, max_chunksize=row_group_size)
+        finally:
+            if sink is not path:
+                sink.close()  # type: ignore
@@ -58,15 +58,25 @@ text for the SPARQL query
 initial variable bindings
 
     yields:
-[`rdflib.query.ResultRow`](https://rdflib.readthedocs.io/en/stable/_modules/rdflib/query.html?highlight=ResultRow#) named tuples, to iterate through the query result set
+[`rdflib.query.ResultRow`](https://rdflib.readthedocs.io/en/stable/_modules/rdflib/query.html?highlight=ResultRow#) named tuples, to iterate through the query result set; each row gets evaluated under the read lock, which is released while the caller handles the row, so writes made between rows may show up in the rows which follow – use [`query_as_df()`](#query_as_df-method) for a consistent result set
         """
         if not bindings:
             bindings = {}
 
-        yield from self._g.query(  # type: ignore
+        with self.lock.read():
+            rows = iter(self._g.query(  # type: ignore
                 sparql,
                 initBindings = bindings,
-            )
+            ))
+
+        while True:
+            with self.lock.read():
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    return
+
+            yield row
 
 
     def query_as_df (
@@ -99,12 +109,13 @@ the query result set represented as a [`pandas.DataFrame`](https://pandas.pydata
         if not bindings:
             bindings = {}
 
-        row_iter = self._g.query(sparql, initBindings = bindings) # type: ignore
+        with self.lock.read():
+            row_iter = self._g.query(sparql, initBindings = bindings) # type: ignore
 
-        if simplify:
-            rows_list = [ self.n3fy_row(r.asdict(), pythonify = pythonify) for r in row_iter ]
-        else:
-            rows_list = [ r.asdict() for r in row_iter ]
+            if simplify:
+                rows_list = [ self.n3fy_row(r.asdict(), pythonify = pythonify) for r in row_iter ]
+            else:
+                rows_list = [ r.asdict() for r in row_iter ]
 
         if self.use_gpus:
             df = cudf.DataFrame(rows_list)  # pylint: disable=E0606
@@ -4,12 +4,21 @@ see license https://github.com/DerwenAI/kglab#license-and-copyright
 """
 
 ## Python standard libraries
+import bz2
 import codecs
+from concurrent.futures import ProcessPoolExecutor
+import configparser
 import datetime
+import functools
+import gzip
 import io
 import json
+import lzma
+import os
 import pathlib
+import string
 import typing
+import urllib.parse
 
 ### third-parties libraries
 from icecream import ic  # type: ignore
@@ -17,32 +26,34 @@ import apeye.url
 import chocolate  # type: ignore
 import csvwlib  # type: ignore
 import morph_kgc  # type: ignore
+import numpy as np  # type: ignore  # pylint: disable=E0401
 import pandas as pd  # type: ignore
+import pyarrow as pa  # type: ignore  # pylint: disable=E0401
 
 import rdflib  # type: ignore
 import rdflib.plugin  # type: ignore
 import rdflib.plugins.parsers.notation3 as rdf_n3  # type: ignore
 
 ## kglab - core classes
+from .cache import ParseCache
 from .decorators import multifile
+from .graph import BatchGraph, PropertyStore
+from .hdt import HDTFile
 from .pkg_types import IOPathLike, PathLike
-from .util import get_gpu_count, Mixin
+from .util import Mixin
 from .version import _check_version
 
 
 ## pre-constructor set-up
 _check_version()
 
-if get_gpu_count() > 0:
-    import cudf  # type: ignore  # pylint: disable=E0401
-
 
 class SerdeMixin (Mixin):
     """
 Provide serialization and deserialization methods for `KnowledgeGraph`:
 * RDF
 * JSONLD
-* Parquet
+* HDT
 * CSV
 * Morph-KGC
 * ROAM
@@ -147,6 +158,271 @@ a string as a file name or URL to a file reference
         return filename
 
 
+    _COMPRESSION_SUFFIXES: typing.Dict[ str, str ] = {
+        ".gz": "gzip",
+        ".gzip": "gzip",
+        ".bz2": "bz2",
+        ".xz": "xz",
+        ".zst": "zstd",
+        ".zstd": "zstd",
+    }
+
+    _COMPRESSION_MAGIC: typing.List[ typing.Tuple[ bytes, str ] ] = [
+        ( b"\x1f\x8b", "gzip", ),
+        ( b"BZh", "bz2", ),
+        ( b"\xfd7zXZ\x00", "xz", ),
+        ( b"\x28\xb5\x2f\xfd", "zstd", ),
+    ]
+
+    @classmethod
+    def _get_compression (
+        cls,
+        filename: str,
+        ) -> typing.Optional[str]:
+        """
+Semiprivate method to detect whether a local file is compressed, first
+by its suffix, otherwise by the magic bytes at the start of the file.
+
+    filename:
+name of a local file
+
+    returns:
+the compression format, one of `"gzip"`, `"bz2"`, `"xz"`, or `"zstd"`; otherwise `None`
+        """
+        compression = cls._COMPRESSION_SUFFIXES.get(pathlib.PurePath(filename).suffix.lower())
+
+        if compression is not None:
+            return compression
+
+        with open(filename, "rb") as f:
+            head = f.read(6)
+
+        for magic, compression in cls._COMPRESSION_MAGIC:
+            if head.startswith(magic):
+                return compression
+
+        return None
+
+
+    _DECOMPRESSORS: typing.Dict[ str, typing.Callable ] = {
+        "gzip": lambda filename: gzip.open(filename, "rb"),
+        "bz2": lambda filename: bz2.open(filename, "rb"),
+        "xz": lambda filename: lzma.open(filename, "rb"),
+        "zstd": lambda filename: io.BufferedReader(pa.CompressedInputStream(pa.OSFile(filename), "zstd")),
+    }
+
+    @classmethod
+    def _open_decompressed (
+        cls,
+        path: PathLike,
+        ) -> typing.Optional[typing.BinaryIO]:
+        """
+Semiprivate method to open a compressed local file as a stream which
+decompresses its content incrementally while it gets read, so that the
+parsers never need a temporary file.
+The `zstd` format uses the codec in `pyarrow`.
+
+    path:
+a file name (str), path object, or URL
+
+    returns:
+a readable, binary file-like object; otherwise `None` if the path is not a compressed local file
+        """
+        if isinstance(path, apeye.url.URL):
+            return None
+
+        filename = cls._get_filename(path)
+
+        if filename is None or not os.path.isfile(filename):
+            return None
+
+        opener = cls._DECOMPRESSORS.get(cls._get_compression(filename))  # type: ignore
+
+        if opener is None:
+            return None
+
+        return opener(filename)
+
+
+    def _shard_config (
+        self,
+        ) -> dict:
+        """
+Semiprivate method to build the constructor arguments for a blank copy
+of this graph, into which a worker process parses one file; see the
+`@multifile` decorator.
+
+    returns:
+keyword arguments for the constructor
+        """
+        return {
+            "name": self.name,
+            "base_uri": self.base_uri,
+            "language": self.language,
+            "use_gpus": False,
+            "namespaces": {
+                prefix: str(ns)
+                for prefix, ns in self._ns.items()
+            },
+        }
+
+
+    @classmethod
+    def _load_shard (
+        cls,
+        config: dict,
+        method_name: str,
+        args: tuple,
+        kwargs: dict,
+        ) -> typing.Tuple[ bytes, dict, dict ]:
+        """
+Semiprivate method which runs in a worker process to parse one file
+into a blank graph, then serializes the results so that they can be
+merged into the target graph; see the `@multifile` decorator.
+
+    config:
+keyword arguments for the constructor
+
+    method_name:
+name of the reader method
+
+    args:
+positional arguments for the reader method, excluding `self`
+
+    kwargs:
+keyword arguments for the reader method
+
+    returns:
+the parsed triples as a Parquet file in the v2 schema, the namespaces
+added to the graph, and the prefixes bound in its namespace manager
+        """
+        kg = cls(**config)
+        getattr(cls, method_name).__wrapped__(kg, *args, **kwargs)
+
+        buf = io.BytesIO()
+        kg.save_parquet(buf, schema_version=2)
+
+        return ( buf.getvalue(), *kg._namespace_state(), )  # pylint: disable=W0212
+
+
+    def _merge_shard (
+        self,
+        shard: typing.Tuple[ bytes, dict, dict ],
+        ) -> None:
+        """
+Semiprivate method to merge the results of `_load_shard()` into this
+graph; see the `@multifile` decorator.
+
+    shard:
+the parsed triples, namespaces, and prefix bindings from one file
+        """
+        data, namespaces, bindings = shard
+        self._merge_namespaces(namespaces, bindings)
+        self.load_parquet(io.BytesIO(data))
+
+
+    def _namespace_state (
+        self,
+        ) -> typing.Tuple[ dict, dict ]:
+        """
+Semiprivate method to collect the namespaces of this graph, so that
+they can be merged into another graph.
+
+    returns:
+the namespaces added to the graph, and the prefixes bound in its namespace manager
+        """
+        namespaces = {
+            prefix: str(ns)
+            for prefix, ns in self._ns.items()
+        }
+
+        bindings = {
+            prefix: str(iri)
+            for prefix, iri in self._g.namespace_manager.namespaces()  # type: ignore
+        }
+
+        return namespaces, bindings
+
+
+    def _merge_namespaces (
+        self,
+        namespaces: dict,
+        bindings: dict,
+        ) -> None:
+        """
+Semiprivate method to merge the namespaces from another graph, without
+overriding any prefixes which this graph already uses.
+
+    namespaces:
+the namespaces added to the other graph
+
+    bindings:
+the prefixes bound in the namespace manager of the other graph
+        """
+        for prefix, iri in namespaces.items():
+            if prefix not in self._ns:
+                self.add_ns(prefix, iri)
+
+        for prefix, iri in bindings.items():
+            self._g.namespace_manager.bind(prefix, iri, override=False)  # type: ignore
+
+
+    def _load_cached (
+        self,
+        cache: ParseCache,
+        loader: str,
+        path: IOPathLike,
+        options: dict,
+        ) -> bool:
+        """
+Semiprivate method to load a local file through a parse cache: on a
+hit, the triples get added from the cached Arrow table; on a miss, the
+file gets parsed into a blank graph, which gets stored in the cache then
+merged into this graph.
+
+    cache:
+the parse cache
+
+    loader:
+name of the reader method
+
+    path:
+the file to load
+
+    options:
+keyword arguments for the reader method, which also become part of the cache key
+
+    returns:
+`False` if the path cannot be cached, such as a file-like object or a URL; otherwise `True`
+        """
+        if hasattr(path, "read") or isinstance(path, apeye.url.URL):
+            return False
+
+        filename = self._get_filename(path)  # type: ignore
+
+        if filename is None or not os.path.isfile(filename):
+            return False
+
+        key = cache.get_key(filename, loader, { **options, "base_uri": self.base_uri })
+        table = cache.get(key)
+
+        if table is not None:
+            self._add_arrow_table(table)
+            return True
+
+        kg = type(self)(**self._shard_config())  # type: ignore
+        getattr(type(self), loader).__wrapped__(kg, path, **options)
+        cache.put(key, kg._arrow_table())  # pylint: disable=W0212
+
+        self._merge_namespaces(*kg._namespace_state())  # pylint: disable=W0212
+        self._g.addN(  # type: ignore
+            (s, p, o, self._g)
+            for s, p, o in kg._g  # pylint: disable=W0212
+        )
+
+        return True
+
+
     @multifile()
     def load_rdf (
         self,
@@ -154,6 +430,7 @@ a string as a file name or URL to a file reference
         *,
         format: str = "ttl",
         base: str = None,
+        cache: typing.Optional[ParseCache] = None,
         **args: typing.Any,
         ) -> "KnowledgeGraph": # type: ignore
         """
@@ -164,7 +441,10 @@ Throws `TypeError` whenever a format parser plugin encounters a syntax error.
 Note: this adds relations to an RDF graph, although it does not overwrite the existing RDF graph.
 
     path:
-must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); otherwise this throws a `TypeError` exception
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); a local file compressed with `gzip`, `bzip2`, `xz`, or `zstd` – detected by its suffix or its leading magic bytes – gets decompressed as a stream while it is parsed; otherwise this throws a `TypeError` exception
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
 
     format:
 serialization format, defaults to Turtle triples; see `_RDF_FORMAT` for a list of default formats, which can be extended with plugins – excluding the `"json-ld"` format; otherwise this throws a `TypeError` exception
@@ -172,6 +452,9 @@ serialization format, defaults to Turtle triples; see `_RDF_FORMAT` for a list o
     base:
 logical URI to use as the document base; if not specified, the document location gets used
 
+    cache:
+optionally, a [`ParseCache`](#parsecache-class) which stores the parsed triples of local files, so that repeated loads of an unchanged file skip parsing
+
     returns:
 this `KnowledgeGraph` object – used for method chaining
         """
@@ -181,20 +464,36 @@ this `KnowledgeGraph` object – used for method chaining
 
         self._check_format(format)
 
+        if cache is not None and self._load_cached(cache, "load_rdf", path, { "format": format, "base": base, **args }):
+            return self
+
         # substitute the `KnowledgeGraph.base_uri` as the document base, if used
         if not base and self.base_uri:
             base = self.base_uri
 
+        # a `PropertyStore` gets loaded in batches through its `addN()`
+        if isinstance(self._g.store, PropertyStore):  # type: ignore
+            sink = BatchGraph(self._g)  # type: ignore
+        else:
+            sink = self._g  # type: ignore
+
+        # a compressed file gets decompressed while it is parsed, with
+        # the location of the file as its document base
+        source = path if hasattr(path, "read") else self._open_decompressed(path)  # type: ignore
+
+        if source is not None and source is not path and not base:
+            base = pathlib.Path(self._get_filename(path)).absolute().as_uri()  # type: ignore
+
         try:
-            if hasattr(path, "read"):
-                self._g.parse(  # type: ignore
-                    path,
+            if source is not None:
+                sink.parse(  # type: ignore
+                    source,
                     format=format,
                     publicID=base,
                     **args,
                     )
             else:
-                self._g.parse(  # type: ignore
+                sink.parse(  # type: ignore
                     self._get_filename(path),
                     format=format,
                     publicID=base,
@@ -203,6 +502,12 @@ this `KnowledgeGraph` object – used for method chaining
         except rdf_n3.BadSyntax as e:
             ic(path)
             raise TypeError(str(e))
+        finally:
+            if source is not None and source is not path:
+                source.close()
+
+            if isinstance(sink, BatchGraph):
+                sink.flush()
 
         return self
 
@@ -257,14 +562,17 @@ this `KnowledgeGraph` object – used for method chaining
         format: str = "ttl",
         base: str = None,
         encoding: str = "utf-8",
+        streaming: bool = False,
         **args: typing.Any,
         ) -> None:
         """
 Wrapper for [`rdflib.Graph.serialize()`](https://rdflib.readthedocs.io/en/stable/apidocs/rdflib.html?highlight=serialize#rdflib.Graph.serialize) which serializes the RDF graph to the `path` destination.
 This traps some edge cases for the `destination` parameter in RDFlib which had been overloaded.
 
+Optionally, the line-based [N-Triples](https://www.w3.org/TR/n-triples/) and [N-Quads](https://www.w3.org/TR/n-quads/) formats can be written by a streaming serializer instead, which encodes the triples while iterating through the graph and writes them in buffered chunks, so that memory use stays constant regardless of the size of the graph.
+
     path:
-must be a file name (str) or a path object (not a URL) to a local file reference; or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object); otherwise this throws a `TypeError` exception
+must be a file name (str) or a path object (not a URL) to a local file reference; or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object); otherwise this throws a `TypeError` exception; when `streaming`, a file name with a `.gz`, `.bz2`, `.xz`, or `.zst` suffix gets written as a compressed stream
 
     format:
 serialization format, which defaults to Turtle triples; see `_RDF_FORMAT` for a list of default formats, which can be extended with plugins – excluding the `"json-ld"` format; otherwise this throws a `TypeError` exception
@@ -274,6 +582,9 @@ optional base set for the graph
 
     encoding:
 optional text encoding value, defaults to `"utf-8"`, must be in the [Python codec registry](https://docs.python.org/3/library/codecs.html#codecs.CodecInfo); otherwise this throws a `LookupError` exception
+
+    streaming:
+optionally, use the streaming serializer, which supports the `"nt"`, `"nt11"`, `"ntriples"`, and `"nquads"` formats, always encoded as UTF-8; otherwise this throws a `ValueError` exception
         """
         # error checking for the `format` parameter
         if format == "json-ld":
@@ -284,6 +595,10 @@ optional text encoding value, defaults to `"utf-8"`, must be in the [Python code
         # error checking for the `encoding` parameter
         self._check_encoding(encoding)
 
+        if streaming:
+            self._save_ntriples(path, format)
+            return
+
         # substitute the `KnowledgeGraph.base_uri` base set for the graph, if used
         if not base and self.base_uri:
             base = self.base_uri
@@ -315,6 +630,36 @@ optional text encoding value, defaults to `"utf-8"`, must be in the [Python code
             )
 
 
+    @classmethod
+    def _open_compressed_output (
+        cls,
+        filename: str,
+        ) -> typing.BinaryIO:
+        """
+Semiprivate method to open a local file for writing, as a stream which
+compresses its content if the file name has a `.gz`, `.bz2`, `.xz`, or
+`.zst` suffix.
+
+    filename:
+name of a local file
+
+    returns:
+a writable, binary file-like object
+        """
+        compression = cls._COMPRESSION_SUFFIXES.get(pathlib.PurePath(filename).suffix.lower())
+
+        if compression == "gzip":
+            return gzip.open(filename, "wb")  # type: ignore
+        if compression == "bz2":
+            return bz2.open(filename, "wb")  # type: ignore
+        if compression == "xz":
+            return lzma.open(filename, "wb")  # type: ignore
+        if compression == "zstd":
+            return pa.CompressedOutputStream(filename, "zstd")  # type: ignore
+
+        return open(filename, "wb")  # pylint: disable=R1732
+
+
     def save_rdf_text (
         self,
         *,
@@ -363,6 +708,7 @@ text representing the RDF graph
         path: IOPathLike,
         *,
         encoding: str = "utf-8",
+        cache: typing.Optional[ParseCache] = None,
         **args: typing.Any,
         ) -> "KnowledgeGraph": # type: ignore
         """
@@ -372,28 +718,49 @@ This traps some edge cases for the several source-ish parameters in RDFlib which
 Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
 
     path:
-must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object)
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); a local file compressed with `gzip`, `bzip2`, `xz`, or `zstd` – detected by its suffix or its leading magic bytes – gets decompressed as a stream while it is parsed
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
 
     encoding:
 optional text encoding value, which defaults to `"utf-8"`; must be in the [Python codec registry](https://docs.python.org/3/library/codecs.html#codecs.CodecInfo); otherwise this throws a `LookupError` exception
 
+    cache:
+optionally, a [`ParseCache`](#parsecache-class) which stores the parsed triples of local files, so that repeated loads of an unchanged file skip parsing
+
     returns:
 this `KnowledgeGraph` object – used for method chaining
         """
         # error checking for the `encoding` parameter
         self._check_encoding(encoding)
 
-        # error checking for a file-like object `path` parameter
+        if cache is not None and self._load_cached(cache, "load_jsonld", path, { "encoding": encoding, **args }):
+            return self
+
+        # error checking for a file-like object `path` parameter; a
+        # compressed file gets decompressed as a stream
         if hasattr(path, "read"):
             f = path
         else:
-            f = open(path, "r", encoding = encoding)  # type: ignore  # pylint: disable=R1732
+            stream = self._open_decompressed(path)  # type: ignore
+
+            if stream is not None:
+                f = io.TextIOWrapper(stream, encoding = encoding)
+            else:
+                f = open(path, "r", encoding = encoding)  # type: ignore  # pylint: disable=R1732
 
         # load JSON from file (to verify format and trap exceptions at
         # this level) then dump to string – which is expected by the
         # JSON-LD plugin for RDFlib
+        try:
+            data = json.dumps(json.load(f))  # type: ignore
+        finally:
+            if f is not path:
+                f.close()  # type: ignore
+
         self._g.parse( # type: ignore
-            data = json.dumps(json.load(f)),  # type: ignore
+            data = data,
             format = "json-ld",
             encoding = encoding,
             **args,
@@ -442,198 +809,591 @@ optional text encoding value, which defaults to `"utf-8"`; must be in the [Pytho
         )
 
 
-    _PARQUET_COL_NAMES: typing.List[str] = [
-        "subject",
-        "predicate",
-        "object"
-    ]
-
     @multifile()
-    def load_parquet (
+    def load_hdt (
         self,
         path: IOPathLike,
-        **kwargs: typing.Any,
         ) -> "KnowledgeGraph": # type: ignore
         """
-Wrapper for [`pandas.read_parquet()`](https://pandas.pydata.org/docs/reference/api/pandas.read_parquet.html?highlight=read_parquet#pandas.read_parquet) which parses an RDF graph represented as a [Parquet](https://parquet.apache.org/) file, using the [`pyarrow`](https://arrow.apache.org/) engine.
-Uses the [RAPIDS `cuDF` library](https://docs.rapids.ai/api/cudf/stable/) if GPUs are enabled.
+Parses an RDF graph serialized in the compact binary format, in the style of [HDT](https://www.rdfhdt.org/), which [`save_hdt()`](#save_hdt-method) writes.
+Since the terms are stored once each, in a sorted dictionary, each distinct term gets decoded once, then the triples get added in batches from their arrays of term IDs.
 
-To prepare for upcoming **kglab** features, **this is the preferred method for deserializing an RDF graph.**
+To answer triple patterns directly from a file, without loading it, use an [`HDTFile`](#hdtfile-class) instead.
 
 Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
 
     path:
-must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); a string could be a URL; valid URL schemes include `https`, `http`, `ftp`, `s3`, `gs`, `file`; a file URL can also be a path to a directory that contains multiple partitioned files, including a bucket in cloud storage – based on [`fsspec`](https://github.com/intake/filesystem_spec)
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object)
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
 
     returns:
 this `KnowledgeGraph` object – used for method chaining
         """
-        if self.use_gpus:
-            df = cudf.read_parquet(  # pylint: disable=E0606
-                path,
-                **chocolate.filter_args(kwargs, pd.read_parquet)
-            ).to_pandas()
+        if not hasattr(path, "read"):
+            path = self._get_filename(path)  # type: ignore
 
-        else:
-            df = pd.read_parquet(
-                path,
-                **chocolate.filter_args(kwargs, pd.read_parquet)
-            )
-
-        df.apply(
-            lambda row: self._g.parse( # type: ignore
-                data=f"{ row[0] } { row[1] } { row[2] } .",
-                format="ttl",
-            ),
-            axis=1,
-        )
+        with HDTFile(path) as hdt:
+            self._merge_namespaces(hdt.namespaces, hdt.bindings)
+            hdt.add_to(self._g)  # type: ignore
 
         return self
 
 
-    def save_parquet (
+    def save_hdt (
         self,
         path: IOPathLike,
         *,
-        compression: str = "snappy",
-        storage_options: dict = None, # pylint: disable=W0613
-        **kwargs: typing.Any,
+        block_size: int = HDTFile.BLOCK_SIZE,
         ) -> None:
         """
-Wrapper for [`pandas.to_parquet()`](https://pandas.pydata.org/docs/reference/api/pandas.DataFrame.to_parquet.html?highlight=to_parquet) which serializes an RDF graph to a [Parquet](https://parquet.apache.org/) file, using the [`pyarrow`](https://arrow.apache.org/) engine.
-Uses the [RAPIDS `cuDF` library](https://docs.rapids.ai/api/cudf/stable/) if GPUs are enabled.
+Serializes an RDF graph to a compact binary format, in the style of [HDT](https://www.rdfhdt.org/): a dictionary of the distinct terms, sorted and front-coded, followed by the triples as arrays of term IDs sorted by subject, predicate, and object, where bitmaps mark the boundaries between subjects and between predicates instead of repeating their IDs.
+The namespaces of the graph get stored in the file too.
 
-To prepare for upcoming **kglab** features, **this is the preferred method for serializing an RDF graph.**
+The file can be loaded with [`load_hdt()`](#load_hdt-method), or opened as an [`HDTFile`](#hdtfile-class) to answer triple patterns without loading it.
 
     path:
-must be a file name (str), path object to a local file reference, or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object); a string could be a URL; valid URL schemes include `https`, `http`, `ftp`, `s3`, `gs`, `file`; accessing cloud storage is based on [`fsspec`](https://github.com/intake/filesystem_spec)
-
-    compression:
-name of the compression algorithm to use; defaults to `"snappy"`; can also be `"gzip"`, `"brotli"`, or `None` for no compression
+must be a file name (str), path object to a local file reference, or a [*writable, bytes-like object*](https://docs.python.org/3/glossary.html#term-bytes-like-object)
 
-    storage_options:
-extra options parsed by [`fsspec`](https://github.com/intake/filesystem_spec) for cloud storage access; **NOT USED** until `pandas` 1.2.x becomes stable across platforms and also RAPIDS provides support
+    block_size:
+number of terms in each front-coded block of the dictionary, which trades off the size of the file against the cost of a lookup; defaults to `16`
         """
-        rows_list: typing.List[dict] = [
-            {
-                self._PARQUET_COL_NAMES[0]: s.n3(),
-                self._PARQUET_COL_NAMES[1]: p.n3(),
-                self._PARQUET_COL_NAMES[2]: o.n3(),
-            }
-            for s, p, o in self._g # type: ignore
-        ]
+        namespaces, bindings = self._namespace_state()
 
-        if self.use_gpus:
-            df = cudf.DataFrame(rows_list, columns=self._PARQUET_COL_NAMES)
+        if hasattr(path, "write"):
+            HDTFile.write(path, self._g, namespaces=namespaces, bindings=bindings, block_size=block_size)  # type: ignore
         else:
-            df = pd.DataFrame(rows_list, columns=self._PARQUET_COL_NAMES)
-
-        df.to_parquet(
-            path,
-            compression=compression,
-            #storage_options=storage_options,
-            **chocolate.filter_args(kwargs, df.to_parquet),
-        )
+            with open(self._get_filename(path), "wb") as f:  # type: ignore
+                HDTFile.write(f, self._g, namespaces=namespaces, bindings=bindings, block_size=block_size)  # type: ignore
 
 
     def load_csv (
         self,
         url: str,
+        *,
+        mapping: typing.Optional[ typing.Dict[ str, typing.Any ] ] = None,
+        subject: typing.Optional[str] = None,
+        chunk_size: int = 10000,
+        **kwargs: typing.Any,
         ) -> "KnowledgeGraph": # type: ignore
         """
 Wrapper for [`csvwlib`](https://github.com/DerwenAI/csvwlib) which parses a CSV file from the `path` source, then converts to RDF and merges into this RDF graph.
 
+Optionally, given a `mapping` from columns to predicates, the CSV file gets read instead in chunks through [`pandas.read_csv()`](https://pandas.pydata.org/docs/reference/api/pandas.read_csv.html), and the triples for each chunk get added to the graph directly, without any intermediate Turtle text, so that memory use is bounded by the chunk size rather than the size of the file.
+Each row becomes a subject node, while each non-empty cell in a mapped column becomes the object of a triple.
+
     url:
-must be a URL represented as a string
+must be a URL represented as a string; when using a `mapping`, this can also be a file name (str), a path object, or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object)
+
+    mapping:
+optionally, a dictionary which maps column names to either a predicate IRI, for literal objects; or else a dictionary with a `"predicate"` IRI, plus optionally a `"datatype"` IRI or a `"lang"` tag for literal objects, or a `"template"` for IRI objects
+
+    subject:
+optional template for the subject IRI of each row, with column names in braces, such as `"https://www.food.com/recipe/{id}"`; otherwise each row becomes a blank node
+
+    chunk_size:
+number of rows to read in each chunk; defaults to `10000`
+
+    kwargs:
+other keyword arguments passed to `pandas.read_csv()` when using a `mapping`, such as `sep` or `compression`
 
     returns:
 this `KnowledgeGraph` object – used for method chaining
         """
-        new_rdf = csvwlib.CSVWConverter.to_rdf(
-            url,
-            mode="minimal",
-            format="ttl",
-        )
-        return self.load_rdf_text(new_rdf)
+        if mapping is None:
+            new_rdf = csvwlib.CSVWConverter.to_rdf(
+                url,
+                mode="minimal",
+                format="ttl",
+            )
+            return self.load_rdf_text(new_rdf)
+
+        if chunk_size < 1:
+            raise ValueError("The `chunk_size` value must be a positive integer")
+
+        # normalize the column mapping
+        columns: typing.Dict[ str, dict ] = {}
+
+        for column, rule in mapping.items():
+            if not isinstance(rule, dict):
+                rule = { "predicate": rule }
+
+            columns[column] = {
+                "predicate": rdflib.URIRef(rule["predicate"]),
+                "datatype": rdflib.URIRef(rule["datatype"]) if rule.get("datatype") else None,
+                "lang": rule.get("lang"),
+                "template": rule.get("template"),
+            }
+
+        if isinstance(url, pathlib.Path):
+            url = str(url)
+
+        read_args = chocolate.filter_args(kwargs, pd.read_csv)
+        read_args["dtype"] = str
+
+        with pd.read_csv(url, chunksize=chunk_size, **read_args) as reader:
+            for df in reader:
+                self._g.addN(  # type: ignore
+                    (s, p, o, self._g)
+                    for s, p, o in self._csv_triples(df, columns, subject)
+                )
+
+        return self
+
+
+    def _csv_triples (
+        self,
+        df: pd.DataFrame,
+        columns: typing.Dict[ str, dict ],
+        subject: typing.Optional[str],
+        ) -> typing.Iterator[tuple]:
+        """
+Semiprivate method to map one chunk of CSV rows to triples; see
+`load_csv()`.
+
+    df:
+dataframe for the chunk, with string columns
+
+    columns:
+the normalized mapping from column names to predicates
+
+    subject:
+optional template for the subject IRIs
+
+    yields:
+the triples for the chunk
+        """
+        missing = [ column for column in columns if column not in df.columns ]
+
+        if len(missing) > 0:
+            raise ValueError(f"The CSV columns in the mapping were not found: {missing}")
+
+        if subject is not None:
+            subjects = [ rdflib.URIRef(iri) for iri in self._csv_template(df, subject) ]
+        else:
+            subjects = [ rdflib.BNode() for _ in range(len(df)) ]
+
+        for column, rule in columns.items():
+            values = df[column]
+            mask = values.notna() & (values != "")
+            p = rule["predicate"]
+
+            if rule["template"] is not None:
+                objects = [ rdflib.URIRef(iri) for iri in self._csv_template(df[mask], rule["template"]) ]
+            else:
+                datatype = rule["datatype"]
+                lang = rule["lang"]
+                objects = [ rdflib.Literal(value, lang=lang, datatype=datatype) for value in values[mask] ]
+
+            rows = np.flatnonzero(mask.to_numpy())
+
+            for row, o in zip(rows.tolist(), objects):
+                yield subjects[row], p, o
+
+
+    @classmethod
+    def _csv_template (
+        cls,
+        df: pd.DataFrame,
+        template: str,
+        ) -> typing.List[str]:
+        """
+Semiprivate method to fill a template with the values of the named
+columns in each row, concatenating whole columns at a time.
+As in the simple expansion of [RFC 6570](https://www.rfc-editor.org/rfc/rfc6570) URI templates, which CSVW uses, the values get percent-encoded except for the unreserved characters, while missing values become empty strings.
+
+    df:
+dataframe with string columns
+
+    template:
+template with column names in braces, as in `str.format()`
+
+    returns:
+the filled template for each row
+        """
+        result = pd.Series([ "" ] * len(df), index=df.index, dtype=object)
+
+        for text, field, spec, conversion in string.Formatter().parse(template):
+            if text:
+                result = result + text
+
+            if field is not None:
+                if spec or conversion:
+                    raise ValueError(f"The template field must be a plain column name: {field}")
 
+                if field not in df.columns:
+                    raise ValueError(f"The CSV column in the template was not found: {field}")
+
+                values = df[field].fillna("")
+                reserved = values.str.contains(r"[^A-Za-z0-9\-._~]")
+
+                if reserved.any():
+                    values = values.where(~reserved, values[reserved].map(functools.partial(urllib.parse.quote, safe="")))
+
+                result = result + values
+
+        return result.tolist()
+
+
+    _MORPH_CONFIGURATION: str = "CONFIGURATION"
 
     def materialize (
         self,
         config: str,
+        *,
+        workers: typing.Optional[int] = None,
         ) -> "KnowledgeGraph": # type: ignore
         """
 Binding to the [Morph-KGC](https://github.com/oeg-upm/morph-kgc) `materialize()` method.
 
+Rather than building a separate `rdflib` graph and then merging it, this splits the configuration into one configuration for each data source section, then runs each of them through the public `morph_kgc.materialize_set()`, parses its triples with the N-Triples parser of [`load_ntriples()`](#load_ntriples-method), and adds them to this RDF graph in bulk, one section at a time; so that the materialized statements of only one section need to be held in memory at once.
+
+Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
+
     config:
 morph-kgc configuration, it can be the path to the config file, or a string with the config; see <https://morph-kgc.readthedocs.io/en/latest/documentation/#library>
 
+    workers:
+optionally, the number of worker processes which run the data source sections in parallel, each within a single process; or if there is only one section, the number of processes which morph-kgc uses for it; defaults to the `number_of_processes` in the morph-kgc configuration for each section, while `1` runs them within this process
+
     returns:
 this `KnowledgeGraph` object – used for method chaining
         """
-        if len(self._g) == 0: # type: ignore
-            # generate the triples and load them to an RDFlib graph
-            self._g = morph_kgc.materialize(config)
+        sources = self._split_morph_config(config)
+        use_pool = workers is not None and workers > 1 and len(sources) > 1
+
+        # a section which runs in a worker process uses only that process
+        processes = 1 if use_pool else workers
+        configs = [ self._morph_config_text(source, processes) for source in sources ]
+        cache: typing.Dict[ typing.Any, typing.Any ] = {}
+
+        if use_pool:
+            with ProcessPoolExecutor(max_workers=min(workers, len(configs))) as pool:  # type: ignore
+                futures = [
+                    pool.submit(self._materialize_source, source_config)
+                    for source_config in configs
+                ]
+
+                for future in futures:
+                    self._merge_source(future.result(), cache)
         else:
-            # merge
-            # for caveats about merging this way:
-            # <https://rdflib.readthedocs.io/en/stable/merging.html>
-            self._g.parse(morph_kgc.materialize(config)) # type: ignore
+            for source_config in configs:
+                self._merge_source(self._materialize_source(source_config), cache)
 
         return self
 
 
+    @classmethod
+    def _split_morph_config (
+        cls,
+        config: str,
+        ) -> typing.List[configparser.ConfigParser]:
+        """
+Semiprivate method to split a morph-kgc configuration into one
+configuration for each data source section, which each keep the
+`CONFIGURATION` and `DEFAULT` sections; see `materialize()`.
+The values get copied as raw text, so that any interpolation still
+happens within morph-kgc.
+
+    config:
+morph-kgc configuration, either the path to the config file, or a string with the config
+
+    returns:
+the configuration for each data source section, in order
+        """
+        parser = configparser.ConfigParser(interpolation=None)
+
+        # the same test as in `morph_kgc.load_config_from_argument()`
+        if os.path.isfile(config):
+            parser.read(config)
+        else:
+            parser.read_string(config)
+
+        sources = []
+
+        for section in parser.sections():
+            if section == cls._MORPH_CONFIGURATION:
+                continue
+
+            source = configparser.ConfigParser(defaults=parser.defaults(), interpolation=None)
+
+            for name in ( cls._MORPH_CONFIGURATION, section, ):
+                if parser.has_section(name):
+                    source.add_section(name)
+
+                    for option, value in parser.items(name, raw=True):
+                        if parser.defaults().get(option) != value:
+                            source.set(name, option, value)
+
+            sources.append(source)
+
+        return sources
+
+
+    @classmethod
+    def _morph_config_text (
+        cls,
+        source: configparser.ConfigParser,
+        processes: typing.Optional[int],
+        ) -> str:
+        """
+Semiprivate method to serialize the configuration for one data source
+section; see `materialize()`.
+
+    source:
+configuration from `_split_morph_config()`
+
+    processes:
+optionally, the number of processes which morph-kgc may use
+
+    returns:
+the configuration as a string
+        """
+        if processes is not None:
+            if not source.has_section(cls._MORPH_CONFIGURATION):
+                source.add_section(cls._MORPH_CONFIGURATION)
+
+            source.set(cls._MORPH_CONFIGURATION, "number_of_processes", str(processes))
+
+        text = io.StringIO()
+        source.write(text)
+
+        return text.getvalue()
+
+
+    @classmethod
+    def _materialize_source (
+        cls,
+        config: str,
+        ) -> typing.Tuple[ typing.Optional[ typing.Tuple[ list, np.ndarray ] ], typing.Optional[str] ]:
+        """
+Semiprivate method, which may run in a worker process, to materialize
+the statements for one data source section, then parse them into a
+compact batch of encoded terms; see `materialize()`.
+
+    config:
+morph-kgc configuration for the section, from `_morph_config_text()`
+
+    returns:
+the batch parsed by `_parse_ntriples()`; otherwise the statements as N-Quads text, if any of them name a graph, which get merged into the RDF graph
+        """
+        statements = morph_kgc.materialize_set(config)
+        data = "".join(statement + " .\n" for statement in statements)
+
+        try:
+            return cls._parse_ntriples(data, 0), None
+        except TypeError:
+            return None, data
+
+
+    def _merge_source (
+        self,
+        result: typing.Tuple[ typing.Optional[ typing.Tuple[ list, np.ndarray ] ], typing.Optional[str] ],
+        cache: typing.Dict[ typing.Any, typing.Any ],
+        ) -> None:
+        """
+Semiprivate method to add the statements materialized for one data
+source section to the graph; see `materialize()`.
+
+    result:
+the results of `_materialize_source()`
+
+    cache:
+term cache, shared across the sections
+        """
+        batch, data = result
+
+        if batch is not None:
+            self._merge_ntriples(batch, cache)
+        else:
+            # merge the statements from every named graph
+            dataset = rdflib.Dataset()
+            dataset.parse(data=data, format="nquads")
+
+            self._g.addN(  # type: ignore
+                (s, p, o, self._g)
+                for s, p, o, _ in dataset.quads((None, None, None, None))
+            )
+
+
     ######################################################################
     ## Roam Research integration
 
+    _ROAM_READ_SIZE: int = 1024 * 1024
+
+    @classmethod
+    def _iter_json_array (  # pylint: disable=R0912
+        cls,
+        f: typing.IO,
+        encoding: str = "utf-8",
+        ) -> typing.Iterator[typing.Any]:
+        """
+Semiprivate method to parse a JSON array incrementally from a stream,
+yielding its elements one at a time, so that memory use is bounded by
+the size of the largest element rather than the whole array.
+When an element spans the end of the buffered text, the next read
+doubles in size before it gets decoded again, which keeps the cost of
+parsing linear.
+
+    f:
+a readable, file-like object, in text or binary mode
+
+    encoding:
+text encoding for a stream in binary mode
+
+    yields:
+the decoded elements of the array
+        """
+        decoder = json.JSONDecoder()
+        text_decoder = None
+        buf = ""
+        pos = 0
+        eof = False
+        state = "start"
+        read_size = cls._ROAM_READ_SIZE
+
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+
+            if pos >= len(buf) or state == "value":
+                if state == "value" and pos < len(buf):
+                    # decode the next element, unless it might continue
+                    # past the end of the buffered text
+                    try:
+                        obj, end = decoder.raw_decode(buf, pos)
+
+                        if end < len(buf) or eof:
+                            yield obj
+                            pos = end
+                            state = "delim"
+                            read_size = cls._ROAM_READ_SIZE
+                            continue
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+
+                    read_size *= 2
+
+                elif eof:
+                    raise json.JSONDecodeError("Unterminated JSON array", buf, pos)
+
+                chunk = f.read(read_size)
+
+                if isinstance(chunk, bytes):
+                    if text_decoder is None:
+                        text_decoder = codecs.getincrementaldecoder(encoding)()
+
+                    chunk = text_decoder.decode(chunk, final=not chunk)
+
+                eof = len(chunk) < 1
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+
+            char = buf[pos]
+
+            if state == "start":
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buf, pos)
+
+                state = "first"
+            elif state in ( "first", "delim", ) and char == "]":
+                return
+            elif state == "first":
+                state = "value"
+                continue
+            elif char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+            else:
+                state = "value"
+
+            pos += 1
+
+
+    def _roam_terms (
+        self,
+        ) -> typing.Dict[ str, typing.Any ]:
+        """
+Semiprivate method to lookup the namespace terms used to represent the
+Roam Research exported graph, once per import.
+
+    returns:
+map of the terms
+        """
+        return {
+            "roam": str(self.get_ns("roam")),
+            "type": self.get_ns("rdf").type,
+            "text": self.get_ns("dct").Text,
+            "definition": self.get_ns("skos").definition,
+            "creator": self.get_ns("dct").Creator,
+            "date": self.get_ns("dct").Date,
+            "references": self.get_ns("dct").references,
+            "datetime": rdflib.XSD.dateTime,
+        }
+
+
     def _walk_roam_graph (
         self,
         obj: dict,
-        seen_uid: typing.Set[str] = None,
+        sink: rdflib.Graph,
+        terms: typing.Dict[ str, typing.Any ],
         ) -> str:
         """
-Semiprivate method to traverse the Roam Research exported graph recursively, converting its objects into RDF representation.
+Semiprivate method to traverse one page of the Roam Research exported graph, converting its objects into RDF representation.
+The traversal visits the objects depth-first using an explicit stack, so that deeply nested blocks cannot exceed the recursion limit.
 
     obj:
 object to parse
 
+    sink:
+graph which receives the triples, typically a `BatchGraph`
+
+    terms:
+namespace terms; see `_roam_terms()`
+
     returns:
 The `uid` identifier for the parsed object
         """
-        if not seen_uid:
-            seen_uid = set()
+        roam_ns = terms["roam"]
+        seen_uid: typing.Set[str] = set()
+        stack: typing.List[dict] = [ obj ]
 
-        roam_ns = str(self.get_ns("roam"))
-        uid = obj["uid"]
+        while len(stack) > 0:
+            item = stack.pop()
+            uid = item["uid"]
+
+            if uid in seen_uid:
+                continue
 
-        if uid not in seen_uid:
             seen_uid.add(uid)
 
             # create a node for this object
             node = rdflib.URIRef(roam_ns + uid)
-            self.add(node, self.get_ns("rdf").type, self.get_ns("dct").Text)
+            sink.add(( node, terms["type"], terms["text"], ))
 
             # represent title (complex object) or string description (simple object)
-            if "title" in obj:
-                descrip = obj["title"]
-            elif "string" in obj:
-                descrip = obj["string"]
-
-            self.add(node, self.get_ns("skos").definition, rdflib.Literal(descrip))  # pylint: disable=E0606
+            descrip = item["title"] if "title" in item else item["string"]
+            sink.add(( node, terms["definition"], rdflib.Literal(descrip), ))
 
             # represent the user who created/edited this object
-            user_uid = obj[":edit/user"][":user/uid"]
-            self.add(node, self.get_ns("dct").Creator, rdflib.URIRef(roam_ns + user_uid))
+            user_uid = item[":edit/user"][":user/uid"]
+            sink.add(( node, terms["creator"], rdflib.URIRef(roam_ns + user_uid), ))
 
             # convert millisec timestamp to Unix epoch times (UTC) to datetime
-            dt = datetime.datetime.utcfromtimestamp(round(obj["edit-time"] / 1000.0))
-            self.add(node, self.get_ns("dct").Date, rdflib.Literal(dt.isoformat(), datatype = rdflib.XSD.dateTime))
+            dt = datetime.datetime.utcfromtimestamp(round(item["edit-time"] / 1000.0))
+            sink.add(( node, terms["date"], rdflib.Literal(dt.isoformat(), datatype = terms["datetime"]), ))
 
-            if "children" in obj:
-                for child_obj in obj["children"]:
-                    child_uid = self._walk_roam_graph(child_obj, seen_uid)
-                    self.add(node, self.get_ns("dct").references, rdflib.URIRef(roam_ns + child_uid))
+            children = item.get("children", [])
 
-        return uid
+            for child_obj in children:
+                sink.add(( node, terms["references"], rdflib.URIRef(roam_ns + child_obj["uid"]), ))
+
+            # push in reverse, to visit the children in order
+            stack.extend(reversed(children))
+
+        return obj["uid"]
 
 
     @multifile()
@@ -655,7 +1415,10 @@ For more details about the exported data from Roam Research, see:
 Note: this adds relations to an RDF graph, it does not overwrite the existing RDF graph.
 
     path:
-must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object)
+must be a file name (str) to a local file reference – possibly a glob with a wildcard; or a path object (not a URL) to a local file reference; or a [*readable, file-like object*](https://docs.python.org/3/glossary.html#term-file-object); a local file compressed with `gzip`, `bzip2`, `xz`, or `zstd` – detected by its suffix or its leading magic bytes – gets decompressed as a stream while it is parsed
+
+    workers:
+optionally, the number of worker processes which parse the files matched by a glob in parallel; see the `@multifile` decorator
 
     encoding:
 optional text encoding value, which defaults to `"utf-8"`; must be in the [Python codec registry](https://docs.python.org/3/library/codecs.html#codecs.CodecInfo); otherwise this throws a `LookupError` exception
@@ -666,19 +1429,35 @@ a list of identifiers for the top-level nodes added from the Roam Research graph
         # error checking for the `encoding` parameter
         self._check_encoding(encoding)
 
-        # error checking for a file-like object `path` parameter
+        # error checking for a file-like object `path` parameter; a
+        # compressed file gets decompressed as a stream
         if hasattr(path, "read"):
             f = path
         else:
-            f = open(path, "r", encoding = encoding)  # type: ignore  # pylint: disable=R1732
+            stream = self._open_decompressed(path)  # type: ignore
+
+            if stream is not None:
+                f = io.TextIOWrapper(stream, encoding = encoding)
+            else:
+                f = open(path, "r", encoding = encoding)  # type: ignore  # pylint: disable=R1732
 
         # add a `roam:` prefix for a pseudo-namespace to use here,
         # which applications may need to parameterize later?
         self.add_ns("roam", "https://roamresearch.com/ns/")
 
-        uid_list: typing.List[str] = [
-            self._walk_roam_graph(obj)
-            for obj in json.load(f)  # type: ignore
-            ]
+        # parse one page at a time, then add the triples in batches
+        terms = self._roam_terms()
+        sink = BatchGraph(self._g)  # type: ignore
+
+        try:
+            uid_list: typing.List[str] = [
+                self._walk_roam_graph(obj, sink, terms)
+                for obj in self._iter_json_array(f, encoding)  # type: ignore
+                ]
+        finally:
+            sink.flush()
+
+            if f is not path:
+                f.close()  # type: ignore
 
         return uid_list
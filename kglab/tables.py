@@ -0,0 +1,1960 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Columnar tables, term dictionaries, and indexes for the tuples of the
+`PropertyStore` plugin
+
+see license https://github.com/DerwenAI/kglab#license-and-copyright
+"""
+
+import bisect
+import json
+import os
+import pathlib
+import struct
+import threading
+import typing
+
+import numpy as np  # type: ignore  # pylint: disable=E0401
+import rdflib  # type: ignore  # pylint: disable=E0401
+
+
+def _save_array (
+    path: pathlib.Path,
+    array: np.ndarray,
+    ) -> None:
+    """
+Write an array as a `.npy` file, replacing any previous version of the
+file atomically, so that processes which have it memory-mapped keep a
+consistent view.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+
+    os.replace(tmp_path, path)
+
+
+def _save_json (
+    path: pathlib.Path,
+    obj: typing.Any,
+    ) -> None:
+    """
+Write an object as a JSON file, replacing any previous version of the
+file atomically.
+    """
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+
+    os.replace(tmp_path, path)
+
+
+class TermDict:
+    """
+A dictionary of unique names, which interns each name as an integer
+index: a hash map provides the name → id lookup in constant time, while
+a growable array provides the id → name lookup, with amortized appends.
+
+A dictionary can also be saved as a term dictionary file, then loaded
+with its names memory-mapped: the names get decoded on demand, and the
+name → id lookups use a binary search over a sorted permutation of the
+names, so that loading does not need to rebuild the hash map.
+    """
+    _INIT_CAPACITY: int = 1024
+
+
+    def __init__ (
+        self,
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self._ids: typing.Dict[ typing.Any, int ] = {}
+        self._names: np.ndarray = np.empty(self._INIT_CAPACITY, dtype=object)
+        self._size: int = 0
+
+        # names loaded from a term dictionary file, which precede the
+        # names held in `_names`
+        self._base_size: int = 0
+        self._base_path: typing.Optional[ pathlib.Path ] = None
+        self._base_bytes: np.ndarray = np.empty(0, dtype=np.uint8)
+        self._base_offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._base_sorted: np.ndarray = np.empty(0, dtype=np.int64)
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of names in the dictionary.
+        """
+        return self._size
+
+
+    def __contains__ (
+        self,
+        name: typing.Any,
+        ) -> bool:
+        """
+Test whether the given name has been interned.
+        """
+        return name in self._ids or self._find_base(name) >= 0
+
+
+    @classmethod
+    def encode_name (
+        cls,
+        name: typing.Any,
+        ) -> bytes:
+        """
+Encode a name as the bytes stored in a term dictionary file.
+        """
+        return name.encode("utf-8")
+
+
+    @classmethod
+    def decode_name (
+        cls,
+        data: bytes,
+        ) -> typing.Any:
+        """
+Decode a name from the bytes stored in a term dictionary file.
+        """
+        return data.decode("utf-8")
+
+
+    def _get_base_bytes (
+        self,
+        name_id: int,
+        ) -> bytes:
+        """
+Extract the encoded bytes of a name from the term dictionary file.
+        """
+        return self._base_bytes[self._base_offsets[name_id]:self._base_offsets[name_id + 1]].tobytes()
+
+
+    def _find_base (
+        self,
+        name: typing.Any,
+        ) -> int:
+        """
+Binary search for a name in the term dictionary file.
+
+    returns:
+the integer index of the name, or `-1` if not found
+        """
+        if self._base_size < 1:
+            return -1
+
+        data = self.encode_name(name)
+        idx = bisect.bisect_left(self._base_sorted, data, key=self._get_base_bytes)
+
+        if idx < self._base_size:
+            name_id = int(self._base_sorted[idx])
+
+            if self._get_base_bytes(name_id) == data:
+                return name_id
+
+        return -1
+
+
+    def get_id (
+        self,
+        name: typing.Any,
+        *,
+        create: bool = True,
+        ) -> int:
+        """
+Map from a name to its integer index, appending the name to the
+dictionary if it has not been seen before.
+
+    name:
+unique name to lookup
+
+    create:
+flag to intern a name which has not been seen before; otherwise return `-1` when not found
+
+    returns:
+the integer index of the name
+        """
+        name_id = self._ids.get(name)
+
+        if name_id is None:
+            name_id = self._find_base(name) if self._base_size > 0 else -1
+
+            if name_id >= 0:
+                self._ids[name] = name_id
+                return name_id
+
+            if not create:
+                return -1
+
+            name_id = self._size
+            idx = name_id - self._base_size
+
+            # grow the array geometrically, so appends are amortized
+            if idx >= len(self._names):
+                self._names = np.resize(self._names, 2 * len(self._names))
+
+            self._names[idx] = name
+            self._ids[name] = name_id
+            self._size += 1
+
+        return name_id
+
+
+    def get_ids (
+        self,
+        names: typing.Iterable,
+        ) -> np.ndarray:
+        """
+Map from a batch of names to their integer indexes, appending any
+names which have not been seen before.
+
+    names:
+iterable of names to lookup
+
+    returns:
+the integer indexes, as a [`numpy.ndarray`](https://numpy.org/doc/stable/reference/generated/numpy.ndarray.html)
+        """
+        names = list(names)
+        ids = self._ids
+
+        for name in names:
+            if name not in ids:
+                self.get_id(name)
+
+        return np.fromiter(map(ids.__getitem__, names), dtype=np.int64, count=len(names))
+
+
+    def get_name (
+        self,
+        name_id: int,
+        ) -> typing.Any:
+        """
+Map from an integer index to its name.
+
+    name_id:
+integer index to lookup; otherwise throws an `IndexError` exception
+
+    returns:
+the unique name
+        """
+        if name_id < 0 or name_id >= self._size:
+            raise IndexError(f"unknown id: {name_id}")
+
+        if name_id < self._base_size:
+            return self.decode_name(self._get_base_bytes(name_id))
+
+        return self._names[name_id - self._base_size]
+
+
+    def names (
+        self
+        ) -> np.ndarray:
+        """
+Accessor for the interned names, ordered by their integer index.
+
+    returns:
+the names as a [`numpy.ndarray`](https://numpy.org/doc/stable/reference/generated/numpy.ndarray.html), which is a view unless names have been loaded from a file
+        """
+        names = self._names[:self._size - self._base_size]
+
+        if self._base_size < 1:
+            return names
+
+        base_names = np.empty(self._base_size, dtype=object)
+        base_names[:] = [ self.get_name(name_id) for name_id in range(self._base_size) ]
+
+        return np.concatenate([ base_names, names ])
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        name: str,
+        ) -> None:
+        """
+Save the names as a term dictionary file, in the directory `path`: the
+encoded names get concatenated into `<name>_bytes.npy` with their
+offsets in `<name>_offsets.npy`, along with their sorted permutation
+in `<name>_sorted.npy`.
+        """
+        path = pathlib.Path(path)
+
+        # nothing has changed since this file was loaded
+        if self._base_path == path / name and self._size == self._base_size:
+            return
+
+        encoded = [ self._get_base_bytes(name_id) for name_id in range(self._base_size) ]
+        encoded.extend(map(self.encode_name, self._names[:self._size - self._base_size]))
+
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=offsets[1:])
+
+        values = np.empty(len(encoded), dtype=object)
+        values[:] = encoded
+
+        _save_array(path / f"{name}_bytes.npy", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+        _save_array(path / f"{name}_offsets.npy", offsets)
+        _save_array(path / f"{name}_sorted.npy", np.argsort(values, kind="stable").astype(np.int64))
+
+
+    @classmethod
+    def load (
+        cls,
+        path: pathlib.Path,
+        name: str,
+        ) -> "TermDict":
+        """
+Load a term dictionary file which was written by `save()`, with its
+names memory-mapped.
+        """
+        path = pathlib.Path(path)
+        term_dict = cls()
+
+        # pylint: disable=W0212
+        term_dict._base_path = path / name
+        term_dict._base_bytes = np.load(path / f"{name}_bytes.npy", mmap_mode="r")
+        term_dict._base_offsets = np.load(path / f"{name}_offsets.npy", mmap_mode="r")
+        term_dict._base_sorted = np.load(path / f"{name}_sorted.npy", mmap_mode="r")
+        term_dict._base_size = len(term_dict._base_offsets) - 1
+        term_dict._size = term_dict._base_size
+
+        return term_dict
+
+
+class LiteralKeys (TermDict):
+    """
+A `TermDict` of the keys for interned literals, which are tuples of a
+lexical form, a datatype id, and a language id.
+    """
+
+    @classmethod
+    def encode_name (
+        cls,
+        name: typing.Any,
+        ) -> bytes:
+        """
+Encode a key as the bytes stored in a term dictionary file.
+        """
+        lexical, dt_id, lang_id = name
+        return struct.pack("=ii", dt_id, lang_id) + lexical.encode("utf-8")
+
+
+    @classmethod
+    def decode_name (
+        cls,
+        data: bytes,
+        ) -> typing.Any:
+        """
+Decode a key from the bytes stored in a term dictionary file.
+        """
+        dt_id, lang_id = struct.unpack("=ii", data[:8])
+        return data[8:].decode("utf-8"), dt_id, lang_id
+
+
+class LiteralTable:
+    """
+A table of interned literals, where each distinct combination of a
+lexical form, datatype id, and language id gets its own integer id.
+The `rdflib.term.Literal` objects get kept along with these, so that
+literals round-trip exactly and repeated literals are stored once.
+    """
+
+    def __init__ (
+        self,
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self._keys: TermDict = LiteralKeys()
+        self._terms: np.ndarray = np.empty(TermDict._INIT_CAPACITY, dtype=object)  # pylint: disable=W0212
+
+        # literals which have been decoded from a term dictionary file
+        self._base_terms: typing.Dict[ int, rdflib.term.Literal ] = {}
+
+        # a literal without a datatype or a language has the id `0` for each
+        self._datatypes: TermDict = TermDict()
+        self._datatypes.get_id(None)
+
+        self._langs: TermDict = TermDict()
+        self._langs.get_id(None)
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of literals in the table.
+        """
+        return len(self._keys)
+
+
+    def get_id (
+        self,
+        literal: rdflib.term.Literal,
+        *,
+        create: bool = True,
+        ) -> int:
+        """
+Map from a literal to its integer id, interning the literal if it has
+not been seen before.
+
+    literal:
+literal to lookup
+
+    create:
+flag to intern a literal which has not been seen before; otherwise return `-1` when not found
+
+    returns:
+the integer id of the literal
+        """
+        datatype = literal.datatype
+        dt_id = self._datatypes.get_id(None if datatype is None else str(datatype), create=create)
+        lang_id = self._langs.get_id(literal.language, create=create)
+
+        if dt_id < 0 or lang_id < 0:
+            return -1
+
+        size = len(self._keys)
+        lit_id = self._keys.get_id(( str(literal), dt_id, lang_id, ), create=create)
+
+        if lit_id == size:
+            idx = lit_id - self._keys._base_size  # pylint: disable=W0212
+
+            if idx >= len(self._terms):
+                self._terms = np.resize(self._terms, 2 * len(self._terms))
+
+            self._terms[idx] = literal
+
+        return lit_id
+
+
+    def get_ids (
+        self,
+        literals: typing.Iterable[ rdflib.term.Literal ],
+        ) -> np.ndarray:
+        """
+Map from a batch of literals to their integer ids, interning any
+literals which have not been seen before.
+
+    returns:
+the integer ids, as a [`numpy.ndarray`](https://numpy.org/doc/stable/reference/generated/numpy.ndarray.html)
+        """
+        get_id = self.get_id
+        return np.fromiter((get_id(literal) for literal in literals), dtype=np.int64)
+
+
+    def get_term (
+        self,
+        lit_id: int,
+        ) -> rdflib.term.Literal:
+        """
+Map from an integer id to its literal; otherwise throws an `IndexError`
+exception.
+        """
+        if lit_id < 0 or lit_id >= len(self._keys):
+            raise IndexError(f"unknown id: {lit_id}")
+
+        base_size = self._keys._base_size  # pylint: disable=W0212
+
+        if lit_id >= base_size:
+            return self._terms[lit_id - base_size]
+
+        literal = self._base_terms.get(lit_id)
+
+        if literal is None:
+            lexical, datatype, lang = self.get_parts(lit_id)
+
+            literal = rdflib.term.Literal(
+                lexical,
+                lang=lang,
+                datatype=None if datatype is None else rdflib.term.URIRef(datatype),
+                normalize=False,
+            )
+
+            self._base_terms[lit_id] = literal
+
+        return literal
+
+
+    def get_parts (
+        self,
+        lit_id: int,
+        ) -> typing.Tuple[ str, typing.Optional[str], typing.Optional[str] ]:
+        """
+Map from an integer id to the parts of its literal.
+
+    returns:
+the lexical form, datatype IRI, and language tag of the literal
+        """
+        lexical, dt_id, lang_id = self._keys.get_name(lit_id)
+        return lexical, self._datatypes.get_name(dt_id), self._langs.get_name(lang_id)
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        name: str,
+        ) -> None:
+        """
+Save the literals in the directory `path`, with their keys in a term
+dictionary file and their datatypes and languages in `<name>.json`.
+        """
+        path = pathlib.Path(path)
+        self._keys.save(path, name)
+
+        _save_json(path / f"{name}.json", {
+            "datatypes": self._datatypes.names()[1:].tolist(),
+            "langs": self._langs.names()[1:].tolist(),
+        })
+
+
+    @classmethod
+    def load (
+        cls,
+        path: pathlib.Path,
+        name: str,
+        ) -> "LiteralTable":
+        """
+Load the literals which were written by `save()`, with their keys
+memory-mapped.
+        """
+        path = pathlib.Path(path)
+        table = cls()
+
+        with open(path / f"{name}.json", "r", encoding="utf-8") as f:
+            parts = json.load(f)
+
+        # pylint: disable=W0212
+        table._keys = LiteralKeys.load(path, name)
+
+        for datatype in parts["datatypes"]:
+            table._datatypes.get_id(datatype)
+
+        for lang in parts["langs"]:
+            table._langs.get_id(lang)
+
+        return table
+
+
+class TripleTable:
+    """
+Columnar storage for the encoded tuples of a `PropertyStore`: NumPy
+arrays hold the source, relation, and destination ids, a mask for
+literal destinations, and the context id, with capacity growing in
+fixed-size chunks.
+
+Rows can also be discarded, which marks them with a context id of
+`-1` while keeping the other rows in place, until `compact()` drops
+them; these rows do not count in the length of the table, nor do they
+match.
+
+Each tuple can also be packed into a 128-bit key, represented as the
+16 bytes of two native 64-bit words, which limits node ids to 40 bits,
+relation ids to 24 bits, and context ids to 23 bits.
+    """
+    CHUNK_SIZE: int = 65536
+
+    NODE_BITS: int = 40
+    REL_BITS: int = 24
+    CTX_BITS: int = 23
+
+    COLUMNS: typing.List[ typing.Tuple[ str, typing.Any ] ] = [
+        ( "src", np.int64, ),
+        ( "rel", np.int32, ),
+        ( "dst", np.int64, ),
+        ( "lit", np.bool_, ),
+        ( "ctx", np.int32, ),
+    ]
+
+
+    def __init__ (
+        self,
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self._size: int = 0
+        self._capacity: int = 0
+        self._num_discarded: int = 0
+
+        self.src: np.ndarray = np.empty(0, dtype=np.int64)
+        self.rel: np.ndarray = np.empty(0, dtype=np.int32)
+        self.dst: np.ndarray = np.empty(0, dtype=np.int64)
+        self.lit: np.ndarray = np.empty(0, dtype=np.bool_)
+        self.ctx: np.ndarray = np.empty(0, dtype=np.int32)
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of tuples in the table, excluding any discarded rows.
+        """
+        return self._size - self._num_discarded
+
+
+    def __iter__ (
+        self
+        ) -> typing.Iterator[ typing.Tuple ]:
+        """
+Iterate through the tuples in the table.
+        """
+        return iter(self.get_tuples(self.match()))
+
+
+    @property
+    def num_rows (
+        self
+        ) -> int:
+        """
+Number of rows in the table, including any discarded rows.
+        """
+        return self._size
+
+
+    @property
+    def num_discarded (
+        self
+        ) -> int:
+        """
+Number of discarded rows, which `compact()` would drop.
+        """
+        return self._num_discarded
+
+
+    @property
+    def nbytes (
+        self
+        ) -> int:
+        """
+Number of bytes allocated for the columns.
+        """
+        return sum(getattr(self, name).nbytes for name, _ in self.COLUMNS)
+
+
+    def reserve (
+        self,
+        num_rows: int,
+        ) -> None:
+        """
+Grow the columns in whole chunks, to hold at least `num_rows`
+additional tuples.
+        """
+        needed = self._size + num_rows
+
+        if needed > self._capacity:
+            self._resize(max(needed, self._capacity * 3 // 2))
+
+
+    def _resize (
+        self,
+        num_rows: int,
+        ) -> None:
+        """
+Allocate new columns in memory with capacity for at least `num_rows`
+tuples, rounded up to whole chunks, then copy the tuples into these.
+        """
+        num_chunks = max(-(-num_rows // self.CHUNK_SIZE), 1)
+        self._capacity = num_chunks * self.CHUNK_SIZE
+
+        for name, dtype in self.COLUMNS:
+            col = np.empty(self._capacity, dtype=dtype)
+            col[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, col)
+
+
+    @property
+    def mapped (
+        self
+        ) -> bool:
+        """
+Flag for whether the columns are memory-mapped from files, and
+therefore read-only.
+        """
+        return isinstance(self.src, np.memmap)
+
+
+    def materialize (
+        self
+        ) -> None:
+        """
+Copy memory-mapped columns into memory, so that the table can be
+modified.
+        """
+        if self.mapped:
+            self._resize(self._size)
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Save each column as a `<column>.npy` file in the directory `path`.
+        """
+        for name, _ in self.COLUMNS:
+            _save_array(pathlib.Path(path) / f"{name}.npy", getattr(self, name)[:self._size])
+
+
+    @classmethod
+    def load (
+        cls,
+        path: pathlib.Path,
+        ) -> "TripleTable":
+        """
+Load the columns which were written by `save()`, memory-mapped as
+read-only arrays, so that several processes can share their pages
+through the OS cache.
+        """
+        table = cls()
+
+        for name, _ in cls.COLUMNS:
+            setattr(table, name, np.load(pathlib.Path(path) / f"{name}.npy", mmap_mode="r"))
+
+        table._size = table._capacity = len(table.src)  # pylint: disable=W0212
+        table._num_discarded = int(np.count_nonzero(table.ctx < 0))  # pylint: disable=W0212
+
+        return table
+
+
+    def append (
+        self,
+        _tuple: typing.Tuple,
+        ) -> int:
+        """
+Append one tuple to the table.
+
+    returns:
+the row index of the appended tuple
+        """
+        self.reserve(1)
+        idx = self._size
+
+        self.src[idx], self.rel[idx], self.dst[idx], self.lit[idx], self.ctx[idx] = _tuple
+        self._size += 1
+
+        return idx
+
+
+    def extend (
+        self,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> int:
+        """
+Append a batch of tuples to the table, given as columns.
+
+    returns:
+the row index of the first appended tuple
+        """
+        num_rows = len(src)
+        self.reserve(num_rows)
+        start = self._size
+
+        for name, values in (
+            ( "src", src, ),
+            ( "rel", rel, ),
+            ( "dst", dst, ),
+            ( "lit", lit, ),
+            ( "ctx", ctx, ),
+        ):
+            getattr(self, name)[start:start + num_rows] = values
+
+        self._size += num_rows
+
+        return start
+
+
+    def delete (
+        self,
+        idx: int,
+        ) -> None:
+        """
+Delete the tuple at the given row index in constant time, by moving
+the last row into its place.
+        """
+        last = self._size - 1
+
+        for name, _ in self.COLUMNS:
+            col = getattr(self, name)
+            col[idx] = col[last]
+
+        self._size -= 1
+
+
+    def discard (
+        self,
+        idx: int,
+        ) -> None:
+        """
+Discard the tuple at the given row index in constant time, leaving the
+other rows in place.
+        """
+        self.ctx[idx] = -1
+        self._num_discarded += 1
+
+
+    def compact (
+        self
+        ) -> np.ndarray:
+        """
+Drop the discarded rows, moving the remaining rows up in order.
+
+    returns:
+array of the prior row indexes of the remaining rows
+        """
+        kept = np.flatnonzero(self.ctx[:self._size] >= 0)
+        num_rows = len(kept)
+
+        for name, _ in self.COLUMNS:
+            col = getattr(self, name)
+            col[:num_rows] = col[kept]
+
+        self._size = num_rows
+        self._num_discarded = 0
+
+        return kept
+
+
+    @classmethod
+    def pack_words (
+        cls,
+        _tuple: typing.Tuple,
+        ) -> typing.Tuple[ int, int ]:
+        """
+Pack a tuple into the high and low 64-bit words of its 128-bit key;
+otherwise throws a `ValueError` exception if any of its ids exceed the
+bits available.
+        """
+        src, rel, dst, lit, ctx = _tuple
+
+        if (src | dst) >> cls.NODE_BITS or rel >> cls.REL_BITS or ctx >> cls.CTX_BITS:
+            raise ValueError(f"ids out of range for a packed key: {_tuple}")
+
+        hi = (src << cls.REL_BITS) | rel
+        lo = (((dst << cls.CTX_BITS) | ctx) << 1) | int(lit)
+
+        return hi, lo
+
+
+    @classmethod
+    def pack_key (
+        cls,
+        _tuple: typing.Tuple,
+        ) -> bytes:
+        """
+Pack a tuple into a 128-bit key; otherwise throws a `ValueError`
+exception if any of its ids exceed the bits available.
+        """
+        return struct.pack("=QQ", *cls.pack_words(_tuple))
+
+
+    @classmethod
+    def pack_columns (
+        cls,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> np.ndarray:
+        """
+Vectorized version of `pack_key()` for a batch of tuples given as
+columns; otherwise throws a `ValueError` exception if any of the ids
+exceed the bits available.
+
+    returns:
+an array with shape `(N, 2)` of the high and low 64-bit words of each key, where the bytes of each row are its key
+        """
+        if len(src) > 0:
+            if (int(src.max()) | int(dst.max())) >> cls.NODE_BITS or \
+                int(rel.max()) >> cls.REL_BITS or int(ctx.max()) >> cls.CTX_BITS:
+                raise ValueError("ids out of range for a packed key")
+
+        words = np.empty(( len(src), 2, ), dtype=np.uint64)
+        words[:, 0] = (src.astype(np.uint64) << np.uint64(cls.REL_BITS)) | rel.astype(np.uint64)
+        words[:, 1] = (((dst.astype(np.uint64) << np.uint64(cls.CTX_BITS)) | ctx.astype(np.uint64)) << np.uint64(1)) | lit.astype(np.uint64)
+
+        return words
+
+
+    @classmethod
+    def unpack_key (
+        cls,
+        key: bytes,
+        ) -> typing.Tuple:
+        """
+Unpack a 128-bit key into its tuple.
+        """
+        hi, lo = struct.unpack("=QQ", key)
+
+        return (
+            hi >> cls.REL_BITS,
+            hi & ((1 << cls.REL_BITS) - 1),
+            lo >> (cls.CTX_BITS + 1),
+            bool(lo & 1),
+            (lo >> 1) & ((1 << cls.CTX_BITS) - 1),
+        )
+
+
+    def match (
+        self,
+        src: typing.Optional[int] = None,
+        rel: typing.Optional[int] = None,
+        dst: typing.Optional[int] = None,
+        lit: typing.Optional[bool] = None,
+        ctx: typing.Optional[int] = None,
+        ) -> np.ndarray:
+        """
+Select the rows which match the given column values, where a `None`
+value matches anything, using vectorized boolean masks; discarded rows
+never match.
+
+    returns:
+array of the matching row indexes
+        """
+        if ctx is None and self._num_discarded > 0:
+            mask = self.ctx[:self._size] >= 0
+        else:
+            mask = np.ones(self._size, dtype=np.bool_)
+
+        for name, value in (
+            ( "src", src, ),
+            ( "rel", rel, ),
+            ( "dst", dst, ),
+            ( "lit", lit, ),
+            ( "ctx", ctx, ),
+        ):
+            if value is not None:
+                mask &= getattr(self, name)[:self._size] == value
+
+        return np.flatnonzero(mask)
+
+
+    def get_tuples (
+        self,
+        rows: np.ndarray,
+        ) -> typing.List[ typing.Tuple ]:
+        """
+Extract the tuples at the given row indexes, as Python values.
+        """
+        return list(zip(
+            self.src[rows].tolist(),
+            self.rel[rows].tolist(),
+            self.dst[rows].tolist(),
+            self.lit[rows].tolist(),
+            self.ctx[rows].tolist(),
+        ))
+
+
+class RowIndex:
+    """
+An open addressing hash table which locates the row of each tuple in a
+`TripleTable` from its packed key, for deduplication and removal.
+The table holds only the int64 row indexes, probing linearly from a
+multiplicative hash of the two words of the key, and it resolves
+collisions by comparing the columns of the rows, so that it needs 16
+to 32 bytes per tuple rather than a Python object per key.
+Batches get looked up and inserted with vectorized probes.
+    """
+    EMPTY: int = -1
+    REMOVED: int = -2
+    MIN_CAPACITY: int = 1024
+
+    _MASK: int = (1 << 64) - 1
+    _MUL_HI: int = 0x9E3779B97F4A7C15
+    _MUL_LO: int = 0xC2B2AE3D27D4EB4F
+
+
+    def __init__ (
+        self,
+        table: TripleTable,
+        ) -> None:
+        """
+Instance constructor, which indexes the rows of the table.
+
+    table:
+the table of tuples to index
+        """
+        self._table: TripleTable = table
+        self._slots: np.ndarray = np.empty(0, dtype=np.int64)
+        self._bits: int = 0
+        self._used: int = 0
+        self._removed: int = 0
+
+        self.rebuild()
+
+
+    @property
+    def nbytes (
+        self
+        ) -> int:
+        """
+Number of bytes allocated for the hash table.
+        """
+        return self._slots.nbytes
+
+
+    def rebuild (
+        self
+        ) -> None:
+        """
+Reallocate the hash table at a load factor between one quarter and one
+half, then insert each row of the table which has not been discarded.
+        """
+        table = self._table
+        rows = table.match()
+        needed = max(2 * len(rows) + 1, self.MIN_CAPACITY)
+
+        self._bits = (needed - 1).bit_length()
+        self._slots = np.full(1 << self._bits, self.EMPTY, dtype=np.int64)
+        self._used = 0
+        self._removed = 0
+
+        self.extend(rows)
+
+
+    def _hash (
+        self,
+        hi: int,
+        lo: int,
+        ) -> int:
+        """
+Hash the two words of a packed key to a slot.
+        """
+        return (((hi ^ ((lo * self._MUL_LO) & self._MASK)) * self._MUL_HI) & self._MASK) >> (64 - self._bits)
+
+
+    def _hash_columns (
+        self,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> np.ndarray:
+        """
+Vectorized version of `_hash()` for a batch of tuples given as
+columns.
+        """
+        words = TripleTable.pack_columns(src, rel, dst, lit, ctx)
+        lo = words[:, 1] * np.uint64(self._MUL_LO)
+        pos = ((words[:, 0] ^ lo) * np.uint64(self._MUL_HI)) >> np.uint64(64 - self._bits)
+
+        return pos.astype(np.int64)
+
+
+    def find (
+        self,
+        _tuple: typing.Tuple,
+        ) -> int:
+        """
+Locate the row of a tuple.
+
+    returns:
+the row index, or `-1` if the tuple is not in the table
+        """
+        table = self._table
+        mask = (1 << self._bits) - 1
+        pos = self._hash(*TripleTable.pack_words(_tuple))
+
+        while True:
+            row = int(self._slots[pos])
+
+            if row == self.EMPTY:
+                return -1
+
+            if row >= 0 and ( table.src[row], table.rel[row], table.dst[row], table.lit[row], table.ctx[row], ) == _tuple:
+                return row
+
+            pos = (pos + 1) & mask
+
+
+    def find_columns (
+        self,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> np.ndarray:
+        """
+Vectorized version of `find()` for a batch of tuples given as columns.
+
+    returns:
+array of the row index for each tuple, or `-1` for those which are not in the table
+        """
+        table = self._table
+        mask = (1 << self._bits) - 1
+        pos = self._hash_columns(src, rel, dst, lit, ctx)
+
+        found = np.full(len(src), -1, dtype=np.int64)
+        pending = np.arange(len(src))
+
+        while len(pending) > 0:
+            rows = self._slots[pos[pending]]
+            live = rows >= 0
+
+            cand = pending[live]
+            cand_rows = rows[live]
+            match = (table.src[cand_rows] == src[cand]) & (table.rel[cand_rows] == rel[cand]) & \
+                (table.dst[cand_rows] == dst[cand]) & (table.lit[cand_rows] == lit[cand]) & \
+                (table.ctx[cand_rows] == ctx[cand])
+
+            found[cand[match]] = cand_rows[match]
+
+            # keep probing past removed slots and other keys, until a
+            # match or an empty slot
+            done = rows == self.EMPTY
+            done[np.flatnonzero(live)[match]] = True
+            pending = pending[~done]
+            pos[pending] = (pos[pending] + 1) & mask
+
+        return found
+
+
+    def add (
+        self,
+        row: int,
+        ) -> None:
+        """
+Insert a row whose tuple is not yet in the hash table.
+        """
+        self.extend(np.array([ row ], dtype=np.int64))
+
+
+    def extend (
+        self,
+        rows: np.ndarray,
+        ) -> None:
+        """
+Insert a batch of rows whose tuples are distinct and not yet in the
+hash table, growing it first to keep the load factor below one half.
+        """
+        if 2 * (self._used + self._removed + len(rows)) > len(self._slots):
+            self.rebuild()
+            return
+
+        table = self._table
+        mask = (1 << self._bits) - 1
+        columns = [ getattr(table, name)[rows] for name, _ in TripleTable.COLUMNS ]
+        pos = self._hash_columns(*columns)
+        pending = np.arange(len(rows))
+
+        while len(pending) > 0:
+            slots = pos[pending]
+            free = self._slots[slots] < 0
+
+            # among the rows which probe the same free slot, the first
+            # one takes it
+            cand_slots, first = np.unique(slots[free], return_index=True)
+            winners = pending[free][first]
+
+            self._removed -= int(np.count_nonzero(self._slots[cand_slots] == self.REMOVED))
+            self._slots[cand_slots] = rows[winners]
+
+            placed = np.zeros(len(rows), dtype=np.bool_)
+            placed[winners] = True
+            pending = pending[~placed[pending]]
+            pos[pending] = (pos[pending] + 1) & mask
+
+        self._used += len(rows)
+
+
+    def remove (
+        self,
+        row: int,
+        ) -> None:
+        """
+Remove a row from the hash table, before its tuple changes.
+        """
+        _tuple = self._table.get_tuples(np.array([ row ]))[0]
+        mask = (1 << self._bits) - 1
+        pos = self._hash(*TripleTable.pack_words(_tuple))
+
+        while self._slots[pos] != row:
+            pos = (pos + 1) & mask
+
+        self._slots[pos] = self.REMOVED
+        self._used -= 1
+        self._removed += 1
+
+
+class PermutationIndex:
+    """
+The *SPO*, *POS*, and *OSP* permutation indexes of a `TripleTable`,
+each an int64 array of the row indexes sorted by the columns in that
+order, so that any triple pattern which has a bound term resolves as a
+range lookup by binary search, given the order for which its bound
+terms form a prefix.
+
+The rows appended after the last sort form a tail, which gets scanned
+with vectorized comparisons, until it grows large enough for the
+permutations to get sorted again; since the rows of the table stay in
+place until it gets compacted, discarded rows remain in the sorted
+order, and the callers filter them out by context.
+The permutations can be saved as `.npy` files, then loaded
+memory-mapped.
+
+Lookups run under the read lock of the store, so that several readers
+may find the permutations out of date at once: an internal mutex lets
+only one of them sort, then the others reuse its result.
+    """
+    ORDERS: typing.Dict[ str, typing.Tuple ] = {
+        "spo": ( "src", "rel", "dst", "lit", ),
+        "pos": ( "rel", "dst", "lit", "src", ),
+        "osp": ( "dst", "lit", "src", "rel", ),
+    }
+
+    MIN_TAIL: int = 65536
+    TAIL_RATIO: int = 8
+
+
+    def __init__ (
+        self,
+        table: TripleTable,
+        ) -> None:
+        """
+Instance constructor, which defers sorting until the first lookup.
+
+    table:
+the table of tuples to index
+        """
+        self._table: TripleTable = table
+
+        # the permutations and the number of rows which they sort,
+        # replaced together so that concurrent readers see a
+        # consistent pair
+        self._sorted: typing.Tuple[ typing.Optional[ typing.Dict[ str, np.ndarray ] ], int ] = ( None, 0, )
+        self._sort_lock: threading.Lock = threading.Lock()
+
+
+    @property
+    def nbytes (
+        self
+        ) -> int:
+        """
+Number of bytes allocated for the permutations in memory.
+        """
+        perms, _ = self._sorted
+
+        if perms is None:
+            return 0
+
+        return sum(perm.nbytes for perm in perms.values() if not isinstance(perm, np.memmap))
+
+
+    def reset (
+        self
+        ) -> None:
+        """
+Drop the permutations, after the rows of the table have moved.
+        """
+        self._sorted = ( None, 0, )
+
+
+    def sort (
+        self
+        ) -> typing.Tuple[ typing.Dict[ str, np.ndarray ], int ]:
+        """
+Sort all of the rows of the table in each order, unless another
+thread has already sorted them while this one waited.
+
+    returns:
+the permutations, and the number of rows which they sort
+        """
+        table = self._table
+
+        with self._sort_lock:
+            size = table.num_rows
+            current = self._sorted
+
+            if current[0] is not None and current[1] == size:
+                return current  # type: ignore
+
+            perms = {}
+
+            for order, names in self.ORDERS.items():
+                cols = [ getattr(table, name)[:size] for name in names ]
+                perms[order] = np.lexsort(cols[::-1]).astype(np.int64)
+
+            # publish the pair with a single assignment
+            sorted_ = ( perms, size, )
+            self._sorted = sorted_
+
+        return sorted_
+
+
+    def _current (
+        self
+        ) -> typing.Tuple[ typing.Dict[ str, np.ndarray ], int ]:
+        """
+Get the permutations, sorting them again if the tail has grown too
+large.
+        """
+        perms, num_sorted = self._sorted
+        tail = self._table.num_rows - num_sorted
+
+        if perms is None or tail > max(self.MIN_TAIL, num_sorted // self.TAIL_RATIO):
+            return self.sort()
+
+        return perms, num_sorted
+
+
+    def select (
+        self,
+        src: typing.Optional[int],
+        rel: typing.Optional[int],
+        obj: typing.Optional[ typing.Tuple ],
+        ) -> np.ndarray:
+        """
+Select the rows whose columns match the bound terms of an encoded
+pattern: a range within the sorted permutation for which these terms
+form a prefix, located by binary search, plus the matching rows of the
+tail. The results may include discarded rows.
+
+    returns:
+array of the matching row indexes
+        """
+        perms, num_sorted = self._current()
+
+        if src is not None:
+            if rel is not None:
+                order, prefix = "spo", ( src, rel, *obj, ) if obj is not None else ( src, rel, )
+            elif obj is not None:
+                order, prefix = "osp", ( *obj, src, )
+            else:
+                order, prefix = "spo", ( src, )
+        elif rel is not None:
+            order, prefix = "pos", ( rel, *obj, ) if obj is not None else ( rel, )
+        else:
+            order, prefix = "osp", tuple(obj)  # type: ignore
+
+        prefix = tuple(map(int, prefix))
+        names = self.ORDERS[order][:len(prefix)]
+        cols = [ getattr(self._table, name) for name in names ]
+        perm = perms[order]
+
+        def get_key (row: int) -> typing.Tuple:
+            return tuple(int(col[row]) for col in cols)
+
+        lo = bisect.bisect_left(perm, prefix, lo=0, hi=num_sorted, key=get_key)
+        hi = bisect.bisect_right(perm, prefix, lo=lo, hi=num_sorted, key=get_key)
+        rows = perm[lo:hi]
+
+        size = self._table.num_rows
+
+        if size > num_sorted:
+            mask = np.ones(size - num_sorted, dtype=np.bool_)
+
+            for col, value in zip(cols, prefix):
+                mask &= col[num_sorted:size] == value
+
+            rows = np.concatenate([ rows, num_sorted + np.flatnonzero(mask) ])
+
+        return rows
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Save each permutation as an `<order>.npy` file in the directory
+`path`, sorting them first unless they are current.
+        """
+        perms, num_sorted = self._sorted
+
+        if perms is None or num_sorted != self._table.num_rows:
+            perms, _ = self.sort()
+
+        for order, perm in perms.items():
+            _save_array(path / f"{order}.npy", perm)
+
+
+    @classmethod
+    def load (
+        cls,
+        table: TripleTable,
+        path: pathlib.Path,
+        ) -> "PermutationIndex":
+        """
+Load the permutations which were written by `save()`, memory-mapped as
+read-only arrays.
+        """
+        index = cls(table)
+
+        index._sorted = (  # pylint: disable=W0212
+            {
+                order: np.load(path / f"{order}.npy", mmap_mode="r")
+                for order in cls.ORDERS
+            },
+            table.num_rows,
+        )
+
+        return index
+
+
+class TupleIndex:
+    """
+The tuples of a `PropertyStore` along with their indexes: a
+`TripleTable`, the `RowIndex` hash table of its rows, and the
+`PermutationIndex` which resolves triple patterns as range lookups,
+unless the store is not `indexed`, in which case patterns get matched
+by a vectorized scan of the columns.
+Removed tuples get discarded in place, and the table gets compacted
+once they make up a quarter of its rows.
+
+While the table remains memory-mapped, there is no hash table of its
+rows, and lookups use the permutations instead, until `materialize()`
+prepares the table to be modified.
+    """
+
+    def __init__ (
+        self,
+        *,
+        indexed: bool = True,
+        ) -> None:
+        """
+Instance constructor.
+
+    indexed:
+use the permutation index to match triple patterns; defaults to `True`
+        """
+        self.indexed: bool = indexed
+        self.table: TripleTable = TripleTable()
+        self.rows: typing.Optional[RowIndex] = RowIndex(self.table)
+        self.perms: PermutationIndex = PermutationIndex(self.table)
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of tuples.
+        """
+        return len(self.table)
+
+
+    @property
+    def nbytes (
+        self
+        ) -> int:
+        """
+Number of bytes allocated in memory for the tuples and their indexes.
+        """
+        nbytes = 0 if self.table.mapped else self.table.nbytes
+
+        if self.rows is not None:
+            nbytes += self.rows.nbytes
+
+        return nbytes + self.perms.nbytes
+
+
+    def materialize (
+        self
+        ) -> None:
+        """
+Prepare to modify the tuples: memory-mapped columns get copied into
+memory, then the hash table of their rows gets built.
+        """
+        if self.table.mapped:
+            self.table.materialize()
+
+        if self.rows is None:
+            self.rows = RowIndex(self.table)
+
+
+    def find (
+        self,
+        _tuple: typing.Tuple,
+        ) -> int:
+        """
+Locate the given tuple, returning `-1` if not found.
+        """
+        if self.rows is None:
+            src, rel, dst, o_lit, ctx = _tuple
+            rows = self.perms.select(src, rel, ( dst, o_lit, ))
+            rows = rows[self.table.ctx[rows] == ctx]
+
+            return int(rows[0]) if len(rows) > 0 else -1
+
+        return self.rows.find(_tuple)
+
+
+    def find_columns (
+        self,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> np.ndarray:
+        """
+Vectorized version of `find()` for a batch of tuples given as columns,
+after `materialize()`.
+
+    returns:
+array of the row index for each tuple, or `-1` for those which are not present
+        """
+        return self.rows.find_columns(src, rel, dst, lit, ctx)  # type: ignore
+
+
+    def match (
+        self,
+        src: typing.Optional[int],
+        rel: typing.Optional[int],
+        obj: typing.Optional[ typing.Tuple ],
+        ctx: typing.Optional[int],
+        ) -> typing.List[ typing.Tuple ]:
+        """
+Select the tuples which match an encoded pattern, through a range
+lookup in the permutation index for which the bound terms form a
+prefix, which also serves while the tuples are memory-mapped;
+otherwise a vectorized scan of the columns.
+
+    returns:
+list of the matching tuples
+        """
+        table = self.table
+
+        if src is None and rel is None and obj is None:
+            return table.get_tuples(table.match(ctx=ctx))
+
+        if not self.indexed and self.rows is not None:
+            dst, lit = obj if obj is not None else ( None, None, )
+            return table.get_tuples(table.match(src, rel, dst, lit, ctx))
+
+        rows = self.perms.select(src, rel, obj)
+        ctx_ids = table.ctx[rows]
+        rows = rows[ctx_ids >= 0] if ctx is None else rows[ctx_ids == ctx]
+
+        return table.get_tuples(rows)
+
+
+    def insert (
+        self,
+        _tuple: typing.Tuple,
+        ) -> None:
+        """
+Append a tuple which is not already present, after `materialize()`.
+        """
+        self.rows.add(self.table.append(_tuple))  # type: ignore
+
+
+    def extend (
+        self,
+        src: np.ndarray,
+        rel: np.ndarray,
+        dst: np.ndarray,
+        lit: np.ndarray,
+        ctx: np.ndarray,
+        ) -> None:
+        """
+Append a batch of distinct tuples which are not already present, given
+as columns, after `materialize()`.
+        """
+        start = self.table.extend(src, rel, dst, lit, ctx)
+        self.rows.extend(np.arange(start, start + len(src)))  # type: ignore
+
+
+    def delete (
+        self,
+        _tuple: typing.Tuple,
+        ) -> None:
+        """
+Delete a tuple which is present, after `materialize()`, discarding its
+row, then compact the table once the discarded rows make up a quarter
+of it.
+        """
+        idx = self.rows.find(_tuple)  # type: ignore
+        self.rows.remove(idx)  # type: ignore
+        self.table.discard(idx)
+
+        if self.table.num_discarded * 4 > max(self.table.num_rows, TripleTable.CHUNK_SIZE):
+            self.compact()
+
+
+    def compact (
+        self
+        ) -> None:
+        """
+Drop any discarded rows of the table, then rebuild its indexes.
+        """
+        if self.table.num_discarded < 1:
+            return
+
+        self.table.compact()
+        self.perms.reset()
+
+        if self.rows is not None:
+            self.rows.rebuild()
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Save the columns and the permutations as `.npy` files in the directory
+`path`, after compacting the table.
+        """
+        self.compact()
+        self.table.save(path)
+        self.perms.save(path)
+
+
+    @classmethod
+    def load (
+        cls,
+        path: pathlib.Path,
+        *,
+        indexed: bool = True,
+        ) -> "TupleIndex":
+        """
+Load the columns and permutations which were written by `save()`,
+memory-mapped as read-only arrays.
+        """
+        index = cls(indexed=indexed)
+        index.table = TripleTable.load(path)
+        index.rows = None
+        index.perms = PermutationIndex.load(index.table, path)
+
+        return index
+
+
+class TermTables:
+    """
+The term dictionaries of a `PropertyStore`, which intern the names of
+nodes and relations, and the literals, as the ids used within its
+tuples.
+    """
+
+    def __init__ (
+        self
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self.nodes: TermDict = TermDict()
+        self.rels: TermDict = TermDict()
+        self.literals: LiteralTable = LiteralTable()
+
+
+    def save (
+        self,
+        path: pathlib.Path,
+        ) -> None:
+        """
+Save each of the term dictionaries in the directory `path`.
+        """
+        self.nodes.save(path, "nodes")
+        self.rels.save(path, "rels")
+        self.literals.save(path, "literals")
+
+
+    @classmethod
+    def load (
+        cls,
+        path: pathlib.Path,
+        ) -> "TermTables":
+        """
+Load the term dictionaries which were written by `save()`.
+        """
+        terms = cls()
+        terms.nodes = TermDict.load(path, "nodes")
+        terms.rels = TermDict.load(path, "rels")
+        terms.literals = LiteralTable.load(path, "literals")
+
+        return terms
+
+
+class ContextRegistry:
+    """
+The registry of contexts of a `PropertyStore`, which interns the
+identifier of each context as its id within the tuples, along with its
+graph and a count of its triples.
+The default context `None` always has the id `0`; a context which has
+been removed keeps its id, although its graph becomes `None`.
+    """
+
+    def __init__ (
+        self
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self.names: TermDict = TermDict()
+        self.names.get_id(None)
+
+        self.graphs: typing.List[ typing.Optional[ rdflib.Graph ] ] = [ None ]
+        self.refs: typing.List[ typing.Tuple ] = [ () ]
+        self.counts: typing.List[int] = [ 0 ]
+
+
+    def __len__ (
+        self
+        ) -> int:
+        """
+Number of context ids, including the default context and any removed
+contexts.
+        """
+        return len(self.graphs)
+
+
+    def register (
+        self,
+        context: typing.Optional[ rdflib.Graph ],
+        ) -> typing.Tuple[ int, bool ]:
+        """
+Register a context supplied by `RDFlib`.
+
+    returns:
+the context id, and a flag for whether the context was new or had been removed
+        """
+        if context is None:
+            return 0, False
+
+        ctx = self.names.get_id(str(context.identifier))
+
+        if ctx == len(self.graphs):
+            self.graphs.append(context)
+            self.refs.append(( context, ))
+            self.counts.append(0)
+            return ctx, True
+
+        if self.graphs[ctx] is None:
+            self.set_graph(ctx, context)
+            return ctx, True
+
+        return ctx, False
+
+
+    def encode (
+        self,
+        context: typing.Optional[ rdflib.Graph ],
+        ) -> typing.Optional[int]:
+        """
+Encode a context supplied by `RDFlib` as its id within the tuples.
+
+    returns:
+the context id, `None` to match any context, or `-1` if the context is not registered
+        """
+        if context is None:
+            return None
+
+        return self.names.get_id(str(context.identifier), create=False)  # type: ignore
+
+
+    def set_graph (
+        self,
+        ctx: int,
+        graph: typing.Optional[ rdflib.Graph ],
+        ) -> None:
+        """
+Set the graph for a context id, where `None` marks it as removed.
+        """
+        self.graphs[ctx] = graph
+        self.refs[ctx] = () if graph is None else ( graph, )
+
+
+    def to_meta (
+        self
+        ) -> typing.List[ typing.List ]:
+        """
+Serialize the registered contexts, other than the default context, as
+pairs of the context name and the N3 of the graph identifier, if not
+removed.
+        """
+        return [
+            [ self.names.get_name(ctx), None if graph is None else graph.identifier.n3(), ]
+            for ctx, graph in enumerate(self.graphs)
+            if ctx > 0
+        ]
+
+
+    @classmethod
+    def from_meta (
+        cls,
+        contexts: typing.List[ typing.List ],
+        counts: typing.List[int],
+        store: typing.Any,
+        ) -> "ContextRegistry":
+        """
+Deserialize the contexts which were serialized by `to_meta()`, given
+their counts of triples, creating their graphs on `store`.
+        """
+        registry = cls()
+        registry.counts = list(counts)
+
+        for ctx_name, ctx_n3 in contexts:
+            registry.names.get_id(ctx_name)
+
+            if ctx_n3 is None:
+                registry.graphs.append(None)
+                registry.refs.append(())
+            else:
+                graph = rdflib.Graph(store=store, identifier=rdflib.util.from_n3(ctx_n3))
+                registry.graphs.append(graph)
+                registry.refs.append(( graph, ))
+
+        return registry
+
+
+class ChangeLog:
+    """
+The logs of changes to a `PropertyStore`: an undo log while a
+transaction is open, where consecutive changes of the same kind share
+one entry, and a log of the added and removed packed keys, which
+persists across transactions while any named marks refer to it.
+The `dirty` flag tracks whether any changes have not been persisted.
+    """
+
+    def __init__ (
+        self
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self.undo: typing.Optional[ typing.List[ typing.Tuple[ str, typing.List ] ] ] = None
+        self.changes: typing.Optional[ typing.List[ typing.Tuple[ bool, bytes ] ] ] = None
+        self.start: int = 0
+        self.marks: typing.Dict[ str, int ] = {}
+        self.dirty: bool = False
+
+
+    def record (
+        self,
+        op: str,
+        items: typing.List,
+        ) -> bool:
+        """
+Record changes in the undo log, if a transaction is open, and in the
+log of packed keys, if any marks refer to it: `"add"` items are the
+packed keys of added tuples, `"remove"` items are the removed tuples,
+and `"graph"` items are the prior `(ctx, graph)` entries of the
+registry of contexts.
+
+    returns:
+`True` if a transaction is open, otherwise the changes need to be committed
+        """
+        if self.undo is not None:
+            if len(self.undo) < 1 or self.undo[-1][0] != op:
+                self.undo.append(( op, [], ))
+
+            self.undo[-1][1].extend(items)
+
+        if self.changes is not None:
+            if op == "add":
+                self.changes.extend(( True, key, ) for key in items)
+            elif op == "remove":
+                self.changes.extend(( False, TripleTable.pack_key(_tuple), ) for _tuple in items)
+
+        return self.undo is not None
+
+
+    def mark (
+        self,
+        name: str,
+        position: typing.Optional[int] = None,
+        replace: typing.Optional[str] = None,
+        ) -> int:
+        """
+Set a named mark, starting the log of packed keys if needed; otherwise
+throws a `ValueError` exception if the position is outside of the log.
+
+    returns:
+the position of the mark
+        """
+        if self.changes is None:
+            self.changes = []
+            self.start = 0
+
+        end = self.start + len(self.changes)
+
+        if position is None:
+            position = end
+        elif not self.start <= position <= end:
+            raise ValueError(f"position is outside of the change log: {position}")
+
+        if replace is not None:
+            self.marks.pop(replace, None)
+
+        self.marks[name] = position
+        self._trim()
+
+        return position
+
+
+    def unmark (
+        self,
+        name: str,
+        ) -> None:
+        """
+Remove a named mark, which stops the log of packed keys once no marks
+remain.
+        """
+        self.marks.pop(name, None)
+        self._trim()
+
+
+    def clear_marks (
+        self
+        ) -> None:
+        """
+Remove all of the marks, and stop the log of packed keys.
+        """
+        self.marks = {}
+        self._trim()
+
+
+    def _trim (
+        self
+        ) -> None:
+        """
+Drop the entries of the log of packed keys before the earliest mark.
+        """
+        if len(self.marks) < 1:
+            self.changes = None
+            self.start = 0
+        elif self.changes is not None:
+            earliest = min(self.marks.values())
+            del self.changes[:earliest - self.start]
+            self.start = earliest
+
+
+    def net_changes (
+        self,
+        name: str,
+        ) -> typing.Optional[ typing.Tuple[ int, typing.Dict[ bytes, bool ] ] ]:
+        """
+Net out the changes since a named mark: an add and a remove of the
+same packed key cancel each other.
+
+    returns:
+the current position in the log, and a map from each changed packed key to `True` if last added or `False` if last removed; otherwise `None` if there is no mark with that name
+        """
+        position = self.marks.get(name)
+
+        if position is None or self.changes is None:
+            return None
+
+        net: typing.Dict[ bytes, bool ] = {}
+
+        for is_add, key in self.changes[position - self.start:]:
+            if net.get(key) is (not is_add):
+                del net[key]
+            else:
+                net[key] = is_add
+
+        return self.start + len(self.changes), net
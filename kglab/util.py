@@ -7,6 +7,7 @@ Utility functions used within `kglab` and related applications.
 """
 
 import math
+import threading
 import typing
 
 import numpy as np  # type: ignore  # pylint: disable=E0401
@@ -120,9 +121,202 @@ RMS metric as a float
     n = float(len(values))
     return math.sqrt(s / n)
 
+class ReadWriteLock:
+    """
+A reader/writer lock, which lets many threads read concurrently while a
+writer has exclusive access. Writers have preference, so that a stream
+of readers cannot starve them. Both kinds of lock are reentrant, and
+a thread which holds the write lock may also read; however, a thread
+which holds a read lock cannot upgrade it to write.
+    """
+
+    def __init__ (
+        self
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self._mutex: threading.Lock = threading.Lock()
+        self._cond: threading.Condition = threading.Condition(self._mutex)
+        self._readers: typing.Dict[ int, int ] = {}
+        self._writer: typing.Optional[int] = None
+        self._write_depth: int = 0
+        self._writers_waiting: int = 0
+        self._waiting: int = 0
+
+        self._read_guard: LockGuard = LockGuard(self.acquire_read, self.release_read)
+        self._write_guard: LockGuard = LockGuard(self.acquire_write, self.release_write)
+
+
+    def _wait (
+        self
+        ) -> None:
+        """
+Wait for a notification, while holding the mutex.
+        """
+        self._waiting += 1
+
+        try:
+            self._cond.wait()
+        finally:
+            self._waiting -= 1
+
+
+    def acquire_read (
+        self
+        ) -> None:
+        """
+Acquire a read lock, waiting while another thread writes or waits to
+write, unless this thread already holds a lock.
+        """
+        ident = threading.get_ident()
+
+        with self._mutex:
+            if self._writer == ident:
+                self._write_depth += 1
+            elif ident in self._readers:
+                self._readers[ident] += 1
+            else:
+                while self._writer is not None or self._writers_waiting > 0:
+                    self._wait()
+
+                self._readers[ident] = 1
+
+
+    def release_read (
+        self
+        ) -> None:
+        """
+Release a read lock.
+        """
+        ident = threading.get_ident()
+
+        with self._mutex:
+            if self._writer == ident:
+                self._release_write()
+                return
+
+            count = self._readers.pop(ident) - 1
+
+            if count > 0:
+                self._readers[ident] = count
+            elif self._waiting > 0 and len(self._readers) < 1:
+                self._cond.notify_all()
+
+
+    def acquire_write (
+        self
+        ) -> None:
+        """
+Acquire the write lock, waiting until no other thread reads or writes;
+otherwise throws a `RuntimeError` exception if this thread holds a read
+lock, which would deadlock.
+        """
+        ident = threading.get_ident()
+
+        with self._mutex:
+            if self._writer == ident:
+                self._write_depth += 1
+                return
+
+            if ident in self._readers:
+                raise RuntimeError("cannot upgrade a read lock to write")
+
+            if self._writer is not None or len(self._readers) > 0:
+                self._writers_waiting += 1
+
+                try:
+                    while self._writer is not None or len(self._readers) > 0:
+                        self._wait()
+                finally:
+                    self._writers_waiting -= 1
+
+            self._writer = ident
+            self._write_depth = 1
+
+
+    def release_write (
+        self
+        ) -> None:
+        """
+Release the write lock.
+        """
+        with self._mutex:
+            self._release_write()
+
+
+    def _release_write (
+        self
+        ) -> None:
+        """
+Release one level of the write lock, while holding the mutex.
+        """
+        self._write_depth -= 1
+
+        if self._write_depth < 1:
+            self._writer = None
+
+            if self._waiting > 0:
+                self._cond.notify_all()
+
+
+    def read (
+        self
+        ) -> "LockGuard":
+        """
+Context manager which holds a read lock.
+        """
+        return self._read_guard
+
+
+    def write (
+        self
+        ) -> "LockGuard":
+        """
+Context manager which holds the write lock.
+        """
+        return self._write_guard
+
+
+class LockGuard:
+    """
+A reusable context manager which calls a pair of acquire and release
+functions, which costs less than a generator-based context manager on
+paths that lock for each call.
+    """
+    __slots__ = ( "_acquire", "_release", )
+
+
+    def __init__ (
+        self,
+        acquire: typing.Callable[ [], None ],
+        release: typing.Callable[ [], None ],
+        ) -> None:
+        """
+Instance constructor.
+        """
+        self._acquire = acquire
+        self._release = release
+
+
+    def __enter__ (
+        self
+        ) -> None:
+        self._acquire()
+
+
+    def __exit__ (
+        self,
+        *exc_info: typing.Any,
+        ) -> None:
+        self._release()
+
+
 class Mixin:
     """Base mixin, Provide `mypy` stubs for common methods and properties"""
     _g: typing.Optional[GraphLike]
+    name: str
+    language: str
     get_ns: typing.Callable
     add_ns: typing.Callable
     _ns: typing.Dict
@@ -135,3 +329,22 @@ class Mixin:
     build_blank_graph: typing.Callable
     graph_factory: typing.Callable
     remove: typing.Callable
+    lock: ReadWriteLock
+
+    # shared between `SerdeMixin`, `NTriplesMixin`, and `ParquetMixin`
+    _ERROR_PATH: str
+    _TERM_IRI: str
+    _TERM_BNODE: str
+    _TERM_LITERAL: str
+    _get_filename: typing.Callable
+    _open_decompressed: typing.Callable
+    _open_compressed_output: typing.Callable
+    _namespace_state: typing.Callable
+    _merge_namespaces: typing.Callable
+    _load_cached: typing.Callable
+    _build_term: typing.Callable
+    _arrow_table: typing.Callable
+    _add_arrow_table: typing.Callable
+    _save_ntriples: typing.Callable
+    _parse_ntriples: typing.Callable
+    _merge_ntriples: typing.Callable
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Multi-threaded stress benchmark for the `PropertyStore` plugin: reader
+threads iterate through `triples()` for random subjects while a writer
+thread appends batches of triples, then report the read throughput,
+compared with serializing every call through one global lock.
+
+usage: python scripts/bench_concurrency.py [NUM_READERS]
+"""
+
+from os.path import abspath, dirname
+import contextlib
+import pathlib
+import random
+import sys
+import threading
+import time
+import typing
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+from kglab.graph import PropertyStore
+
+NUM_READERS: int = 4
+NUM_TRIPLES: int = 200000
+NUM_SUBJECTS: int = 20000
+BATCH_SIZE: int = 1000
+DURATION: float = 5.0
+
+BASE_URI: str = "http://example.org/"
+
+
+def gen_triples (
+    start: int,
+    num_triples: int,
+    ) -> typing.Iterator[tuple]:
+    """generate distinct triples about a fixed population of subjects"""
+    for i in range(start, start + num_triples):
+        s = rdflib.URIRef(f"{BASE_URI}node{i % NUM_SUBJECTS}")
+        p = rdflib.URIRef(f"{BASE_URI}pred{i % 17}")
+        o = rdflib.Literal(f"value {i}")
+
+        yield s, p, o
+
+
+def run (
+    num_readers: int,
+    with_writer: bool,
+    global_lock: typing.Optional[threading.Lock],
+    ) -> typing.Tuple[ float, int ]:
+    """run the readers, and optionally a writer, for a fixed duration"""
+    store = PropertyStore()
+    store.addN((s, p, o, None) for s, p, o in gen_triples(0, NUM_TRIPLES))
+
+    guard = global_lock if global_lock is not None else contextlib.nullcontext()
+    stop = threading.Event()
+    reads = [ 0 ] * num_readers
+    written = [ 0 ]
+
+    def reader (idx: int) -> None:
+        rng = random.Random(idx)
+
+        while not stop.is_set():
+            s = rdflib.URIRef(f"{BASE_URI}node{rng.randrange(NUM_SUBJECTS)}")
+
+            with guard:
+                for _ in store.triples(( s, None, None, )):
+                    pass
+
+            reads[idx] += 1
+
+    def writer () -> None:
+        start = NUM_TRIPLES
+
+        while not stop.is_set():
+            with guard:
+                store.addN((s, p, o, None) for s, p, o in gen_triples(start, BATCH_SIZE))
+
+            start += BATCH_SIZE
+            written[0] += BATCH_SIZE
+
+    threads = [ threading.Thread(target=reader, args=( i, )) for i in range(num_readers) ]
+
+    if with_writer:
+        threads.append(threading.Thread(target=writer))
+
+    for thread in threads:
+        thread.start()
+
+    time.sleep(DURATION)
+    stop.set()
+
+    for thread in threads:
+        thread.join()
+
+    return sum(reads) / DURATION, written[0]
+
+
+def report (
+    label: str,
+    reads_per_sec: float,
+    num_written: int,
+    ) -> None:
+    """print the throughput for one run"""
+    print(f"{label:>20}: {reads_per_sec:12.0f} reads/sec {num_written / DURATION:12.0f} writes/sec")
+
+
+if __name__ == "__main__":
+    num_readers = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_READERS
+
+    report("readers only", *run(num_readers, False, None))
+    report("rw lock + writer", *run(num_readers, True, None))
+    report("global lock + writer", *run(num_readers, True, threading.Lock()))
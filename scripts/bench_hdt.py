@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for the compact binary format of `KnowledgeGraph.save_hdt()`
+on a generated graph: compares its file size and load time with Turtle,
+Parquet in the v2 schema, and Arrow IPC, then measures how long an
+`HDTFile` takes to open and to answer triple patterns without loading
+the graph.
+
+usage: python scripts/bench_hdt.py [NUM_TRIPLES]
+"""
+
+from os.path import abspath, dirname
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_TRIPLES: int = 200000
+NUM_PREDICATES: int = 20
+SUBJECTS_RATIO: int = 10
+NUM_PATTERNS: int = 1000
+
+BASE_URI: str = "http://example.org/sagas#"
+
+
+def gen_triples (
+    num_triples: int,
+    ) -> typing.Iterator[tuple]:
+    """generate triples with a mix of node and literal objects"""
+    num_subjects = max(num_triples // SUBJECTS_RATIO, 1)
+
+    for i in range(num_triples):
+        s = rdflib.URIRef(f"{BASE_URI}node{i % num_subjects}")
+        p = rdflib.URIRef(f"{BASE_URI}pred{i % NUM_PREDICATES}")
+
+        if i % 4 == 0:
+            o = rdflib.Literal(f"name {i}", lang="en")
+        elif i % 4 == 1:
+            o = rdflib.Literal(i)
+        else:
+            o = rdflib.URIRef(f"{BASE_URI}node{(i + i // num_subjects) % num_subjects}")
+
+        yield s, p, o
+
+
+def bench_load (
+    path: pathlib.Path,
+    method: str,
+    ) -> float:
+    """load the file through one of the `KnowledgeGraph` loaders"""
+    kg = kglab.KnowledgeGraph()
+    start = time.time()
+    getattr(kg, method)(path)
+
+    return time.time() - start
+
+
+def bench_patterns (
+    path: pathlib.Path,
+    patterns: typing.List[tuple],
+    ) -> typing.Tuple[ float, float, int ]:
+    """open the file, then answer each of the triple patterns"""
+    start = time.time()
+    hdt = kglab.HDTFile(path)
+    open_duration = time.time() - start
+
+    start = time.time()
+    num_results = sum(len(list(hdt.triples(pattern))) for pattern in patterns)
+    duration = time.time() - start
+
+    hdt.close()
+
+    return open_duration, duration, num_results
+
+
+def report (
+    label: str,
+    num_triples: int,
+    duration: float,
+    size: int,
+    ) -> None:
+    """print the timing and file size for one format"""
+    print(f"{label:>8}: {num_triples:9d} triples {duration:10.3f} sec {num_triples / duration:12.0f} triples/sec {size:12d} bytes")
+
+
+if __name__ == "__main__":
+    num_triples = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TRIPLES
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        kg = kglab.KnowledgeGraph()
+
+        for triple in gen_triples(num_triples):
+            kg.rdf_graph().add(triple)
+
+        num_triples = len(kg.rdf_graph())
+        paths = {
+            "ttl": pathlib.Path(tmp_dir) / "bench.ttl",
+            "parquet": pathlib.Path(tmp_dir) / "bench.parquet",
+            "arrow": pathlib.Path(tmp_dir) / "bench.arrow",
+            "hdt": pathlib.Path(tmp_dir) / "bench.hdt",
+        }
+
+        start = time.time()
+        kg.save_hdt(paths["hdt"])
+        print(f"save hdt: {time.time() - start:10.3f} sec")
+
+        kg.save_rdf(paths["ttl"])
+        kg.save_parquet(paths["parquet"], schema_version=2)
+        kg.save_arrow(paths["arrow"])
+
+        for label, method in [
+            ( "ttl", "load_rdf", ),
+            ( "parquet", "load_parquet", ),
+            ( "arrow", "load_arrow", ),
+            ( "hdt", "load_hdt", ),
+        ]:
+            report(label, num_triples, bench_load(paths[label], method), paths[label].stat().st_size)
+
+        # one pattern per position for a sample of the triples
+        patterns = []
+
+        for s, p, o in list(kg.rdf_graph())[:NUM_PATTERNS // 3]:
+            patterns.extend([ ( s, None, None, ), ( s, p, None, ), ( None, None, o, ), ])
+
+        open_duration, duration, num_results = bench_patterns(paths["hdt"], patterns)
+        print(f"    open: {open_duration * 1000.0:10.3f} msec")
+        print(f"patterns: {len(patterns):9d} patterns {duration:10.3f} sec {duration / len(patterns) * 1000.0:10.3f} msec/pattern {num_results:9d} results")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for loading a directory of shard files through the
+`@multifile` decorator, comparing sequential parsing with parsing in
+a pool of worker processes.
+
+usage: python scripts/bench_multifile.py [NUM_WORKERS]
+"""
+
+from os.path import abspath, dirname
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_SHARDS: int = 16
+SHARD_SIZE: int = 20000
+NUM_PREDICATES: int = 20
+
+BASE_URI: str = "http://example.org/sagas#"
+
+
+def write_shards (
+    tmp_dir: pathlib.Path,
+    ) -> None:
+    """write the shard files, in both Turtle and Parquet formats"""
+    for shard in range(NUM_SHARDS):
+        kg = kglab.KnowledgeGraph(namespaces={ "sagas": BASE_URI })
+
+        for i in range(shard * SHARD_SIZE, (shard + 1) * SHARD_SIZE):
+            s = rdflib.URIRef(f"{BASE_URI}node{i // 10}")
+            p = rdflib.URIRef(f"{BASE_URI}pred{i % NUM_PREDICATES}")
+
+            if i % 2 == 0:
+                o = rdflib.Literal(f"name {i}", lang="en")
+            else:
+                o = rdflib.URIRef(f"{BASE_URI}node{i * 7 % (NUM_SHARDS * SHARD_SIZE // 10)}")
+
+            kg.add(s, p, o)
+
+        kg.save_rdf(tmp_dir / f"shard{shard:03d}.ttl")
+        kg.save_parquet(tmp_dir / f"shard{shard:03d}.parquet")
+
+
+def bench_load (
+    method: str,
+    pattern: str,
+    workers: int,
+    store: typing.Optional[str],
+    ) -> float:
+    """load the shard files, and return the duration"""
+    kg = kglab.KnowledgeGraph(store=store)
+    start = time.time()
+
+    getattr(kg, method)(pattern, workers=workers)
+
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    num_workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        write_shards(pathlib.Path(tmp_dir))
+
+        for method, ext in [ ( "load_rdf", "ttl", ), ( "load_parquet", "parquet", ), ]:
+            for store in [ None, "kglab" ]:
+                pattern = f"{tmp_dir}/shard*.{ext}"
+                serial = bench_load(method, pattern, 1, store)
+                parallel = bench_load(method, pattern, num_workers, store)
+
+                print(f"{method:>12} {str(store):>6}: {serial:8.3f} sec serial {parallel:8.3f} sec with {num_workers} workers {serial / parallel:6.1f}x")
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for `KnowledgeGraph.load_ntriples()` on a generated N-Triples
+file: measures the chunk parsing throughput versus the number of worker
+processes, then compares loading a sample of the file end-to-end with
+the `rdflib` parser used by `load_rdf()`.
+
+usage: python scripts/bench_ntriples.py [NUM_LINES [NUM_SAMPLE]]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from os.path import abspath, dirname
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_LINES: int = 10000000
+NUM_SAMPLE: int = 200000
+NUM_PREDICATES: int = 20
+
+BASE_URI: str = "http://example.org/sagas#"
+
+
+def write_ntriples (
+    path: pathlib.Path,
+    num_lines: int,
+    ) -> None:
+    """write a file with a mix of node and literal objects"""
+    num_subjects = max(num_lines // 10, 1)
+
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(num_lines):
+            s = f"<{BASE_URI}node{i % num_subjects}>"
+            p = f"<{BASE_URI}pred{i % NUM_PREDICATES}>"
+
+            if i % 4 == 0:
+                o = f'"name {i}"@en'
+            elif i % 4 == 1:
+                o = f'"{i}"^^<http://www.w3.org/2001/XMLSchema#integer>'
+            else:
+                o = f"<{BASE_URI}node{(i * 7) % num_subjects}>"
+
+            f.write(f"{s} {p} {o} .\n")
+
+
+def bench_parse (
+    path: pathlib.Path,
+    workers: int,
+    ) -> float:
+    """parse all of the chunks, without merging them into a graph"""
+    filename = str(path)
+    ranges = kglab.KnowledgeGraph._split_ntriples(filename, workers, 16 * 1024 * 1024)
+    start = time.time()
+
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(kglab.KnowledgeGraph._parse_ntriples_range, *zip(*[ ( filename, s, e, ) for s, e in ranges ])):
+                pass
+    else:
+        for s, e in ranges:
+            kglab.KnowledgeGraph._parse_ntriples_range(filename, s, e)
+
+    return time.time() - start
+
+
+def bench_load (
+    path: pathlib.Path,
+    store: typing.Optional[str],
+    workers: typing.Optional[int],
+    ) -> float:
+    """load the file into a graph; use `load_rdf()` when `workers` is `None`"""
+    kg = kglab.KnowledgeGraph(store=store)
+    start = time.time()
+
+    if workers is None:
+        kg.load_rdf(path, format="nt")
+    else:
+        kg.load_ntriples(path, workers=workers)
+
+    return time.time() - start
+
+
+def report (
+    label: str,
+    num_lines: int,
+    duration: float,
+    ) -> None:
+    """print the timing for one run"""
+    print(f"{label:>24}: {num_lines:10d} triples {duration:10.3f} sec {num_lines / duration:12.0f} triples/sec")
+
+
+if __name__ == "__main__":
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_LINES
+    num_sample = int(sys.argv[2]) if len(sys.argv) > 2 else NUM_SAMPLE
+    num_cpus = os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "bench.nt"
+        write_ntriples(path, num_lines)
+
+        for workers in sorted({ 1, 2, 4, num_cpus }):
+            report(f"parse, {workers} workers", num_lines, bench_parse(path, workers))
+
+        sample = pathlib.Path(tmp_dir) / "sample.nt"
+        write_ntriples(sample, num_sample)
+
+        for store in [ None, "kglab" ]:
+            report(f"load_rdf {store}", num_sample, bench_load(sample, store, None))
+
+            for workers in sorted({ 1, num_cpus }):
+                report(f"load_ntriples {store} {workers}", num_sample, bench_load(sample, store, workers))
+
+        print(f"cpu count: {num_cpus}")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for loading RDF graphs from Parquet files shaped like
+`dat/gorm.parquet`, comparing `KnowledgeGraph.load_parquet()` with the
+prior approach of parsing each row as Turtle, the v1 schema with the
+dictionary-encoded v2 schema, and also with the Arrow IPC files which
+`KnowledgeGraph.load_arrow()` reads.
+
+usage: python scripts/bench_parquet.py [NUM_TRIPLES]
+"""
+
+from os.path import abspath, dirname
+import pathlib
+import sys
+import tempfile
+import time
+import typing
+
+import pandas as pd
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_TRIPLES: int = 200000
+NUM_LEGACY: int = 5000
+NUM_PREDICATES: int = 20
+SUBJECTS_RATIO: int = 10
+
+BASE_URI: str = "http://example.org/sagas#"
+
+
+def gen_triples (
+    num_triples: int,
+    ) -> typing.Iterator[tuple]:
+    """generate triples with a mix of node and literal objects"""
+    num_subjects = max(num_triples // SUBJECTS_RATIO, 1)
+
+    for i in range(num_triples):
+        s = rdflib.URIRef(f"{BASE_URI}node{i % num_subjects}")
+        p = rdflib.URIRef(f"{BASE_URI}pred{i % NUM_PREDICATES}")
+
+        if i % 4 == 0:
+            o = rdflib.Literal(f"name {i}", lang="en")
+        elif i % 4 == 1:
+            o = rdflib.Literal(i)
+        else:
+            o = rdflib.URIRef(f"{BASE_URI}node{(i + i // num_subjects) % num_subjects}")
+
+        yield s, p, o
+
+
+def bench_legacy (
+    path: pathlib.Path,
+    num_rows: int,
+    ) -> float:
+    """parse each row as Turtle, as the prior `load_parquet()` did"""
+    g = rdflib.Graph()
+    df = pd.read_parquet(path).head(num_rows)
+    start = time.time()
+
+    df.apply(
+        lambda row: g.parse(
+            data=f"{ row.iloc[0] } { row.iloc[1] } { row.iloc[2] } .",
+            format="ttl",
+        ),
+        axis=1,
+    )
+
+    return time.time() - start
+
+
+def bench_load (
+    path: pathlib.Path,
+    store: typing.Optional[str],
+    ) -> float:
+    """load the Parquet file through `load_parquet()`, or an Arrow IPC file through `load_arrow()`"""
+    kg = kglab.KnowledgeGraph(store=store)
+    start = time.time()
+
+    if path.suffix == ".arrow":
+        kg.load_arrow(path)
+    else:
+        kg.load_parquet(path)
+
+    return time.time() - start
+
+
+def report (
+    label: str,
+    num_triples: int,
+    duration: float,
+    ) -> float:
+    """print the timing for one run, and return its rate"""
+    rate = num_triples / duration if duration > 0.0 else float("inf")
+    print(f"{label:>10}: {num_triples:9d} triples {duration:10.3f} sec {rate:12.0f} triples/sec")
+
+    return rate
+
+
+if __name__ == "__main__":
+    num_triples = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TRIPLES
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "bench.parquet"
+        path_v2 = pathlib.Path(tmp_dir) / "bench_v2.parquet"
+        path_arrow = pathlib.Path(tmp_dir) / "bench.arrow"
+
+        kg = kglab.KnowledgeGraph()
+
+        for triple in gen_triples(num_triples):
+            kg.rdf_graph().add(triple)
+
+        kg.save_parquet(path)
+        kg.save_parquet(path_v2, schema_version=2)
+        kg.save_arrow(path_arrow)
+
+        print(f"      size: {path.stat().st_size:12d} bytes v1 {path_v2.stat().st_size:12d} bytes v2 {path_arrow.stat().st_size:12d} bytes arrow")
+
+        # the legacy parser is slow, so only measure a sample
+        num_legacy = min(num_triples, NUM_LEGACY)
+        legacy_rate = report("legacy", num_legacy, bench_legacy(path, num_legacy))
+        memory_rate = report("memory", num_triples, bench_load(path, None))
+        store_rate = report("kglab", num_triples, bench_load(path, "kglab"))
+        report("memory v2", num_triples, bench_load(path_v2, None))
+        report("kglab v2", num_triples, bench_load(path_v2, "kglab"))
+        report("memory ipc", num_triples, bench_load(path_arrow, None))
+        report("kglab ipc", num_triples, bench_load(path_arrow, "kglab"))
+
+        print(f"   speedup: {memory_rate / legacy_rate:10.1f}x memory, {store_rate / legacy_rate:10.1f}x kglab")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for `KnowledgeGraph.save_parquet(mode="append")` on a graph
+shaped like `dat/gorm.parquet`, which grows by 1% between saves:
+compares appending only the new triples with rewriting the whole
+graph, and also measures the first append in a new session, which
+compares the graph with the dataset, and `compact_parquet()`.
+
+usage: python scripts/bench_parquet_append.py [NUM_TRIPLES [NUM_SAVES]]
+"""
+
+from os.path import abspath, dirname
+import pathlib
+import sys
+import tempfile
+import time
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+from bench_parquet import gen_triples
+
+NUM_TRIPLES: int = 200000
+NUM_SAVES: int = 3
+GROWTH: float = 0.01
+
+NEW_URI: str = "http://example.org/new#"
+
+
+def timed (
+    f,
+    *args,
+    **kwargs,
+    ) -> float:
+    """call a function, then return its duration"""
+    start = time.time()
+    f(*args, **kwargs)
+
+    return time.time() - start
+
+
+if __name__ == "__main__":
+    num_triples = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TRIPLES
+    num_saves = int(sys.argv[2]) if len(sys.argv) > 2 else NUM_SAVES
+
+    kg = kglab.KnowledgeGraph(store="kglab")
+    graph = kg.rdf_graph()
+    graph.addN((s, p, o, graph) for s, p, o in gen_triples(num_triples))
+
+    ns = rdflib.Namespace(NEW_URI)
+    num_new = max(int(num_triples * GROWTH), 1)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "dataset"
+        path_full = pathlib.Path(tmp_dir) / "full.parquet"
+
+        duration = timed(kg.save_parquet, path, mode="append", schema_version=2)
+        print(f"   initial: {duration:10.3f} sec append")
+
+        for save in range(num_saves):
+            graph.addN((ns[f"node{save}_{i}"], ns.pred, rdflib.Literal(i), graph) for i in range(num_new))
+
+            append = timed(kg.save_parquet, path, mode="append", schema_version=2)
+            rewrite = timed(kg.save_parquet, path_full, schema_version=2)
+            print(f"  save {save:3d}: {append:10.3f} sec append {rewrite:10.3f} sec rewrite {rewrite / append:10.1f}x")
+
+        kg_load = kglab.KnowledgeGraph(store="kglab")
+        kg_load.load_parquet(path)
+        kg_load.add(ns.node, ns.pred, rdflib.Literal(0))
+
+        duration = timed(kg_load.save_parquet, path, mode="append", schema_version=2)
+        print(f"   session: {duration:10.3f} sec append, compared with the dataset")
+
+        duration = timed(kglab.KnowledgeGraph.compact_parquet, path)
+        print(f"   compact: {duration:10.3f} sec")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for `KnowledgeGraph.import_roam()` on a generated Roam
+Research export, comparing the streaming import with the prior approach
+of loading the whole export through `json.load()` then walking each
+page recursively, with one `add()` call for each triple.
+Each run happens in a separate process, to measure its peak memory.
+
+usage: python scripts/bench_roam.py [NUM_BLOCKS [BLOCKS_PER_PAGE]]
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from os.path import abspath, dirname
+import datetime
+import json
+import pathlib
+import resource
+import sys
+import tempfile
+import time
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_BLOCKS: int = 1000000
+BLOCKS_PER_PAGE: int = 100
+FANOUT: int = 4
+
+USER_UID: str = "ormQkuNv54YUKrC6FkbpDR7GVNP2"
+
+
+def write_export (
+    path: pathlib.Path,
+    num_blocks: int,
+    blocks_per_page: int,
+    ) -> None:
+    """write an export where each page has a tree of nested blocks, one page at a time"""
+    num_pages = max(num_blocks // blocks_per_page, 1)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+
+        for page in range(num_pages):
+            blocks = [
+                {
+                    "string": f"block {page}-{i} with some [[text]]",
+                    "uid": f"b{page}x{i}",
+                    "edit-time": 1620354514884 + i,
+                    ":edit/user": { ":user/uid": USER_UID },
+                }
+                for i in range(blocks_per_page)
+            ]
+
+            # nest the blocks in a tree
+            for i in range(1, blocks_per_page):
+                blocks[(i - 1) // FANOUT].setdefault("children", []).append(blocks[i])
+
+            page_obj = {
+                "title": f"page {page}",
+                "uid": f"p{page}",
+                "edit-time": 1620354407665,
+                ":edit/user": { ":user/uid": USER_UID },
+                "children": [ blocks[0] ],
+            }
+
+            if page > 0:
+                f.write(",")
+
+            json.dump(page_obj, f)
+
+        f.write("]")
+
+
+def legacy_walk (
+    kg: kglab.KnowledgeGraph,
+    obj: dict,
+    seen_uid: set = None,
+    ) -> str:
+    """walk a page recursively, as the prior `import_roam()` did"""
+    if not seen_uid:
+        seen_uid = set()
+
+    roam_ns = str(kg.get_ns("roam"))
+    uid = obj["uid"]
+
+    if uid not in seen_uid:
+        seen_uid.add(uid)
+
+        node = rdflib.URIRef(roam_ns + uid)
+        kg.add(node, kg.get_ns("rdf").type, kg.get_ns("dct").Text)
+
+        descrip = obj["title"] if "title" in obj else obj["string"]
+        kg.add(node, kg.get_ns("skos").definition, rdflib.Literal(descrip))
+
+        user_uid = obj[":edit/user"][":user/uid"]
+        kg.add(node, kg.get_ns("dct").Creator, rdflib.URIRef(roam_ns + user_uid))
+
+        dt = datetime.datetime.utcfromtimestamp(round(obj["edit-time"] / 1000.0))
+        kg.add(node, kg.get_ns("dct").Date, rdflib.Literal(dt.isoformat(), datatype = rdflib.XSD.dateTime))
+
+        for child_obj in obj.get("children", []):
+            child_uid = legacy_walk(kg, child_obj, seen_uid)
+            kg.add(node, kg.get_ns("dct").references, rdflib.URIRef(roam_ns + child_uid))
+
+    return uid
+
+
+def bench_import (
+    path: str,
+    store: str,
+    legacy: bool,
+    ) -> tuple:
+    """import the export, then return the duration, triple count, and peak memory"""
+    kg = kglab.KnowledgeGraph(store=store)
+    start = time.time()
+
+    if legacy:
+        kg.add_ns("roam", "https://roamresearch.com/ns/")
+
+        with open(path, "r", encoding="utf-8") as f:
+            for obj in json.load(f):
+                legacy_walk(kg, obj)
+    else:
+        kg.import_roam(path)
+
+    duration = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    return duration, len(kg.rdf_graph()), peak
+
+
+def report (
+    label: str,
+    duration: float,
+    num_triples: int,
+    peak: int,
+    ) -> None:
+    """print the timing and peak memory for one run"""
+    print(f"{label:>18}: {num_triples:10d} triples {duration:10.3f} sec {num_triples / duration:12.0f} triples/sec {peak / 1024**2:10.1f} MiB peak RSS")
+
+
+if __name__ == "__main__":
+    num_blocks = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_BLOCKS
+    blocks_per_page = int(sys.argv[2]) if len(sys.argv) > 2 else BLOCKS_PER_PAGE
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = pathlib.Path(tmp_dir) / "roam.json"
+        write_export(path, num_blocks, blocks_per_page)
+        print(f"export: {path.stat().st_size:12d} bytes")
+
+        for store in [ None, "kglab" ]:
+            for label, legacy in [ ( "legacy", True, ), ( "streaming", False, ) ]:
+                with ProcessPoolExecutor(max_workers=1) as pool:
+                    result = pool.submit(bench_import, str(path), store, legacy).result()
+
+                report(f"{label} {store}", *result)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for the streaming serializer of `KnowledgeGraph.save_rdf()`
+on a generated graph: compares its throughput and peak memory with the
+`rdflib` serializers for N-Triples and Turtle, and with writing a
+compressed stream.
+
+usage: python scripts/bench_save_rdf.py [NUM_TRIPLES]
+"""
+
+from os.path import abspath, dirname
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import rdflib
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+import kglab
+
+NUM_TRIPLES: int = 500000
+NUM_PREDICATES: int = 20
+
+BASE_URI: str = "http://example.org/sagas#"
+
+
+def build_graph (
+    num_triples: int,
+    ) -> kglab.KnowledgeGraph:
+    """build a graph with a mix of node and literal objects"""
+    kg = kglab.KnowledgeGraph()
+    ns = rdflib.Namespace(BASE_URI)
+    num_subjects = max(num_triples // 10, 1)
+
+    for i in range(num_triples):
+        s = ns[f"node{i % num_subjects}"]
+        p = ns[f"pred{i % NUM_PREDICATES}"]
+
+        if i % 4 == 0:
+            o = rdflib.Literal(f"name {i}", lang="en")
+        elif i % 4 == 1:
+            o = rdflib.Literal(i)
+        else:
+            o = ns[f"node{(i * 7) % num_subjects}"]
+
+        kg.add(s, p, o)
+
+    return kg
+
+
+def bench_save (
+    kg: kglab.KnowledgeGraph,
+    path: pathlib.Path,
+    format: str,
+    streaming: bool,
+    ) -> tuple:
+    """serialize the graph, twice: once for the timing, then once to trace the peak memory"""
+    start = time.time()
+    kg.save_rdf(path, format=format, streaming=streaming)
+    duration = time.time() - start
+
+    tracemalloc.start()
+    kg.save_rdf(path, format=format, streaming=streaming)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return duration, peak
+
+
+def report (
+    label: str,
+    num_triples: int,
+    duration: float,
+    peak: int,
+    ) -> None:
+    """print the timing and peak memory for one run"""
+    print(f"{label:>24}: {num_triples:10d} triples {duration:10.3f} sec {num_triples / duration:12.0f} triples/sec {peak / 1024**2:10.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    num_triples = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TRIPLES
+    kg = build_graph(num_triples)
+    num_triples = len(kg.rdf_graph())
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for label, file_name, format, streaming in [
+            ( "rdflib ttl", "bench.ttl", "ttl", False, ),
+            ( "rdflib nt", "bench.nt", "nt", False, ),
+            ( "streaming nt", "bench.nt", "nt", True, ),
+            ( "streaming nt.gz", "bench.nt.gz", "nt", True, ),
+            ( "streaming nt.zst", "bench.nt.zst", "nt", True, ),
+        ]:
+            duration, peak = bench_save(kg, pathlib.Path(tmp_dir) / file_name, format, streaming)
+            report(label, num_triples, duration, peak)
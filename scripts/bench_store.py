@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# type: ignore
+
+"""
+Benchmark for loading synthetic triples into the `PropertyStore`
+plugin, compared with the prior approach of looking up names in a
+NumPy object array by `np.where()` and growing it by `np.append()`,
+then report the bytes per triple used for storing the tuples as a
+Python list compared with the columnar `TripleTable`, the time to
+open a persisted store by memory-mapping its files, and the bytes per
+triple for the whole store -- tuples, hash table of rows, permutation
+indexes, and term dictionaries -- compared with the `rdflib` default
+`Memory` store holding the same triples.
+
+usage: python scripts/bench_store.py [NUM_TRIPLES]
+"""
+
+from os.path import abspath, dirname
+import gc
+import pathlib
+import sys
+import tempfile
+import time
+import tracemalloc
+import typing
+
+import numpy as np
+import rdflib
+from rdflib.plugins.stores.memory import Memory
+
+sys.path.insert(0, str(pathlib.Path(dirname(dirname(abspath(__file__))))))
+from kglab.graph import PropertyStore
+from kglab.tables import TripleTable
+
+NUM_TRIPLES: int = 1000000
+NUM_LEGACY: int = 20000
+NUM_PREDICATES: int = 50
+SUBJECTS_RATIO: int = 10
+
+BASE_URI: str = "http://example.org/"
+
+
+class LegacyNames:
+    """the prior lookup: a linear scan per name, and a copy per append"""
+
+    def __init__ (self) -> None:
+        self._names = np.empty(shape=[0, 1], dtype=object)
+
+    def get_id (self, name: str) -> int:
+        rows = np.where(self._names == name)
+
+        if len(rows[0]) < 1:
+            self._names = np.append(self._names, name)
+            return len(self._names) - 1
+
+        return rows[0][0]
+
+
+def gen_triples (
+    num_triples: int,
+    ) -> typing.Iterator[tuple]:
+    """generate triples with a realistic mix of repeated terms"""
+    num_subjects = max(num_triples // SUBJECTS_RATIO, 1)
+
+    preds = [
+        rdflib.URIRef(f"{BASE_URI}pred{i}")
+        for i in range(NUM_PREDICATES)
+    ]
+
+    for i in range(num_triples):
+        s = rdflib.URIRef(f"{BASE_URI}node{i % num_subjects}")
+        p = preds[i % NUM_PREDICATES]
+
+        if i % 3 == 0:
+            o = rdflib.Literal(f"value {i}")
+        else:
+            o = rdflib.URIRef(f"{BASE_URI}node{(i + i // num_subjects) % num_subjects}")
+
+        yield s, p, o
+
+
+def bench_legacy (
+    triples: list,
+    ) -> float:
+    """encode the terms of each triple with the prior lookup"""
+    nodes = LegacyNames()
+    rels = LegacyNames()
+    start = time.time()
+
+    for s, p, o in triples:
+        nodes.get_id(str(s))
+        rels.get_id(str(p))
+
+        if not isinstance(o, rdflib.term.Literal):
+            nodes.get_id(str(o))
+
+    return time.time() - start
+
+
+def bench_store (
+    triples: list,
+    ) -> float:
+    """encode the terms of each triple with the store's term dictionaries"""
+    store = PropertyStore()
+    start = time.time()
+
+    for s, p, o in triples:
+        store.build_tuple(s, p, o, None)
+
+    return time.time() - start
+
+
+def bench_load (
+    triples: list,
+    ) -> float:
+    """add each triple to the store, including deduplication"""
+    store = PropertyStore()
+    start = time.time()
+
+    for triple in triples:
+        store.add(triple)
+
+    return time.time() - start
+
+
+def bench_add_n (
+    triples: list,
+    ) -> float:
+    """add the triples to the store in batches"""
+    store = PropertyStore()
+    start = time.time()
+
+    store.addN((s, p, o, None) for s, p, o in triples)
+
+    return time.time() - start
+
+
+def bench_open (
+    triples: list,
+    ) -> typing.Tuple[ float, float ]:
+    """persist the store, then time opening it and a first lookup"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = PropertyStore(configuration=tmp_dir)
+        store.addN((s, p, o, None) for s, p, o in triples)
+        store.close(commit_pending_transaction=True)
+        del store
+
+        start = time.time()
+        store = PropertyStore(configuration=tmp_dir)
+        open_duration = time.time() - start
+
+        s, p, _ = triples[len(triples) // 2]
+        start = time.time()
+        list(store.triples(( s, p, None, )))
+        lookup_duration = time.time() - start
+
+    return open_duration, lookup_duration
+
+
+def deep_sizeof (
+    obj: typing.Any,
+    seen: typing.Set[int],
+    ) -> int:
+    """approximate memory used by an object, counting shared objects once"""
+    if id(obj) in seen:
+        return 0
+
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (list, tuple)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+
+    return size
+
+
+def bench_memory (
+    triples: list,
+    ) -> typing.Tuple[ float, float ]:
+    """measure bytes per triple for a list of tuples vs. the columns"""
+    store = PropertyStore()
+    context = "urn:context"
+    rows = []
+    table = TripleTable()
+
+    for s, p, o in triples:
+        _tuple = store.build_tuple(s, p, o, None)
+        table.append(_tuple)
+
+        # the prior tuples held literals and contexts as strings
+        if _tuple[3]:
+            rows.append(( _tuple[0], _tuple[1], str(o), True, context, ))
+        else:
+            rows.append(( _tuple[0], _tuple[1], _tuple[2], False, context, ))
+
+    num_triples = len(triples)
+    list_bytes = deep_sizeof(rows, set()) / num_triples
+    table_bytes = table.nbytes / num_triples
+
+    return list_bytes, table_bytes
+
+
+def bench_footprint (
+    triples: list,
+    make_store: typing.Callable,
+    ) -> typing.Tuple[ float, typing.Dict[ str, float ] ]:
+    """
+measure bytes per triple for a whole store holding the triples, traced
+by `tracemalloc`, after a lookup which builds any lazy indexes; for a
+`PropertyStore` also break down the bytes of its parts
+    """
+    gc.collect()
+    tracemalloc.start()
+
+    store = make_store()
+    graph = rdflib.Graph(store=store)
+    graph.addN((s, p, o, graph) for s, p, o in triples)
+
+    s, _, _ = triples[len(triples) // 2]
+    list(store.triples(( s, None, None, ), context=None))
+
+    gc.collect()
+    total, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    num_triples = len(triples)
+    parts = {}
+
+    if isinstance(store, PropertyStore):
+        # pylint: disable=W0212
+        index = store._index
+        parts["tuples"] = index.table.nbytes / num_triples
+        parts["rows"] = index.rows.nbytes / num_triples if index.rows is not None else 0.0
+        parts["perms"] = index.perms.nbytes / num_triples
+        parts["terms"] = total / num_triples - sum(parts.values())
+
+    return total / num_triples, parts
+
+
+def report (
+    label: str,
+    num_triples: int,
+    duration: float,
+    ) -> None:
+    """print the timing for one run"""
+    rate = num_triples / duration if duration > 0.0 else float("inf")
+    print(f"{label:>8}: {num_triples:9d} triples {duration:10.3f} sec {rate:12.0f} triples/sec")
+
+
+if __name__ == "__main__":
+    num_triples = int(sys.argv[1]) if len(sys.argv) > 1 else NUM_TRIPLES
+    triples = list(gen_triples(num_triples))
+
+    # the legacy lookup is quadratic, so only measure a sample
+    num_legacy = min(num_triples, NUM_LEGACY)
+    report("legacy", num_legacy, bench_legacy(triples[:num_legacy]))
+    report("store", num_legacy, bench_store(triples[:num_legacy]))
+    report("store", num_triples, bench_store(triples))
+    report("load", num_triples, bench_load(triples))
+    report("addN", num_triples, bench_add_n(triples))
+
+    open_duration, lookup_duration = bench_open(triples)
+    print(f"    open: {open_duration * 1000.0:10.3f} ms")
+    print(f"  lookup: {lookup_duration * 1000.0:10.3f} ms")
+
+    list_bytes, table_bytes = bench_memory(triples)
+    print(f"    list: {list_bytes:10.1f} bytes/triple")
+    print(f"   table: {table_bytes:10.1f} bytes/triple")
+
+    for label, make_store in [
+        ( "Memory", Memory, ),
+        ( "indexed", PropertyStore, ),
+        ( "scan", lambda: PropertyStore(indexed=False), ),
+    ]:
+        total_bytes, parts = bench_footprint(triples, make_store)
+        detail = " ".join(f"{name} {value:.1f}" for name, value in parts.items())
+        print(f"{label:>8}: {total_bytes:10.1f} bytes/triple {detail}")
@@ -92,7 +92,8 @@ sota:peep2 a foaf:Person ;
     graph.remove((s, p, o,))
 
     if lpg is not None:
+        graph.commit()
         ic(lpg.digest.finalize().hex())  # type: ignore
-        ic(lpg._node_names)
-        ic(lpg._rel_names)
-        ic(lpg._tuples)
+        ic(lpg._terms.nodes.names())
+        ic(lpg._terms.rels.names())
+        ic(list(lpg._index.table))
@@ -160,7 +160,7 @@ def run_test(t, dir_):
                 report[t.name]["error"] = "ERROR: bindings do not match"
 
 
-def test_rdf_runner():
+def test_rdf_runner(tmp_path):
     tests_list = (
         "algebra","basic", "bind", "ask",
         "oxigraph-tests/sparql",
@@ -185,7 +185,7 @@ def test_rdf_runner():
 
     from datetime import datetime
     t = datetime.now().strftime("%H:%M:%S")
-    fname = dirname(abspath(__file__)) + f"/report-{t}.json"
+    fname = tmp_path / f"report-{t}.json"
     print(fname)
     with open(fname, mode="w") as f:
         f.write(str(report))
@@ -266,3 +266,33 @@ Coverage:
         # ic(multifile_node_count)
         assert multifile_edge_count == sequential_edge_count
         assert multifile_node_count == sequential_node_count
+
+
+def test_multiple_file_load_workers ():
+    """
+Coverage:
+
+* KnowledgeGraph.load_rdf() load from multiple files in a pool of worker processes
+* KnowledgeGraph.import_roam() load from a list of files in a pool of worker processes
+    """
+    from rdflib.compare import isomorphic
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_rdf("dat/*m.ttl", format="ttl")
+
+    kg_workers = kglab.KnowledgeGraph()
+    kg_workers.load_rdf("dat/*m.ttl", format="ttl", workers=2)
+
+    assert isomorphic(kg_workers.rdf_graph(), kg.rdf_graph())
+    assert kg_workers.get_ns_dict() == kg.get_ns_dict()
+
+    paths = [ pathlib.Path("dat/roam.json"), pathlib.Path("tests/dat/roam.json") ]
+
+    kg = kglab.KnowledgeGraph()
+    kg.import_roam(paths)
+
+    kg_workers = kglab.KnowledgeGraph(store="kglab")
+    kg_workers.import_roam(paths, workers=2)
+
+    assert isomorphic(kg_workers.rdf_graph(), kg.rdf_graph())
+    assert str(kg_workers.get_ns("roam")) == "https://roamresearch.com/ns/"
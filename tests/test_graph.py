@@ -0,0 +1,724 @@
+import threading
+
+from cryptography.hazmat.primitives import hashes
+import numpy as np
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+
+import kglab
+from kglab.graph import PropertyStore
+from kglab.tables import LiteralTable, PermutationIndex, RowIndex, TermDict, TripleTable
+from kglab.util import ReadWriteLock
+
+from .__init__ import DAT_FILES_DIR
+
+
+@pytest.fixture()
+def store_graph():
+    store = PropertyStore()
+    graph = rdflib.Graph(store=store, identifier="test")
+
+    yield graph
+
+    del graph
+
+
+def test_term_dict():
+    names = TermDict()
+
+    assert names.get_id("foo") == 0
+    assert names.get_id("bar") == 1
+    assert names.get_id("foo") == 0
+    assert names.get_id("baz", create=False) == -1
+
+    assert len(names) == 2
+    assert "bar" in names
+    assert names.get_name(1) == "bar"
+    assert list(names.names()) == [ "foo", "bar" ]
+
+    with pytest.raises(IndexError):
+        names.get_name(2)
+
+
+def test_term_dict_growth():
+    names = TermDict()
+    num_names = TermDict._INIT_CAPACITY * 3
+
+    for i in range(num_names):
+        assert names.get_id(f"name{i}") == i
+
+    assert len(names) == num_names
+    assert names.get_name(num_names - 1) == f"name{num_names - 1}"
+
+
+def test_term_dict_save_load(tmp_path):
+    names = TermDict()
+
+    for name in [ "foo", "bar", "baz", "qux", "étoile" ]:
+        names.get_id(name)
+
+    names.save(tmp_path, "names")
+    loaded = TermDict.load(tmp_path, "names")
+
+    assert len(loaded) == 5
+    assert loaded.get_name(4) == "étoile"
+    assert loaded.get_id("baz", create=False) == 2
+    assert loaded.get_id("quux", create=False) == -1
+    assert "qux" in loaded
+
+    # new names follow those in the file, and get saved along with them
+    assert loaded.get_id("quux") == 5
+    assert list(loaded.names()) == [ "foo", "bar", "baz", "qux", "étoile", "quux" ]
+
+    loaded.save(tmp_path, "names")
+    assert TermDict.load(tmp_path, "names").get_id("quux", create=False) == 5
+
+
+def test_triple_table():
+    table = TripleTable()
+    num_rows = TripleTable.CHUNK_SIZE + 10
+
+    for i in range(num_rows):
+        assert table.append(( i, i % 3, i + 1, i % 2 == 0, 0, )) == i
+
+    assert len(table) == num_rows
+    assert table.nbytes >= num_rows * 25
+    assert list(table.match(src=5)) == [ 5 ]
+    assert len(table.match(rel=1, lit=True)) == len([ i for i in range(num_rows) if i % 3 == 1 and i % 2 == 0 ])
+
+    table.delete(5)
+    assert len(table) == num_rows - 1
+    assert len(table.match(src=5)) == 0
+    assert list(table.match(src=num_rows - 1)) == [ 5 ]
+    assert table.get_tuples(table.match(src=6)) == [ ( 6, 0, 7, True, 0, ) ]
+
+
+def test_triple_table_discard():
+    table = TripleTable()
+
+    for i in range(10):
+        table.append(( i, 0, i + 1, False, 1, ))
+
+    table.discard(3)
+    table.discard(7)
+    assert len(table) == 8
+    assert table.num_rows == 10
+    assert table.num_discarded == 2
+    assert len(table.match(src=3)) == 0
+    assert 3 not in table.match()
+
+    kept = table.compact()
+    assert list(kept) == [ 0, 1, 2, 4, 5, 6, 8, 9 ]
+    assert table.num_rows == len(table) == 8
+    assert table.num_discarded == 0
+    assert list(table.match(src=4)) == [ 3 ]
+
+
+def test_row_index():
+    table = TripleTable()
+    rows = RowIndex(table)
+    num_rows = RowIndex.MIN_CAPACITY * 3
+
+    # single inserts grow the hash table past its initial capacity
+    for i in range(num_rows // 2):
+        rows.add(table.append(( i, i % 5, i * 7, i % 2 == 0, 0, )))
+
+    # a batch, with the same hash as single inserts
+    src = np.arange(num_rows // 2, num_rows)
+    start = table.extend(src, (src % 5).astype(np.int32), src * 7, src % 2 == 0, np.zeros(len(src), dtype=np.int32))
+    rows.extend(np.arange(start, start + len(src)))
+
+    assert rows.nbytes <= 32 * num_rows
+
+    for i in range(num_rows):
+        assert rows.find(( i, i % 5, i * 7, i % 2 == 0, 0, )) == i
+
+    assert rows.find(( 1, 1, 7, False, 1, )) == -1
+
+    src = np.array([ 5, num_rows + 1, num_rows - 1, ])
+    found = rows.find_columns(src, (src % 5).astype(np.int32), src * 7, src % 2 == 0, np.zeros(3, dtype=np.int32))
+    assert list(found) == [ 5, -1, num_rows - 1 ]
+
+    # removed slots keep the probe sequences intact
+    for i in range(0, num_rows, 2):
+        rows.remove(i)
+        table.discard(i)
+
+    assert rows.find(( 0, 0, 0, True, 0, )) == -1
+    assert all(rows.find(( i, i % 5, i * 7, False, 0, )) == i for i in range(1, num_rows, 2))
+
+    table.compact()
+    rows.rebuild()
+    assert rows.find(( 3, 3, 21, False, 0, )) == 1
+
+
+def test_permutation_index(tmp_path):
+    table = TripleTable()
+
+    for i in range(100):
+        table.append(( i % 10, i % 3, i, False, 0, ))
+
+    perms = PermutationIndex(table)
+    assert sorted(perms.select(4, None, None)) == list(range(4, 100, 10))
+    assert sorted(perms.select(None, 2, ( 5, False, ))) == [ 5 ]
+    assert sorted(perms.select(4, None, ( 14, False, ))) == [ 14 ]
+
+    # rows appended since the sort get scanned in the tail
+    table.append(( 4, 1, 200, False, 0, ))
+    assert sorted(perms.select(4, 1, None)) == [ 4, 34, 64, 94, 100 ]
+
+    perms.save(tmp_path)
+    loaded = PermutationIndex.load(table, tmp_path)
+    assert loaded.nbytes == 0
+    assert sorted(loaded.select(None, None, ( 200, False, ))) == [ 100 ]
+
+
+def test_permutation_index_concurrent_sort(monkeypatch):
+    table = TripleTable()
+
+    for i in range(100):
+        table.append(( i % 10, i % 3, i, False, 0, ))
+
+    perms = PermutationIndex(table)
+    sorts = []
+    lexsort = np.lexsort
+
+    def counting_lexsort (keys):
+        sorts.append(threading.get_ident())
+        return lexsort(keys)
+
+    monkeypatch.setattr(np, "lexsort", counting_lexsort)
+
+    # readers which find the permutations missing at once sort them
+    # only once, then all see the same result
+    barrier = threading.Barrier(8)
+    results = []
+
+    def reader ():
+        barrier.wait()
+        results.append(sorted(perms.select(4, None, None)))
+
+    threads = [ threading.Thread(target=reader) for _ in range(8) ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(sorts) == len(PermutationIndex.ORDERS)
+    assert results == [ list(range(4, 100, 10)) ] * 8
+
+
+def test_pack_key():
+    for _tuple in [
+        ( 0, 0, 0, False, 0, ),
+        ( 1, 2, 3, True, 4, ),
+        ( 2**40 - 1, 2**24 - 1, 2**40 - 1, True, 2**23 - 1, ),
+    ]:
+        key = TripleTable.pack_key(_tuple)
+        assert len(key) == 16
+        assert TripleTable.unpack_key(key) == _tuple
+
+        columns = [ np.array([ value ]) for value in _tuple ]
+        words = TripleTable.pack_columns(*columns)
+        assert words.tobytes() == key
+
+    with pytest.raises(ValueError):
+        TripleTable.pack_key(( 2**40, 0, 0, False, 0, ))
+
+
+def test_literal_table():
+    literals = LiteralTable()
+    xsd = rdflib.XSD
+
+    true_id = literals.get_id(rdflib.Literal("true", datatype=xsd.boolean))
+    assert literals.get_id(rdflib.Literal("true", datatype=xsd.boolean)) == true_id
+    assert literals.get_id(rdflib.Literal("true")) != true_id
+    assert literals.get_id(rdflib.Literal("true", lang="en")) != true_id
+    assert literals.get_id(rdflib.Literal("false", datatype=xsd.boolean), create=False) == -1
+
+    assert len(literals) == 3
+    assert literals.get_parts(true_id) == ( "true", str(xsd.boolean), None, )
+    assert literals.get_term(true_id) == rdflib.Literal("true", datatype=xsd.boolean)
+
+    with pytest.raises(IndexError):
+        literals.get_term(3)
+
+
+def test_literal_round_trip(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+    xsd = rdflib.XSD
+
+    triples = [
+        ( EX.a, EX.flag, rdflib.Literal("true", datatype=xsd.boolean), ),
+        ( EX.b, EX.flag, rdflib.Literal("true", datatype=xsd.boolean), ),
+        ( EX.a, EX.label, rdflib.Literal("chat", lang="fr"), ),
+        ( EX.a, EX.label, rdflib.Literal("chat"), ),
+        ( EX.a, EX.age, rdflib.Literal(42), ),
+    ]
+
+    for triple in triples:
+        store_graph.add(triple)
+
+    assert set(store_graph) == set(triples)
+    assert len(lpg._terms.literals) == 4
+
+    for _, _, o in store_graph.triples(( EX.a, EX.label, None, )):
+        assert (o.language, o.datatype) in [ ( "fr", None, ), ( None, None, ) ]
+
+    assert set(store_graph.subjects(EX.flag, rdflib.Literal("true", datatype=xsd.boolean))) == { EX.a, EX.b }
+    assert set(store_graph.subjects(EX.flag, rdflib.Literal("true"))) == set()
+
+
+def test_node_rel_ids(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+
+    node_id = lpg.get_node_id("http://example.org/a")
+    rel_id = lpg.get_rel_id("http://example.org/p")
+
+    assert lpg.get_node_id("http://example.org/a") == node_id
+    assert lpg.get_node_name(node_id) == "http://example.org/a"
+    assert lpg.get_rel_name(rel_id) == "http://example.org/p"
+
+
+EX = rdflib.Namespace("http://example.org/")
+
+TRIPLES = [
+    ( EX.a, EX.knows, EX.b, ),
+    ( EX.a, EX.knows, EX.c, ),
+    ( EX.b, EX.knows, EX.c, ),
+    ( EX.a, EX.name, rdflib.Literal("Alice"), ),
+    ( EX.c, EX.name, rdflib.Literal("Carol"), ),
+]
+
+
+@pytest.mark.parametrize("indexed", [ True, False ])
+def test_triples_patterns(indexed):
+    graph = rdflib.Graph(store=PropertyStore(indexed=indexed), identifier="test")
+
+    for triple in TRIPLES:
+        graph.add(triple)
+
+    for pattern in [
+        ( None, None, None, ),
+        ( EX.a, None, None, ),
+        ( EX.a, EX.knows, None, ),
+        ( EX.a, EX.knows, EX.c, ),
+        ( EX.a, None, EX.c, ),
+        ( None, EX.knows, None, ),
+        ( None, EX.knows, EX.c, ),
+        ( None, None, EX.c, ),
+        ( None, None, rdflib.Literal("Carol"), ),
+        ( EX.z, None, None, ),
+    ]:
+        expected = {
+            triple
+            for triple in TRIPLES
+            if all(term is None or term == triple[i] for i, term in enumerate(pattern))
+        }
+
+        assert set(graph.triples(pattern)) == expected
+
+
+def test_remove_pattern(store_graph):
+    for triple in TRIPLES:
+        store_graph.add(triple)
+
+    store_graph.remove(( EX.a, None, None, ))
+    assert len(store_graph) == 2
+    assert set(store_graph.triples(( EX.a, None, None, ))) == set()
+    assert set(store_graph.triples(( None, EX.knows, None, ))) == { TRIPLES[2] }
+
+
+def test_add_remove_dedup(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+
+    for triple in TRIPLES + TRIPLES:
+        store_graph.add(triple)
+
+    assert len(store_graph) == len(TRIPLES)
+
+    # removal moves the last row, which must still be found afterwards
+    store_graph.remove(TRIPLES[0])
+    assert len(store_graph) == len(TRIPLES) - 1
+    assert set(store_graph) == set(TRIPLES[1:])
+
+    for triple in TRIPLES[1:]:
+        _tuple = lpg.build_tuple(*triple, store_graph)
+        assert lpg._find(_tuple) >= 0
+
+    store_graph.remove(TRIPLES[-1])
+    store_graph.add(TRIPLES[0])
+    assert set(store_graph) == set(TRIPLES[:-1])
+
+
+def test_add_n(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+    lpg.digest = hashes.Hash(hashes.BLAKE2b(64))
+
+    graph = rdflib.Graph(store=PropertyStore(), identifier="test")
+    lpg_add = PropertyStore.get_lpg(graph)
+    lpg_add.digest = hashes.Hash(hashes.BLAKE2b(64))
+
+    # duplicates within the batch and against the store get dropped
+    store_graph.add(TRIPLES[0])
+    store_graph.addN((s, p, o, store_graph) for s, p, o in TRIPLES + TRIPLES)
+
+    for triple in TRIPLES + TRIPLES:
+        graph.add(triple)
+
+    assert len(store_graph) == len(TRIPLES)
+    assert set(store_graph) == set(TRIPLES)
+    assert set(store_graph.triples(( None, EX.knows, None, ))) == set(TRIPLES[:3])
+
+    store_graph.commit()
+    graph.commit()
+    assert lpg.digest.finalize() == lpg_add.digest.finalize()
+
+
+def test_transactions(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+    lpg.digest = hashes.Hash(hashes.BLAKE2b(64))
+
+    graph = rdflib.Graph(store=PropertyStore(), identifier="test")
+    lpg_single = PropertyStore.get_lpg(graph)
+    lpg_single.digest = hashes.Hash(hashes.BLAKE2b(64))
+
+    # outside of a transaction, changes get committed as they are made
+    store_graph.add(TRIPLES[0])
+    store_graph.add(TRIPLES[1])
+    store_graph.rollback()
+    assert set(store_graph) == set(TRIPLES[:2])
+    assert lpg._changes.undo is None
+
+    store_graph.remove(TRIPLES[1])
+    lpg.begin()
+
+    # a failed bulk load gets undone, along with the batches before it
+    def failing_quads():
+        for i in range(PropertyStore.BATCH_SIZE + 10):
+            yield EX[f"n{i}"], EX.knows, EX.a, store_graph
+
+        raise ValueError("parse error")
+
+    with pytest.raises(ValueError):
+        store_graph.addN(failing_quads())
+
+    assert len(store_graph) > 1
+    store_graph.rollback()
+    assert set(store_graph) == { TRIPLES[0] }
+    assert set(store_graph.subjects(EX.knows, None)) == { EX.a }
+
+    lpg.begin()
+    store_graph.remove(TRIPLES[0])
+    store_graph.addN((s, p, o, store_graph) for s, p, o in TRIPLES[1:])
+    store_graph.rollback()
+    assert set(store_graph) == { TRIPLES[0] }
+    assert lpg._find(lpg.build_tuple(*TRIPLES[0], store_graph)) >= 0
+
+    lpg.begin()
+    store_graph.addN((s, p, o, store_graph) for s, p, o in TRIPLES[1:])
+    store_graph.remove(TRIPLES[1])
+    store_graph.commit()
+    assert lpg._changes.undo is None
+
+    # only committed changes update the digest, regardless of batching
+    # or of transactions
+    graph.add(TRIPLES[0])
+    graph.add(TRIPLES[1])
+    graph.remove(TRIPLES[1])
+
+    for triple in TRIPLES[1:]:
+        graph.add(triple)
+
+    graph.remove(TRIPLES[1])
+    assert lpg.digest.finalize() == lpg_single.digest.finalize()
+
+
+def test_transactions_contexts():
+    ds = rdflib.Dataset(store=PropertyStore())
+    lpg = ds.store
+
+    g1 = ds.graph(EX.g1)
+    g1.add(TRIPLES[0])
+
+    lpg.begin()
+    ds.remove_graph(g1)
+    g2 = ds.graph(EX.g2)
+    g2.add(TRIPLES[1])
+    ds.rollback()
+
+    assert { g.identifier for g in lpg.contexts() } == { EX.g1 }
+    assert lpg.__len__(context=g1) == 1
+    assert lpg.__len__(context=g2) == 0
+
+
+def test_change_marks(store_graph):
+    lpg = PropertyStore.get_lpg(store_graph)
+    assert lpg.changes_since("save") is None
+
+    store_graph.add(TRIPLES[0])
+    store_graph.add(TRIPLES[1])
+    position = lpg.mark_changes("save")
+
+    # net changes across transactions, without the rolled back ones
+    store_graph.addN((s, p, o, store_graph) for s, p, o in TRIPLES[2:])
+    store_graph.remove(TRIPLES[0])
+
+    lpg.begin()
+    store_graph.remove(TRIPLES[3])
+    store_graph.add(TRIPLES[3])
+    store_graph.remove(TRIPLES[1])
+    store_graph.rollback()
+
+    new_position, added, removed = lpg.changes_since("save")
+    assert new_position > position
+    assert set(added) == set(TRIPLES[2:])
+    assert removed == [ TRIPLES[0] ]
+
+    # moving the only mark trims the log
+    lpg.mark_changes("save", new_position)
+    assert lpg.changes_since("save")[1:] == ( [], [], )
+    assert len(lpg._changes.changes) == 0
+
+    with pytest.raises(ValueError):
+        lpg.mark_changes("save", position)
+
+    lpg.unmark_changes("save")
+    assert lpg.changes_since("save") is None
+    assert lpg._changes.changes is None
+
+
+def test_contexts():
+    ds = rdflib.Dataset(store=PropertyStore())
+    lpg = ds.store
+
+    g1 = ds.graph(EX.g1)
+    g2 = ds.graph(EX.g2)
+
+    g1.add(TRIPLES[0])
+    g2.add(TRIPLES[0])
+    g2.addN((s, p, o, g2) for s, p, o in TRIPLES[1:])
+
+    assert len(g1) == 1
+    assert len(g2) == len(TRIPLES)
+    assert lpg.__len__(context=g2) == len(TRIPLES)
+    assert { g.identifier for g in ds.graphs() } >= { EX.g1, EX.g2 }
+    assert { g.identifier for g in lpg.contexts(TRIPLES[0]) } == { EX.g1, EX.g2 }
+    assert { g.identifier for g in lpg.contexts(TRIPLES[1]) } == { EX.g2 }
+
+    # a conjunctive query yields each triple once, with all its contexts
+    results = list(lpg.triples(TRIPLES[0], context=None))
+    assert len(results) == 1
+    assert { g.identifier for g in results[0][1] } == { EX.g1, EX.g2 }
+
+    assert { q[3] for q in ds.quads(( EX.a, EX.knows, EX.b, None, )) } == { EX.g1, EX.g2 }
+
+    g2.remove(TRIPLES[1])
+    assert len(g2) == len(TRIPLES) - 1
+
+    ds.remove_graph(g1)
+    assert EX.g1 not in { g.identifier for g in ds.graphs() }
+    assert { g.identifier for g in lpg.contexts(TRIPLES[0]) } == { EX.g2 }
+
+
+def test_load_rdf_batch():
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+
+    assert len(kg.rdf_graph()) == 1891
+    assert kg.get_ns_dict()["wtm"] == "http://purl.org/heals/food/"
+
+
+def test_kglab_store_query():
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.add(EX.a, EX.knows, EX.b)
+    kg.add(EX.b, EX.name, rdflib.Literal("Bob"))
+
+    sparql = """
+    SELECT ?name
+      WHERE {
+        <http://example.org/a> <http://example.org/knows> ?friend .
+        ?friend <http://example.org/name> ?name
+      }
+    """
+
+    rows = [ row.asdict() for row in kg.query(sparql) ]
+    assert rows == [ { "name": rdflib.Literal("Bob") } ]
+
+
+def test_store_persist(tmp_path):
+    path = tmp_path / "store"
+    graph = rdflib.Graph(store=PropertyStore(configuration=str(path)), identifier=EX.g)
+    graph.bind("ex", EX)
+
+    for triple in TRIPLES:
+        graph.add(triple)
+
+    graph.add(( EX.c, EX.label, rdflib.Literal("chat", lang="fr"), ))
+    graph.close(commit_pending_transaction=True)
+
+    lpg = PropertyStore(configuration=str(path))
+    reopened = rdflib.Graph(store=lpg, identifier=EX.g)
+
+    # the tuples get memory-mapped, and patterns resolve as range lookups
+    assert isinstance(lpg._index.table.src, np.memmap)
+    assert len(reopened) == len(TRIPLES) + 1
+    assert lpg.namespace("ex") == str(EX)
+    assert { g.identifier for g in lpg.contexts() } == { EX.g }
+    assert set(reopened.objects(EX.c, EX.label)) == { rdflib.Literal("chat", lang="fr") }
+
+    for pattern in [
+        ( EX.a, None, None, ),
+        ( EX.a, EX.knows, None, ),
+        ( EX.a, None, EX.c, ),
+        ( None, EX.knows, EX.c, ),
+        ( None, None, rdflib.Literal("Carol"), ),
+        ( EX.z, None, None, ),
+    ]:
+        expected = {
+            triple
+            for triple in TRIPLES
+            if all(term is None or term == triple[i] for i, term in enumerate(pattern))
+        }
+
+        assert set(reopened.triples(pattern)) == expected
+
+    # the first modification copies the tuples into memory
+    reopened.remove(TRIPLES[0])
+    reopened.add(( EX.d, EX.knows, EX.a, ))
+    assert not isinstance(lpg._index.table.src, np.memmap)
+    assert set(reopened.triples(( None, EX.knows, None, ))) == { TRIPLES[1], TRIPLES[2], ( EX.d, EX.knows, EX.a, ) }
+    reopened.commit()
+
+    graph = rdflib.Graph(store=PropertyStore(configuration=str(path)), identifier=EX.g)
+    assert set(graph.subjects(EX.knows, None)) == { EX.a, EX.b, EX.d }
+    assert len(graph) == len(TRIPLES) + 1
+
+    assert rdflib.Graph(store="kglab").open(str(tmp_path / "missing")) == rdflib.store.NO_STORE
+
+    PropertyStore.get_lpg(graph).destroy(str(path))
+    assert not path.exists()
+
+
+def test_store_load_close_reopen(tmp_path):
+    path = tmp_path / "store"
+
+    # changes made outside of a transaction survive closing the store
+    graph = rdflib.Graph(store="kglab", identifier=EX.g)
+    graph.open(str(path), create=True)
+    kg = kglab.KnowledgeGraph(import_graph=graph)
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+    assert len(kg.rdf_graph()) == 1891
+
+    graph.close()
+    assert len(graph) == 1891
+    assert PropertyStore.get_lpg(graph)._changes.undo is None
+
+    reopened = rdflib.Graph(store="kglab", identifier=EX.g)
+    reopened.open(str(path))
+    assert isomorphic(reopened, rdflib.Graph().parse(DAT_FILES_DIR / "tmp.ttl"))
+
+    # only an open transaction gets rolled back on close
+    lpg = PropertyStore.get_lpg(reopened)
+    lpg.begin()
+    reopened.add(( EX.a, EX.knows, EX.b, ))
+    reopened.close()
+    assert len(reopened) == 1891
+
+    reopened = rdflib.Graph(store="kglab", identifier=EX.g)
+    reopened.open(str(path))
+    assert len(reopened) == 1891
+
+
+def test_read_write_lock():
+    lock = ReadWriteLock()
+
+    # both kinds of lock are reentrant, and a writer may also read
+    with lock.write():
+        with lock.write():
+            with lock.read():
+                pass
+
+    with lock.read():
+        with lock.read():
+            with pytest.raises(RuntimeError):
+                lock.acquire_write()
+
+    # a writer waits for the readers to finish
+    events = []
+    lock.acquire_read()
+
+    def write():
+        with lock.write():
+            events.append("write")
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    thread.join(timeout=0.2)
+    events.append("read")
+
+    lock.release_read()
+    thread.join()
+    assert events == [ "read", "write" ]
+
+
+def test_query_releases_lock():
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.rdf_graph().addN((EX[f"n{i}"], EX.knows, EX[f"n{i + 1}"], kg.rdf_graph()) for i in range(10))
+
+    sparql = "SELECT ?s ?o WHERE { ?s <http://example.org/knows> ?o }"
+    rows = kg.query(sparql)
+    next(rows)
+
+    # while the caller holds a partly consumed result set, writers from
+    # other threads can proceed, as can writes from the same thread
+    thread = threading.Thread(target=kg.add, args=( EX.a, EX.knows, EX.b, ))
+    thread.start()
+    thread.join(timeout=5.0)
+    assert not thread.is_alive()
+
+    kg.add(EX.b, EX.knows, EX.c)
+    assert len(list(rows)) >= 9
+    assert len(list(kg.query(sparql))) == 12
+
+
+def test_concurrent_readers():
+    kg = kglab.KnowledgeGraph(store="kglab")
+    lpg = PropertyStore.get_lpg(kg.rdf_graph())
+    assert kg.lock is lpg.lock
+
+    num_batches = 20
+    batch_size = 500
+    errors = []
+    done = threading.Event()
+
+    def write():
+        for i in range(num_batches):
+            lpg.addN(
+                (EX[f"n{j}"], EX.knows, EX[f"n{j + 1}"], None)
+                for j in range(i * batch_size, (i + 1) * batch_size)
+            )
+
+        done.set()
+
+    def read():
+        try:
+            while not done.is_set():
+                # each batch gets added atomically
+                assert len(list(lpg.triples(( None, EX.knows, None, )))) % batch_size == 0
+        except Exception as e:  # pylint: disable=W0703
+            errors.append(e)
+
+    threads = [ threading.Thread(target=read) for _ in range(4) ] + [ threading.Thread(target=write) ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(lpg) == num_batches * batch_size
@@ -1,4 +1,6 @@
 import pytest
+import rdflib
+from rdflib.compare import isomorphic
 import responses
 
 import kglab
@@ -47,6 +49,36 @@ def test_load_rdf(kg_test_data):
     #assert False, "Node and edges count is different from load_jsonld"
 
 
+@pytest.mark.parametrize("format", [ "ttl", "n3", "nt", "xml", "nquads", "trig", "trix" ])
+@pytest.mark.parametrize("store", [ None, "kglab" ])
+def test_load_rdf_formats(tmp_path, format, store):
+    graph = rdflib.Graph().parse(DAT_FILES_DIR / "tmp.ttl")
+    path = tmp_path / f"recipes.{format}"
+
+    # the quad formats name the default graph, so unname it to load
+    # into the default graph
+    if format in ( "nquads", "trig", "trix", ):
+        dataset = rdflib.Dataset()
+        dataset.addN((s, p, o, dataset.default_context) for s, p, o in graph)
+        data = dataset.serialize(format=format)
+        data = data.replace(" <urn:x-rdflib:default>", "").replace("<uri>urn:x-rdflib:default</uri>", "")
+        path.write_text(data, encoding="utf-8")
+    else:
+        graph.serialize(path, format=format)
+
+    kg = kglab.KnowledgeGraph(store=store)
+    kg.load_rdf(path, format=format)
+    loaded = kg.rdf_graph()
+
+    # TriX parses an unnamed graph into a new context of the store
+    if format == "trix":
+        loaded = rdflib.Graph()
+        loaded += ( triple for triple, _ in kg.rdf_graph().store.triples(( None, None, None, ), context=None) )
+
+    assert len(loaded) == 1891
+    assert isomorphic(loaded, graph)
+
+
 def test_load_jsonld(kg_test_data):
     kg_test_data.load_jsonld(DAT_FILES_DIR / "tmp.jsonld")
 
@@ -132,6 +164,55 @@ def test_load_csv(kg_test_data):
         assert measure.get_edge_count() == query_df.values[0][0]
 
 
+@pytest.mark.parametrize("chunk_size", [ 1, 2, 100 ])
+def test_load_csv_chunked(tmp_path, chunk_size):
+    import io
+
+    path = tmp_path / "recipes.csv"
+    path.write_text(
+        "id,name,minutes,ingredients\n"
+        "164636,\"1 1 1 tempura batter\",5,egg\n"
+        "144841,\"pound cake, \"\"easy\"\"\",,flour\n"
+        "189437,40 second omelet,25,\n",
+        encoding="utf-8",
+    )
+
+    wtm = "http://purl.org/heals/food/"
+    mapping = {
+        "name": "http://www.w3.org/2004/02/skos/core#definition",
+        "minutes": { "predicate": wtm + "hasCookTime", "datatype": "http://www.w3.org/2001/XMLSchema#integer" },
+        "ingredients": { "predicate": wtm + "hasIngredient", "template": "http://purl.org/heals/ingredient/{ingredients}" },
+    }
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_csv(path, mapping=mapping, subject="https://www.food.com/recipe/{id}", chunk_size=chunk_size)
+
+    # empty cells do not produce triples
+    assert len(kg.rdf_graph()) == 3 + 2 + 2
+
+    recipe = rdflib.URIRef("https://www.food.com/recipe/144841")
+    assert kg.rdf_graph().value(recipe, rdflib.SKOS.definition) == rdflib.Literal('pound cake, "easy"')
+    assert kg.rdf_graph().value(recipe, rdflib.URIRef(wtm + "hasIngredient")) == rdflib.URIRef("http://purl.org/heals/ingredient/flour")
+
+    recipe = rdflib.URIRef("https://www.food.com/recipe/189437")
+    assert kg.rdf_graph().value(recipe, rdflib.URIRef(wtm + "hasCookTime")).toPython() == 25
+
+    # template values get percent-encoded
+    kg = kglab.KnowledgeGraph()
+    kg.load_csv(io.StringIO(path.read_text(encoding="utf-8")), mapping={ "id": { "predicate": wtm + "x", "template": "http://example.org/{name}" } })
+    assert rdflib.URIRef("http://example.org/1%201%201%20tempura%20batter") in set(kg.rdf_graph().objects())
+
+    # without a subject template, each row becomes a blank node
+    assert len(set(kg.rdf_graph().subjects())) == 3
+    assert all(isinstance(node, rdflib.BNode) for node in kg.rdf_graph().subjects())
+
+    with pytest.raises(ValueError):
+        kg.load_csv(path, mapping={ "servings": wtm + "hasServings" })
+
+    with pytest.raises(ValueError):
+        kg.load_csv(path, mapping=mapping, subject="https://www.food.com/recipe/{recipe_id}")
+
+
 def test_import_roam(kg_test_data):
     """
 Coverage:
@@ -157,4 +238,632 @@ Coverage:
         # ic(node_count)
         # ic(edge_count)
         assert node_count == 46
-        assert edge_count == 217
\ No newline at end of file
+        assert edge_count == 217
+
+
+def test_import_roam_streaming(monkeypatch):
+    import io
+    import sys
+
+    # read in tiny chunks, so that each page spans many reads
+    monkeypatch.setattr(kglab.KnowledgeGraph, "_ROAM_READ_SIZE", 64)
+
+    depth = 100
+    block = '{{"string": "block {0}", "uid": "b{0}", "edit-time": 1620354514884, ":edit/user": {{":user/uid": "u"}}'
+    page = "".join(block.format(i) + ', "children": [' for i in range(depth)) + block.format(depth) + "}" + "]}" * depth
+    export = "[ " + page + " , " + page.replace('"b', '"c') + " ]"
+
+    kg = kglab.KnowledgeGraph()
+    uid_list = kg.import_roam(io.BytesIO(export.encode("utf-8")))
+
+    assert uid_list == [ "b0", "c0" ]
+    assert len(kg.rdf_graph()) == 2 * (4 * (depth + 1) + depth)
+
+    with pytest.raises(ValueError):
+        kg.import_roam(io.StringIO(export[:-2]))
+
+    # the traversal does not recurse, so it can walk blocks nested
+    # deeper than the recursion limit
+    depth = sys.getrecursionlimit() + 100
+    obj = { "string": "leaf", "uid": "leaf", "edit-time": 0, ":edit/user": { ":user/uid": "u" } }
+
+    for i in range(depth):
+        obj = { "string": f"block {i}", "uid": f"d{i}", "edit-time": 0, ":edit/user": { ":user/uid": "u" }, "children": [ obj ] }
+
+    kg = kglab.KnowledgeGraph()
+    kg.add_ns("roam", "https://roamresearch.com/ns/")
+    assert kg._walk_roam_graph(obj, kg.rdf_graph(), kg._roam_terms()) == f"d{depth - 1}"
+    assert len(kg.rdf_graph()) == 4 * (depth + 1) + depth
+
+
+@pytest.mark.parametrize("schema_version", [ 1, 2 ])
+@pytest.mark.parametrize("store", [ None, "kglab" ])
+def test_load_parquet_terms(tmp_path, store, schema_version):
+    ex = rdflib.Namespace("http://example.org/")
+    kg = kglab.KnowledgeGraph()
+    node = rdflib.BNode()
+
+    for triple in [
+        ( ex.a, ex.knows, ex.b, ),
+        ( ex.a, ex.knows, node, ),
+        ( node, ex.name, rdflib.Literal("Bob"), ),
+        ( ex.a, ex.label, rdflib.Literal("chat", lang="fr"), ),
+        ( ex.a, ex.age, rdflib.Literal(42), ),
+        ( ex.a, ex.note, rdflib.Literal('a "quoted"\nmultiline \\ note'), ),
+        ( ex.a, ex.title, rdflib.Literal("étoile"), ),
+    ]:
+        kg.add(*triple)
+
+    path = tmp_path / "terms.parquet"
+    kg.save_parquet(path, schema_version=schema_version)
+
+    kg_load = kglab.KnowledgeGraph(store=store)
+    kg_load.load_parquet(path)
+
+    assert isomorphic(kg_load.rdf_graph(), kg.rdf_graph())
+
+def test_save_parquet_row_groups(tmp_path):
+    import pyarrow.parquet as pq
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+    num_triples = len(kg.rdf_graph())
+
+    path = tmp_path / "recipes.parquet"
+    kg.save_parquet(path, row_group_size=500)
+
+    meta = pq.ParquetFile(path).metadata
+    assert meta.num_rows == num_triples
+    assert meta.num_row_groups == -(-num_triples // 500)
+
+    schema = pq.read_schema(path)
+    assert schema.equals(pq.read_schema(DAT_FILES_DIR / "tmp.parquet"))
+
+    kg_load = kglab.KnowledgeGraph()
+    kg_load.load_parquet(path)
+    assert isomorphic(kg_load.rdf_graph(), kg.rdf_graph())
+
+
+def test_save_parquet_v2(tmp_path, kg_test_data):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    kg_test_data.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+
+    path = tmp_path / "recipes.parquet"
+    kg_test_data.save_parquet(path, schema_version=2)
+
+    schema = pq.read_schema(path)
+    assert "object_kind" in schema.names
+    assert pa.types.is_dictionary(schema.field("predicate").type)
+
+    # the v2 schema gets detected on load
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path)
+    assert isomorphic(kg.rdf_graph(), kg_test_data.rdf_graph())
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "bad.parquet", schema_version=3)
+
+
+@pytest.mark.parametrize("schema_version", [ 1, 2 ])
+@pytest.mark.parametrize("partition_by", [ "predicate", "namespace" ])
+def test_save_parquet_partitioned(tmp_path, kg_test_data, schema_version, partition_by):
+    kg_test_data.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+    graph = kg_test_data.rdf_graph()
+
+    path = tmp_path / "recipes"
+    kg_test_data.save_parquet(path, schema_version=schema_version, partition_by=partition_by)
+    assert len(list(path.iterdir())) > 1
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path)
+    assert isomorphic(kg.rdf_graph(), graph)
+
+    # filters get pushed down to the dataset scan
+    pred = rdflib.URIRef("http://purl.org/heals/food/hasIngredient")
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path, predicates=[ pred ])
+    assert len(kg.rdf_graph()) == len(list(graph.triples(( None, pred, None, ))))
+    assert set(kg.rdf_graph().predicates()) == { pred }
+
+    subj = next(iter(graph.subjects()))
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path, predicates=[ pred ], subjects_prefix=str(subj))
+    assert set(kg.rdf_graph()) == {
+        triple
+        for triple in graph.triples(( None, pred, None, ))
+        if str(triple[0]).startswith(str(subj))
+    }
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "bad", partition_by="object")
+
+
+@pytest.mark.parametrize("schema_version", [ 1, 2 ])
+def test_load_parquet_filter_file_object(tmp_path, kg_test_data, schema_version):
+    kg_test_data.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+    graph = kg_test_data.rdf_graph()
+
+    path = tmp_path / "recipes.parquet"
+    kg_test_data.save_parquet(path, schema_version=schema_version)
+
+    # filters also apply to a file-like object, which is not a dataset
+    pred = rdflib.URIRef("http://purl.org/heals/food/hasIngredient")
+    subj = next(iter(graph.subjects(pred, None)))
+
+    with open(path, "rb") as f:
+        kg = kglab.KnowledgeGraph()
+        kg.load_parquet(f, predicates=[ pred ])
+
+    assert set(kg.rdf_graph()) == set(graph.triples(( None, pred, None, )))
+
+    with open(path, "rb") as f:
+        kg = kglab.KnowledgeGraph()
+        kg.load_parquet(f, predicates=[ pred ], subjects_prefix=str(subj))
+
+    assert set(kg.rdf_graph()) == {
+        triple
+        for triple in graph.triples(( None, pred, None, ))
+        if str(triple[0]).startswith(str(subj))
+    }
+
+
+@pytest.mark.parametrize("workers", [ 1, 2 ])
+def test_load_ntriples(tmp_path, kg_test_data, workers):
+    kg_test_data.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+
+    node = rdflib.BNode()
+    kg_test_data.add(node, kg_test_data.get_ns("nom").note, rdflib.Literal('a "quoted"\nnote', lang="en-US"))
+    kg_test_data.add(node, kg_test_data.get_ns("nom").title, rdflib.Literal("étoile"))
+
+    path = tmp_path / "recipes.nt"
+    kg_test_data.save_rdf(path, format="nt")
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_ntriples(path, workers=workers, chunk_size=4096)
+    assert isomorphic(kg.rdf_graph(), kg_test_data.rdf_graph())
+
+    bad_path = tmp_path / "bad.nt"
+    bad_path.write_text("<http://example.org/a> <http://example.org/b> .\n")
+
+    with pytest.raises(TypeError):
+        kg.load_ntriples(bad_path, workers=workers)
+
+    # error offsets are relative to the file, also when parsed as a stream
+    good = "<http://example.org/a> <http://example.org/b> <http://example.org/c> .\n"
+    bad_path.write_text(good * 200 + "<http://example.org/a> .\n")
+    offset = f"byte offset {len(good) * 200}:"
+
+    with pytest.raises(TypeError, match=offset):
+        kg.load_ntriples(bad_path, workers=workers, chunk_size=1024)
+
+    with open(bad_path, "rb") as f:
+        with pytest.raises(TypeError, match=offset):
+            kg.load_ntriples(f, chunk_size=1024)
+
+
+@pytest.mark.parametrize("method, file_name", [
+    ( "load_rdf", "tmp.ttl", ),
+    ( "load_jsonld", "tmp.jsonld", ),
+    ( "load_parquet", "tmp.parquet", ),
+])
+def test_load_cached(tmp_path, method, file_name):
+    cache = kglab.ParseCache(tmp_path / "cache")
+    path = tmp_path / file_name
+    path.write_bytes((DAT_FILES_DIR / file_name).read_bytes())
+
+    kg_ref = kglab.KnowledgeGraph()
+    getattr(kg_ref, method)(path)
+
+    for hits in range(2):
+        kg = kglab.KnowledgeGraph()
+        getattr(kg, method)(path, cache=cache)
+        assert isomorphic(kg.rdf_graph(), kg_ref.rdf_graph())
+        assert (cache.hits, cache.misses) == (hits, 1)
+
+    # a changed file gets parsed again
+    kg_ref.add(rdflib.URIRef("http://example.org/a"), rdflib.RDF.type, rdflib.URIRef("http://example.org/B"))
+
+    if method == "load_rdf":
+        kg_ref.save_rdf(path, format="ttl")
+    elif method == "load_jsonld":
+        kg_ref.save_jsonld(path)
+    else:
+        kg_ref.save_parquet(path)
+
+    kg = kglab.KnowledgeGraph()
+    getattr(kg, method)(path, cache=cache)
+    assert isomorphic(kg.rdf_graph(), kg_ref.rdf_graph())
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_parse_cache_eviction(tmp_path):
+    cache = kglab.ParseCache(tmp_path / "cache", max_bytes=1)
+    kg = kglab.KnowledgeGraph()
+
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl", cache=cache)
+    kg.load_parquet(DAT_FILES_DIR / "tmp.parquet", cache=cache)
+
+    assert cache.evictions == 2
+    assert list((tmp_path / "cache").iterdir()) == []
+
+
+@pytest.mark.parametrize("suffix", [ ".gz", ".bz2", ".xz", ".zst", "" ])
+def test_load_compressed(tmp_path, suffix):
+    import bz2
+    import gzip
+    import lzma
+    import pyarrow as pa
+
+    kg_ref = kglab.KnowledgeGraph().load_rdf(DAT_FILES_DIR / "tmp.ttl")
+    kg_ref.save_rdf(tmp_path / "tmp.nt", format="nt")
+
+    # without a suffix, the compression gets detected from magic bytes
+    open_compressed = {
+        ".gz": gzip.open,
+        ".bz2": bz2.open,
+        ".xz": lzma.open,
+        ".zst": lambda path, mode: pa.CompressedOutputStream(str(path), "zstd"),
+        "": gzip.open,
+    }[suffix]
+
+    for src in [ DAT_FILES_DIR / "tmp.ttl", DAT_FILES_DIR / "tmp.jsonld", tmp_path / "tmp.nt" ]:
+        path = tmp_path / f"packed{src.suffix}{suffix}"
+
+        with open_compressed(path, "wb") as f:
+            f.write(src.read_bytes())
+
+        kg = kglab.KnowledgeGraph()
+
+        if src.suffix == ".jsonld":
+            kg.load_jsonld(path)
+            assert isomorphic(kg.rdf_graph(), kglab.KnowledgeGraph().load_jsonld(src).rdf_graph())
+        elif src.suffix == ".nt":
+            kg.load_ntriples(path)
+            assert isomorphic(kg.rdf_graph(), kg_ref.rdf_graph())
+        else:
+            kg.load_rdf(path)
+            assert isomorphic(kg.rdf_graph(), kg_ref.rdf_graph())
+
+    # compressed files matched by a glob
+    kg = kglab.KnowledgeGraph()
+    kg.load_rdf(str(tmp_path / f"packed.ttl{suffix}*"))
+    assert isomorphic(kg.rdf_graph(), kg_ref.rdf_graph())
+
+
+def test_load_compressed_closed(tmp_path, monkeypatch):
+    import gzip
+
+    streams = []
+    open_decompressed = kglab.KnowledgeGraph._open_decompressed
+
+    def record (path):
+        stream = open_decompressed(path)
+        streams.append(stream)
+        return stream
+
+    monkeypatch.setattr(kglab.KnowledgeGraph, "_open_decompressed", staticmethod(record))
+
+    for src, method in [
+        ( DAT_FILES_DIR / "tmp.jsonld", "load_jsonld", ),
+        ( DAT_FILES_DIR / "roam.json", "import_roam", ),
+    ]:
+        path = tmp_path / f"{src.name}.gz"
+
+        with gzip.open(path, "wb") as f:
+            f.write(src.read_bytes())
+
+        getattr(kglab.KnowledgeGraph(), method)(path)
+
+        # the traceback of a parse error keeps the reader referenced,
+        # so the stream must get closed explicitly
+        with gzip.open(path, "wb") as f:
+            f.write(src.read_bytes()[:-10])
+
+        with pytest.raises(ValueError) as excinfo:
+            getattr(kglab.KnowledgeGraph(), method)(path)
+
+        assert excinfo.tb is not None
+        assert all(stream.closed for stream in streams)
+
+    assert len(streams) == 4
+
+
+@pytest.mark.parametrize("compression", [ None, "zstd" ])
+@pytest.mark.parametrize("memory_map", [ True, False ])
+def test_save_arrow(tmp_path, kg_test_data, compression, memory_map):
+    import pyarrow as pa
+
+    kg_test_data.load_parquet(DAT_FILES_DIR / "tmp.parquet")
+
+    path = tmp_path / "recipes.arrow"
+    kg_test_data.save_arrow(path, compression=compression, row_group_size=500)
+
+    with pa.memory_map(str(path)) as source:
+        reader = pa.ipc.open_file(source)
+        assert reader.num_record_batches == -(-len(kg_test_data.rdf_graph()) // 500)
+        assert pa.types.is_dictionary(reader.schema.field("subject").type)
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_arrow(path, memory_map=memory_map)
+    assert isomorphic(kg.rdf_graph(), kg_test_data.rdf_graph())
+    assert kg.get_ns("wtm") == kg_test_data.get_ns("wtm")
+
+
+RML_MAPPING: str = """
+@prefix rr: <http://www.w3.org/ns/r2rml#> .
+@prefix rml: <http://semweb.mmlab.be/ns/rml#> .
+@prefix ql: <http://semweb.mmlab.be/ns/ql#> .
+@prefix wtm: <http://purl.org/heals/food/> .
+@prefix skos: <http://www.w3.org/2004/02/skos/core#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+<#Recipe> a rr:TriplesMap ;
+    rml:logicalSource [ rml:source "{source}" ; rml:referenceFormulation ql:CSV ] ;
+    rr:subjectMap [ rr:template "https://www.food.com/recipe/{{id}}" ; rr:class wtm:Recipe ] ;
+    rr:predicateObjectMap [ rr:predicate skos:definition ; rr:objectMap [ rml:reference "name" ; rr:language "en" ] ] ;
+    rr:predicateObjectMap [ rr:predicate wtm:hasCookTime ; rr:objectMap [ rml:reference "minutes" ; rr:datatype xsd:integer ] ] .
+"""
+
+
+@pytest.mark.parametrize("workers", [ None, 1, 2 ])
+def test_materialize(tmp_path, workers):
+    import morph_kgc
+
+    sections = []
+
+    for name, first in ( ( "Recipes", 0, ), ( "MoreRecipes", 100, ), ):
+        source = tmp_path / f"{name}.csv"
+        source.write_text(
+            "id,name,minutes\n" + "".join(f"{i},\"recipe, {i}\",{i % 60}\n" for i in range(first, first + 100)),
+            encoding="utf-8",
+        )
+
+        mapping = tmp_path / f"{name}.rml.ttl"
+        mapping.write_text(RML_MAPPING.format(source=source), encoding="utf-8")
+        sections.append(f"[{name}]\nmappings={mapping}\n")
+
+    config = "[CONFIGURATION]\nlogging_level=WARNING\n" + "".join(sections)
+
+    kg = kglab.KnowledgeGraph()
+    kg.materialize(config, workers=workers)
+    graph = morph_kgc.materialize(config)
+    assert len(graph) > 0
+    assert isomorphic(kg.rdf_graph(), graph)
+
+    # merge into an existing graph, from a config file with one section
+    config_path = tmp_path / "config.ini"
+    config_path.write_text(sections[0], encoding="utf-8")
+
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+    num_triples = len(kg.rdf_graph())
+    kg.materialize(str(config_path), workers=workers)
+    assert len(kg.rdf_graph()) == num_triples + len(morph_kgc.materialize(str(config_path)))
+
+    # statements which name a graph get merged too
+    data = '<http://ex.org/a> <http://ex.org/p> "x" <http://ex.org/g> .\n<http://ex.org/a> <http://ex.org/p> <http://ex.org/b> .\n'
+    kg = kglab.KnowledgeGraph()
+    kg._merge_source(( None, data, ), {})
+    assert len(kg.rdf_graph()) == 2
+
+
+def test_split_morph_config():
+    config = """
+[DEFAULT]
+main_dir=/data
+
+[CONFIGURATION]
+logging_level=WARNING
+
+[A]
+mappings=${main_dir}/a.rml.ttl
+
+[B]
+mappings=${main_dir}/b.rml.ttl
+main_dir=/other
+"""
+
+    sources = kglab.KnowledgeGraph._split_morph_config(config)
+    assert [ source.sections() for source in sources ] == [ [ "CONFIGURATION", "A" ], [ "CONFIGURATION", "B" ] ]
+
+    # interpolation gets left to morph-kgc
+    text = kglab.KnowledgeGraph._morph_config_text(sources[1], 1)
+    assert "mappings = ${main_dir}/b.rml.ttl" in text
+    assert "main_dir = /data" in text
+    assert "main_dir = /other" in text
+    assert "number_of_processes = 1" in text
+
+
+@pytest.mark.parametrize("block_size", [ 1, 3, 16 ])
+@pytest.mark.parametrize("store", [ None, "kglab" ])
+def test_save_hdt(tmp_path, kg_test_data, monkeypatch, block_size, store):
+    kg_test_data.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+
+    node = rdflib.BNode()
+    ex = rdflib.Namespace("http://example.org/")
+    kg_test_data.add(node, ex.note, rdflib.Literal('a "quoted"\nnote é', lang="en"))
+    kg_test_data.add(ex.a, ex.knows, node)
+    kg_test_data.add(ex.a, ex.age, rdflib.Literal(42))
+
+    path = tmp_path / "recipes.hdt"
+    kg_test_data.save_hdt(path, block_size=block_size)
+
+    kg = kglab.KnowledgeGraph(store=store)
+    kg.load_hdt(path)
+    assert isomorphic(kg.rdf_graph(), kg_test_data.rdf_graph())
+    assert kg.get_ns("wtm") == kg_test_data.get_ns("wtm")
+
+    # answer triple patterns from the file, in small batches
+    monkeypatch.setattr(kglab.HDTFile, "BATCH_SIZE", 7)
+    graph = kg_test_data.rdf_graph()
+
+    with kglab.HDTFile(path) as hdt:
+        assert len(hdt) == len(graph)
+        assert len(set(hdt)) == len(graph)
+
+        for s, p, o in list(graph)[::200]:
+            for pattern in [
+                ( s, None, None, ),
+                ( None, p, None, ),
+                ( None, None, o, ),
+                ( s, p, None, ),
+                ( s, None, o, ),
+                ( None, p, o, ),
+                ( s, p, o, ),
+            ]:
+                assert set(hdt.triples(pattern)) == set(graph.triples(pattern))
+
+        assert ( ex.a, ex.age, rdflib.Literal(42), ) in hdt
+        assert ( ex.a, ex.age, rdflib.Literal(43), ) not in hdt
+        assert list(hdt.triples(( ex.missing, None, None, ))) == []
+
+        # blank nodes keep their labels within the file
+        [ ( bnode, _, note, ) ] = hdt.triples(( None, ex.note, None, ))
+        assert note == rdflib.Literal('a "quoted"\nnote é', lang="en")
+        assert list(hdt.triples(( ex.a, ex.knows, None, ))) == [ ( ex.a, ex.knows, bnode, ) ]
+
+        # add the triples to any RDF graph
+        target = rdflib.Graph()
+        hdt.add_to(target)
+        assert isomorphic(target, graph)
+
+
+def test_save_hdt_empty(tmp_path):
+    path = tmp_path / "empty.hdt"
+    kglab.KnowledgeGraph().save_hdt(path)
+
+    with kglab.HDTFile(path) as hdt:
+        assert len(hdt) == 0
+        assert list(hdt) == []
+
+    with pytest.raises(ValueError):
+        kglab.HDTFile(DAT_FILES_DIR / "tmp.parquet")
+
+
+@pytest.mark.parametrize("schema_version", [ 1, 2 ])
+def test_save_parquet_append(tmp_path, schema_version):
+    import pyarrow.parquet as pq
+
+    ex = rdflib.Namespace("http://example.org/")
+    path = tmp_path / "dataset"
+
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    # only the changes get written, as a new part
+    removed = next(iter(kg.rdf_graph()))
+    kg.rdf_graph().remove(removed)
+    kg.add(ex.a, ex.age, rdflib.Literal(42))
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    # no changes, no part
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    assert sorted(p.name for p in path.glob("**/*.parquet")) == [ "part-00000.parquet", "part-00001.parquet", "part-00001.parquet" ]
+    assert len(pq.read_table(path / "part-00001.parquet")) == 1
+    assert len(pq.read_table(path / "_removed" / "part-00001.parquet")) == 1
+
+    kg_load = kglab.KnowledgeGraph()
+    kg_load.load_parquet(path)
+    assert isomorphic(kg_load.rdf_graph(), kg.rdf_graph())
+
+    # a new session which loads the dataset continues from its revision
+    kg_load = kglab.KnowledgeGraph(store="kglab")
+    kg_load.load_parquet(path)
+    kg_load.rdf_graph().add(removed)
+    kg_load.rdf_graph().remove(( ex.a, ex.age, None, ))
+    kg_load.save_parquet(path, mode="append", schema_version=schema_version)
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path)
+    assert isomorphic(kg.rdf_graph(), kg_load.rdf_graph())
+
+    # compacting keeps the same triples in one part
+    kglab.KnowledgeGraph.compact_parquet(path)
+    assert [ p.name for p in path.glob("**/*.parquet") ] == [ "part-00003.parquet" ]
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path, predicates=[ ex.age ])
+    assert len(kg.rdf_graph()) == 0
+
+    kg_load.add(ex.b, ex.age, rdflib.Literal(7))
+    kg_load.save_parquet(path, mode="append", schema_version=schema_version)
+    assert len(pq.read_table(path / "part-00004.parquet")) == 1
+
+    kg = kglab.KnowledgeGraph()
+    kg.load_parquet(path)
+    assert isomorphic(kg.rdf_graph(), kg_load.rdf_graph())
+
+
+@pytest.mark.parametrize("schema_version", [ 1, 2 ])
+def test_save_parquet_append_reload(tmp_path, schema_version):
+    import json
+
+    ex = rdflib.Namespace("http://example.org/")
+    path = tmp_path / "dataset"
+    node = rdflib.BNode()
+
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.add(ex.a, ex.knows, node)
+    kg.add(node, ex.name, rdflib.Literal("b"))
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    # blank nodes get new labels on load, although only the added
+    # triple gets saved
+    kg_load = kglab.KnowledgeGraph(store="kglab")
+    kg_load.load_parquet(path)
+    kg_load.add(ex.c, ex.name, rdflib.Literal("c"))
+    kg_load.save_parquet(path, mode="append", schema_version=schema_version)
+
+    manifest = json.loads((path / "_kglab.json").read_text(encoding="utf-8"))
+    assert [ ( part["num_added"], part["num_removed"], ) for part in manifest["parts"] ] == [ ( 2, 0, ), ( 1, 0, ) ]
+
+    # the first graph has no mark for the new revision, so its next save
+    # compares the graph with the dataset, and drops its stale mark
+    store = kg.rdf_graph().store
+    assert len(store.change_marks()) == 1
+
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+    assert store.change_marks() == [ f"parquet:{path.resolve()}#3" ]
+
+    kg_test = kglab.KnowledgeGraph()
+    kg_test.load_parquet(path)
+    assert isomorphic(kg_test.rdf_graph(), kg.rdf_graph())
+
+    # uncommitted changes do not get saved
+    store.begin()
+    kg.add(ex.d, ex.name, rdflib.Literal("d"))
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    store.commit()
+    kg.save_parquet(path, mode="append", schema_version=schema_version)
+
+    manifest = json.loads((path / "_kglab.json").read_text(encoding="utf-8"))
+    assert ( manifest["parts"][-1]["num_added"], manifest["parts"][-1]["num_removed"], ) == ( 1, 0, )
+
+
+def test_save_parquet_append_errors(tmp_path):
+    kg = kglab.KnowledgeGraph()
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "dataset", mode="append")
+
+    kg = kglab.KnowledgeGraph(store="kglab")
+    kg.save_parquet(tmp_path / "dataset", mode="append")
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "dataset", mode="append", schema_version=2)
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "dataset", mode="append", partition_by="predicate")
+
+    with pytest.raises(ValueError):
+        kg.save_parquet(tmp_path / "dataset", mode="upsert")
+
+    with pytest.raises(ValueError):
+        kglab.KnowledgeGraph.compact_parquet(tmp_path)
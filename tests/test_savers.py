@@ -1,9 +1,60 @@
+import io
+
+import pytest
+import rdflib
+from rdflib.compare import isomorphic
+
+import kglab
+
+from .__init__ import DAT_FILES_DIR
+
+
 def test_save_rdf():
     pass
 
 
+@pytest.mark.parametrize("suffix", [ "", ".gz", ".zst" ])
+def test_save_rdf_streaming(tmp_path, suffix):
+    kg = kglab.KnowledgeGraph()
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+
+    node = rdflib.BNode()
+    ex = rdflib.Namespace("http://example.org/")
+    kg.add(node, ex.note, rdflib.Literal('a "quoted"\r\nmultiline \\ note', lang="en-US"))
+    kg.add(ex.a, ex.age, rdflib.Literal(42))
+    kg.add(ex.a, ex.knows, node)
+
+    path = tmp_path / f"tmp.nt{suffix}"
+    kg.save_rdf(path, format="nt", streaming=True)
+
+    kg_load = kglab.KnowledgeGraph()
+    kg_load.load_ntriples(path)
+    assert isomorphic(kg_load.rdf_graph(), kg.rdf_graph())
+
+    # the same lines as the `rdflib` serializer, in the same order
+    if suffix == "":
+        ref_path = tmp_path / "ref.nt"
+        kg.save_rdf(ref_path, format="nt")
+        assert path.read_text(encoding="utf-8") == ref_path.read_text(encoding="utf-8")
+
+
+def test_save_rdf_streaming_errors():
+    kg = kglab.KnowledgeGraph()
+    kg.load_rdf(DAT_FILES_DIR / "tmp.ttl")
+
+    buf = io.BytesIO()
+    kg.save_rdf(buf, format="nquads", streaming=True)
+    assert len(buf.getvalue().splitlines()) == len(kg.rdf_graph())
+
+    with pytest.raises(ValueError):
+        kg.save_rdf(io.BytesIO(), format="ttl", streaming=True)
+
+    with pytest.raises(TypeError):
+        kg.save_rdf(io.StringIO(), format="nt", streaming=True)
+
+
 def test_save_jsonld():
     pass
 
 def test_save_rdftext():
-    pass
\ No newline at end of file
+    pass